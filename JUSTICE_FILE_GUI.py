@@ -6,7 +6,8 @@ Features:
  - Evidence folder picker
  - Run Selected / Run All (A,B,C)
  - Dry Run toggle (no API calls; placeholder outputs)
- - Open Outputs / PDFs / Master Excel buttons
+ - Open Outputs / PDFs / Master Excel buttons (Excel's AI_Outputs sheet is
+   regenerated from the outputs index first)
  - Live streaming log window
 
 Usage:
@@ -28,6 +29,7 @@ DEFAULT_INPUT = "evidence"  # user can change
 OUTPUT_DIR = "pipeline/outputs"
 PDF_DIR = "legal_export/pdf"
 MASTER_EXCEL = "MASTER_JUSTICE_FILE_SUPREME_v1.xlsx"
+OUTPUTS_INDEX = "MASTER_JUSTICE_FILE_SUPREME_v1.ai_outputs.sqlite"  # source of truth for AI_Outputs
 
 class PipelineRunner(threading.Thread):
     def __init__(self, cmd, log_q: queue.Queue):
@@ -94,7 +96,7 @@ class JusticeGUI:
         open_frame.grid(row=6, column=0, sticky="ew", padx=8, pady=4)
         tk.Button(open_frame, text="Open Outputs", command=lambda: self.open_path(OUTPUT_DIR)).grid(row=0, column=0, padx=2)
         tk.Button(open_frame, text="Open PDFs", command=lambda: self.open_path(PDF_DIR)).grid(row=0, column=1, padx=2)
-        tk.Button(open_frame, text="Open Master Excel", command=lambda: self.open_path(MASTER_EXCEL)).grid(row=0, column=2, padx=2)
+        tk.Button(open_frame, text="Open Master Excel", command=self.open_master_excel).grid(row=0, column=2, padx=2)
 
         # Log box
         log_frame = tk.LabelFrame(root, text="Pipeline Log")
@@ -109,6 +111,7 @@ class JusticeGUI:
         # Poll log queue
         self.root.after(150, self.drain_log)
         self.runner: PipelineRunner | None = None
+        self.open_when_done: str | None = None
 
     def pick_folder(self):
         folder = filedialog.askdirectory()
@@ -161,8 +164,25 @@ class JusticeGUI:
                 self.append_log(line)
         except queue.Empty:
             pass
+        if self.open_when_done and not (self.runner and self.runner.is_alive()):
+            target, self.open_when_done = self.open_when_done, None
+            self.open_path(target)
         self.root.after(150, self.drain_log)
 
+    def open_master_excel(self):
+        if not Path(OUTPUTS_INDEX).exists():
+            self.open_path(MASTER_EXCEL)
+            return
+        if self.runner and self.runner.is_alive():
+            messagebox.showwarning("Busy", "Pipeline is running; the workbook will be updated when it finishes.")
+            return
+        # Excel locks the workbook while open, so export right before opening it
+        cmd = [sys.executable, "-m", "pipeline.utils.outputs_index", "--excel", MASTER_EXCEL, "export"]
+        self.append_log("Regenerating AI_Outputs sheet from the outputs index...\n")
+        self.open_when_done = MASTER_EXCEL
+        self.runner = PipelineRunner(cmd, self.log_q)
+        self.runner.start()
+
     def open_path(self, target: str):
         p = Path(target)
         if not p.exists():
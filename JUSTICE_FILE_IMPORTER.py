@@ -10,6 +10,8 @@ import re
 from pathlib import Path
 import json
 
+from pipeline.utils.master_store import DEFAULT_MASTER_DB, append_records
+
 class JusticeFileImporter:
     def __init__(self):
         self.new_documents = []
@@ -147,50 +149,21 @@ class JusticeFileImporter:
         return templates
     
     def merge_templates_to_master(self, template_file="new_documents_template.json", 
-                                master_file="MASTER_JUSTICE_FILE_SUPREME.py"):
-        """Merge completed templates into the master Python file"""
+                                db_path=DEFAULT_MASTER_DB):
+        """Append completed templates to the master record store"""
         
         # Load templates
         with open(template_file, 'r') as f:
             new_docs = json.load(f)
         
-        # Read current master file
-        with open(master_file, 'r') as f:
-            master_content = f.read()
-        
-        # Find the end of master_data list
-        insert_point = master_content.find("]", master_content.find("master_data = ["))
-        
-        # Format new documents as Python dict strings
-        new_entries = ""
-        for doc in new_docs:
-            new_entries += "    {\n"
-            for key, value in doc.items():
-                if isinstance(value, str):
-                    new_entries += f'        "{key}": "{value}",\n'
-                else:
-                    new_entries += f'        "{key}": {value},\n'
-            new_entries += "    },\n"
-        
-        # Insert new entries before the closing bracket
-        updated_content = (
-            master_content[:insert_point-1] + 
-            ",\n" + new_entries.rstrip(",\n") + "\n" + 
-            master_content[insert_point:]
-        )
-        
-        # Create backup
-        backup_file = f"MASTER_JUSTICE_FILE_SUPREME_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py"
-        with open(backup_file, 'w') as f:
-            f.write(master_content)
-        
-        # Write updated file
-        with open(master_file, 'w') as f:
-            f.write(updated_content)
-        
-        print(f"✅ Merged {len(new_docs)} new documents into master file")
-        print(f"💾 Backup created: {backup_file}")
+        # Append only: existing records are never rewritten; known filenames are skipped
+        added = append_records(new_docs, db_path, skip_existing=True)
+        
+        print(f"✅ Merged {added} new documents into {db_path}")
+        if added < len(new_docs):
+            print(f"ℹ️  Skipped {len(new_docs) - added} already in the master store")
         print("🔥 Run the master script to update Excel file!")
+        return added
 
 def main():
     """Interactive document import process"""
@@ -202,7 +175,7 @@ def main():
     while True:
         print("\nChoose an option:")
         print("1. Scan folder for new documents")
-        print("2. Merge completed templates to master file")
+        print("2. Merge completed templates to master store")
         print("3. Exit")
         
         choice = input("\nEnter choice (1-3): ").strip()
@@ -9,87 +9,78 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+from pipeline.utils.case_stats import compute_case_stats
+from pipeline.utils.integrity import print_report, validate_records
+from pipeline.utils.io_utils import json_dump
+from pipeline.utils.master_store import DEFAULT_MASTER_DB, MasterStore, load_dataframe
+from pipeline.utils.xref_graph import graph_path, load_or_build
+
 class JusticeFileManager:
-    def __init__(self, master_file="MASTER_JUSTICE_FILE_SUPREME.py"):
-        self.master_file = master_file
+    def __init__(self, db_path=DEFAULT_MASTER_DB):
+        self.db_path = Path(db_path)
         self.data = self.load_current_data()
     
     def load_current_data(self):
-        """Load current data from the master Python file"""
+        """Load current records from the master store"""
         try:
-            # Execute the Python file to get the master_data
-            namespace = {}
-            with open(self.master_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Extract just the master_data definition
-                start = content.find("master_data = [")
-                end = content.find("]", start) + 1
-                data_def = content[start:end]
-                exec(data_def, namespace)
-            
-            return pd.DataFrame(namespace['master_data'])
+            return load_dataframe(self.db_path)
         except Exception as e:
             print(f"❌ Error loading data: {e}")
             return pd.DataFrame()
     
-    def validate_data_integrity(self):
-        """Check for data integrity issues"""
+    def validate_data_integrity(self, report_path="integrity_report.json"):
+        """Check for data integrity issues (rule set in pipeline/utils/integrity.py)"""
         print("🔍 VALIDATING JUSTICE FILE INTEGRITY...")
-        
-        issues = []
-        
-        # Check for required fields
-        required_fields = ["Filename", "Date", "Type", "Summary", "Smoking Gun"]
-        for field in required_fields:
-            if field not in self.data.columns:
-                issues.append(f"Missing required field: {field}")
-        
-        # Check for empty critical fields
-        for idx, row in self.data.iterrows():
-            if pd.isna(row.get('Summary')) or row.get('Summary') == "":
-                issues.append(f"Row {idx+1}: Missing summary for {row.get('Filename', 'Unknown')}")
-            
-            if row.get('Smoking Gun') == "Review Needed":
-                issues.append(f"Row {idx+1}: Smoking Gun status needs review for {row.get('Filename', 'Unknown')}")
-        
-        # Check for duplicate filenames
-        duplicates = self.data['Filename'].duplicated()
-        if duplicates.any():
-            dup_files = self.data[duplicates]['Filename'].tolist()
-            issues.append(f"Duplicate filenames found: {dup_files}")
-        
-        # Report results
-        if issues:
-            print(f"⚠️  Found {len(issues)} integrity issues:")
-            for i, issue in enumerate(issues, 1):
-                print(f"   {i}. {issue}")
-        else:
-            print("✅ All integrity checks passed!")
-        
-        return issues
+
+        report = validate_records(self.data, graph=self.cross_reference_graph())
+        print_report(report)
+
+        # Save structured report
+        if report_path:
+            json_dump(Path(report_path), report.to_dict())
+            print(f"📄 Integrity report saved to: {report_path}")
+
+        return report
     
+    def cross_reference_graph(self, rebuild=False):
+        """Resolved cross-reference graph, loaded from disk unless the records changed"""
+        graph, built = load_or_build(self.data, graph_path(self.db_path), rebuild)
+        verb = "Built" if built else "Loaded"
+        print(f"🔗 {verb} cross-reference graph: {graph.size} documents, {len(graph.src)} resolved links, "
+              f"{len(graph.unresolved_ref)} unresolved references")
+        return graph
+
     def generate_cross_reference_map(self):
         """Generate a cross-reference map of contradictions and links"""
         print("🔗 GENERATING CROSS-REFERENCE MAP...")
         
+        graph = self.cross_reference_graph()
+        contradicted_by = graph.contradiction_counts()
+        unresolved = {}
+        for row, ref in zip(graph.unresolved_row.tolist(), graph.unresolved_ref.tolist()):
+            unresolved.setdefault(row, []).append(ref)
+        
         cross_refs = {}
         
-        for idx, row in self.data.iterrows():
+        for idx, row in enumerate(self.data.to_dict("records")):
             filename = row['Filename']
             contradicts = str(row.get('Contradicts', ''))
             cross_link = str(row.get('Cross-Link', ''))
             
             # Extract referenced documents
             refs = []
-            if contradicts and contradicts != 'nan':
+            if contradicts and contradicts not in ('nan', 'None'):
                 refs.extend([r.strip() for r in contradicts.split(',')])
-            if cross_link and cross_link != 'nan':
+            if cross_link and cross_link not in ('nan', 'None'):
                 refs.extend([r.strip() for r in cross_link.split(',')])
             
             cross_refs[filename] = {
                 'contradicts': contradicts,
                 'cross_links': cross_link,
                 'references': refs,
+                'resolved': graph.references(idx),
+                'unresolved': unresolved.get(idx, []),
+                'contradicted_by': int(contradicted_by[idx]),
                 'pattern': row.get('Pattern', ''),
                 'smoking_gun': row.get('Smoking Gun', ''),
                 'top_5': row.get('Top 5', '')
@@ -102,6 +93,28 @@ class JusticeFileManager:
         print("✅ Cross-reference map saved to: cross_reference_map.json")
         return cross_refs
     
+    def explore_cross_references(self, hops=2, top=10):
+        """Smoking-gun neighbourhood, linked groups and most-contradicted documents"""
+        graph = self.cross_reference_graph()
+        names = graph.filenames
+        
+        ids, dist = graph.within_hops(hops)
+        linked = ids[dist > 0]
+        print(f"\n🔥 {len(linked)} documents within {hops} hops of {int(graph.smoking.sum())} smoking guns:")
+        for i, d in zip(linked[:top].tolist(), dist[dist > 0][:top].tolist()):
+            print(f"   {d} hop{'s' if d > 1 else ''}: {names[i]}")
+        
+        groups = graph.components()
+        print(f"\n🧩 {len(groups)} linked document groups:")
+        for n, members in enumerate(groups[:top], 1):
+            shown = "; ".join(names[members[:3]])
+            print(f"   #{n} ({len(members)} docs): {shown}{' ...' if len(members) > 3 else ''}")
+        
+        print("\n⚔️ Most contradicted documents:")
+        for i, count in graph.most_contradicted(top):
+            print(f"   {count} × {names[i]}")
+        return graph
+    
     def export_for_legal_review(self, output_dir="legal_export"):
         """Export organized files for legal review"""
         print("⚖️ PREPARING LEGAL EXPORT PACKAGE...")
@@ -147,10 +160,7 @@ class JusticeFileManager:
     
     def generate_case_summary(self):
         """Generate a comprehensive case summary"""
-        total_docs = len(self.data)
-        smoking_guns = len(self.data[self.data['Smoking Gun'] == 'Yes'])
-        misconduct_cases = len(self.data[self.data['Misconduct?'] == 'Yes'])
-        top5_count = len(self.data[self.data['Top 5'] == 'Yes'])
+        stats = compute_case_stats(self.data)  # shared with the 📈 Case Summary sheet
         
         summary = f"""
 SUPREME MASTER JUSTICE FILE - CASE SUMMARY
@@ -158,48 +168,41 @@ Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
 
 CASE STRENGTH OVERVIEW:
 ======================
-Total Documents Analyzed: {total_docs}
-Smoking Gun Evidence: {smoking_guns}
-Top 5 Priority Items: {top5_count}
-Documented Misconduct: {misconduct_cases}
+Total Documents Analyzed: {stats.total}
+Smoking Gun Evidence: {stats.smoking_guns}
+Top 5 Priority Items: {stats.top5}
+Documented Misconduct: {stats.misconduct}
 
 PATTERN ANALYSIS:
 ================
 """
         
-        pattern_counts = self.data['Pattern'].value_counts()
-        for pattern, count in pattern_counts.items():
-            if pd.notna(pattern):
-                summary += f"{pattern}: {count} documents\n"
+        for pattern, count in stats.patterns.items():
+            summary += f"{pattern}: {count} documents\n"
         
         summary += f"""
 
 AGENCY BREAKDOWN:
 ================
 """
-        agency_counts = self.data['Agency'].value_counts()
-        for agency, count in agency_counts.items():
-            if pd.notna(agency):
-                summary += f"{agency}: {count} documents\n"
+        for agency, count in stats.agencies.items():
+            summary += f"{agency}: {count} documents\n"
         
         summary += f"""
 
 TOP 5 SMOKING GUNS:
 ==================
 """
-        top5_smoking = self.data[(self.data['Top 5'] == 'Yes') & (self.data['Smoking Gun'] == 'Yes')]
-        for idx, row in top5_smoking.iterrows():
-            summary += f"• {row['Filename']}\n  Summary: {row['Summary']}\n\n"
+        for filename, doc_summary in stats.top5_smoking:
+            summary += f"• {filename}\n  Summary: {doc_summary}\n\n"
         
         summary += f"""
 
 LEGAL VIOLATIONS IDENTIFIED:
 ============================
 """
-        violations = self.data[self.data['Law Violated'] != 'N/A']['Law Violated'].unique()
-        for violation in violations:
-            if pd.notna(violation):
-                summary += f"• {violation}\n"
+        for violation in stats.laws:
+            summary += f"• {violation}\n"
         
         summary += f"""
 
@@ -221,7 +224,12 @@ Truth will prevail. Justice for Jace and Josh.
         backup_dir = Path(f"justice_backup_{timestamp}")
         backup_dir.mkdir(exist_ok=True)
         
-        # Backup main files
+        # Backup the record store (consistent snapshot) and main files
+        store = MasterStore(self.db_path)
+        try:
+            store.backup(backup_dir / self.db_path.name)
+        finally:
+            store.close()
         files_to_backup = [
             "MASTER_JUSTICE_FILE_SUPREME.py",
             "MASTER_JUSTICE_FILE_SUPREME_v1.xlsx",
@@ -251,9 +259,10 @@ def main():
         print("3. Export for legal review")
         print("4. Generate case summary")
         print("5. Create system backup")
-        print("6. Exit")
+        print("6. Explore cross-references (smoking-gun links, groups)")
+        print("7. Exit")
         
-        choice = input("\nEnter choice (1-6): ").strip()
+        choice = input("\nEnter choice (1-7): ").strip()
         
         if choice == "1":
             manager.validate_data_integrity()
@@ -281,6 +290,10 @@ def main():
             manager.backup_system()
         
         elif choice == "6":
+            hops = input("Hops from smoking guns (default: 2): ").strip()
+            manager.explore_cross_references(int(hops) if hops.isdigit() else 2)
+        
+        elif choice == "7":
             print("🙏 May God grant justice and protection. Amen.")
             break
         
@@ -7,6 +7,8 @@ import json
 import os
 from datetime import datetime
 
+from pipeline.utils.master_store import DEFAULT_MASTER_DB, append_records
+
 class QuickUpdate:
     def __init__(self):
         self.patterns = {
@@ -152,10 +154,10 @@ class QuickUpdate:
         
         print(f"\n✅ Document added to pending queue!")
         print(f"📄 File: {pending_file}")
-        print("🔄 Run merge_pending_documents() to add to master file")
+        print("🔄 Run merge_pending_documents() to add to master store")
     
     def merge_pending_documents(self):
-        """Merge all pending documents into master file"""
+        """Merge all pending documents into the master store"""
         pending_file = "quick_add_pending.json"
         
         if not os.path.exists(pending_file):
@@ -179,43 +181,15 @@ class QuickUpdate:
             print("❌ Merge cancelled!")
             return
         
-        # Read master file
-        master_file = "MASTER_JUSTICE_FILE_SUPREME.py"
-        with open(master_file, 'r') as f:
-            master_content = f.read()
-        
-        # Create backup
-        backup_file = f"MASTER_JUSTICE_FILE_SUPREME_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py"
-        with open(backup_file, 'w') as f:
-            f.write(master_content)
-        
-        # Find insertion point
-        insert_point = master_content.find("]", master_content.find("master_data = ["))
-        
-        # Format new entries
-        new_entries = ""
-        for doc in pending_docs:
-            new_entries += "    {\n"
-            for key, value in doc.items():
-                new_entries += f'        "{key}": "{value}",\n'
-            new_entries += "    },\n"
-        
-        # Insert new entries
-        updated_content = (
-            master_content[:insert_point-1] + 
-            ",\n" + new_entries.rstrip(",\n") + "\n" + 
-            master_content[insert_point:]
-        )
-        
-        # Write updated master file
-        with open(master_file, 'w') as f:
-            f.write(updated_content)
+        # Append only: existing records are never rewritten; known filenames are skipped
+        added = append_records(pending_docs, DEFAULT_MASTER_DB, skip_existing=True)
         
         # Clear pending file
         os.remove(pending_file)
         
-        print(f"✅ Merged {len(pending_docs)} documents into master file!")
-        print(f"💾 Backup created: {backup_file}")
+        print(f"✅ Merged {added} documents into {DEFAULT_MASTER_DB}!")
+        if added < len(pending_docs):
+            print(f"ℹ️  Skipped {len(pending_docs) - added} already in the master store")
         print("🔥 Run the master script to update Excel file!")
     
     def view_pending(self):
@@ -255,7 +229,7 @@ def main():
         print("\nChoose an option:")
         print("1. Quick add new document")
         print("2. View pending documents")
-        print("3. Merge pending to master file")
+        print("3. Merge pending to master store")
         print("4. Exit")
         
         choice = input("\nEnter choice (1-4): ").strip()
@@ -10,54 +10,279 @@ Example:
 from __future__ import annotations
 import argparse
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
 
-from pipeline.gpt5_client import get_client
-from pipeline.utils.io_utils import write_text
-from pipeline.utils.pdf_export import bulk_convert
+from pipeline.gpt5_client import get_client, configure_client, DEFAULT_CACHE_DIR
+from pipeline.utils.io_utils import CHARS_PER_TOKEN, json_dump, write_text
+from pipeline.utils.pdf_export import bulk_convert, summarize_report
+from pipeline.utils.binder import build_binder
 from pipeline.utils.excel_sync import sync_markdowns
-from pipeline.utils.text_extract import extract_text
+from pipeline.utils.extract_cache import DEFAULT_EXTRACT_CACHE
+from pipeline.utils.ocr import OcrConfig
+from pipeline.utils.text_extract import (SUPPORTED_EXT, batch_extract_with_report, configure_cache as configure_extract_cache,
+                                         configure_ocr, extract_text, iter_chunks)
+from pipeline.utils.manifest import RunManifest
+from pipeline.utils.master_store import load_records
+from pipeline.utils.candidates import CandidateIndex, clusters, extract_features
+from pipeline.utils.sharding import check_reduce_progress, group_for_reduce, pack_shards, render_shard
+from pipeline.utils.summary_schema import RECORD_SCHEMA, build_record, json_path, load_record, master_fields
 
 PROMPTS_DIR = Path("pipeline/prompts")
+B_SHARD_CHARS = 60000  # per-prompt evidence budget for Task B map/reduce passes
+A_CHUNK_TOKENS = 3000  # Task A window (~12,000 chars); longer documents are summarized chunk by chunk
 
 def load_prompt(name: str) -> str:
     return (PROMPTS_DIR / name).read_text(encoding="utf-8")
 
 def list_documents(input_dir: Path) -> List[Path]:
-    exts = {".txt",".md"}  # Extend as extractors added
-    return [p for p in input_dir.iterdir() if p.suffix.lower() in exts]
+    return sorted(p for p in input_dir.iterdir() if p.is_file() and p.suffix.lower() in SUPPORTED_EXT)
 
-def task_A_summaries(docs: List[Path], children: str, out_dir: Path, dry_run: bool=False) -> List[Dict]:
+def summary_path(out_dir: Path, doc: Path) -> Path:
+    return out_dir / f"SUMMARY_{doc.stem}.md"
+
+def _summary_json(doc: Path, markdown: str, client, dry_run: bool, json_template: str) -> Dict:
+    """Typed record for one summary: JSON mode over the finished markdown, validated and repaired locally."""
+    reply = None
+    if not dry_run:
+        prompt = f"{json_template}\n\nSUMMARY:\n{markdown}"
+        reply = client.complete_json("You convert evidence summaries to JSON records.", prompt,
+                                     schema=RECORD_SCHEMA, name="evidence_summary")
+    return build_record(markdown, reply, filename=doc.name)
+
+def _complete_strict(client, system: str, prompts: Dict[str, str]) -> List[str]:
+    """complete_many that fails the document if any part failed (no silently partial summaries)."""
+    out = client.complete_many(system, prompts)
+    for key, value in out.items():
+        if isinstance(value, Exception):
+            raise RuntimeError(f"{key}: {type(value).__name__}: {value}")
+    return [out[k] for k in prompts]
+
+def _summarize_long_document(doc: Path, children: str, template: str, system: str, client,
+                             chunk_tokens: int, chunk_note: str, merge_note: str) -> str:
+    """Map-reduce summary: page windows -> partial notes (concurrent) -> A_SUMMARY schema.
+
+    Each window prompt depends only on that window's text, so the completion cache
+    re-uses every unchanged window when one page of the document is edited.
+    """
+    header = f"FILENAME: {doc.name}\nCHILDREN: {children}"
+    prompts = {
+        f"{doc.name} chunk {c.index + 1} (pages {c.page_start}-{c.page_end})":
+            f"{chunk_note}\n\n{header}\nPAGES {c.page_start}-{c.page_end}:\n{c.text}"
+        for c in iter_chunks(doc, max_tokens=chunk_tokens)
+    }
+    notes = _complete_strict(client, system, prompts)
+    budget = chunk_tokens * CHARS_PER_TOKEN
+    level = 1
+    while len(notes) > 1 and sum(len(n) for n in notes) > budget:
+        groups = group_for_reduce([(f"partial notes {i}", n) for i, n in enumerate(notes, 1)], budget)
+        condensed = _complete_strict(client, system, {
+            f"{doc.name} condense L{level} group {g}": f"{chunk_note}\n\n{header}\nEARLIER PARTIAL NOTES:\n\n" + render_shard(group)
+            for g, group in enumerate(groups, 1)
+        })
+        check_reduce_progress(notes, condensed)
+        notes = condensed
+        level += 1
+    prompt = (f"{template}\n\n{merge_note}\n\n{header}\nPARTIAL NOTES (in page order):\n\n"
+              + render_shard([(f"partial notes {i}", n) for i, n in enumerate(notes, 1)]))
+    return client.complete(system, prompt)
+
+def _summarize_document(doc: Path, children: str, out_dir: Path, template: str, system: str,
+                        client, dry_run: bool, stub_latency: float = 0.0,
+                        chunk_tokens: int = A_CHUNK_TOKENS, long_notes: Tuple[str, str] = ("", ""),
+                        json_template: Optional[str] = None) -> Dict:
+    raw = extract_text(doc)
+    long_doc = len(raw) > chunk_tokens * CHARS_PER_TOKEN
+    if dry_run:
+        if stub_latency:
+            time.sleep(stub_latency)  # simulate network round trip for offline benchmarking
+        mode_note = ""
+        if long_doc:
+            mode_note = f"Long-document mode: {sum(1 for _ in iter_chunks(doc, max_tokens=chunk_tokens))} chunks\n"
+        completion = f"# DRY RUN SUMMARY\nDocument: {doc.name}\nChildren: {children}\n{mode_note}(Note: This is placeholder content produced in dry-run mode.)\n\nPrimary Pattern: (placeholder)\nInclude? (Yes/No): Yes\n"[:4000]
+    elif long_doc:
+        completion = _summarize_long_document(doc, children, template, system, client, chunk_tokens, *long_notes)
+    else:
+        prompt = f"{template}\n\nFILENAME: {doc.name}\nCHILDREN: {children}\nRAW CONTENT:\n{raw}"
+        completion = client.complete(system, prompt)
+    out_path = summary_path(out_dir, doc)
+    write_text(out_path, completion)
+    result = {"filename": doc.name, "output": str(out_path)}
+    if json_template is not None:
+        record = _summary_json(doc, completion, client, dry_run, json_template)
+        json_dump(json_path(out_path), record)
+        result["record"] = str(json_path(out_path))
+        result["repairs"] = len(record["repairs"])
+    return result
+
+def task_A_summaries(docs: List[Path], children: str, out_dir: Path, dry_run: bool=False,
+                     workers: int = 1, stub_latency: float = 0.0, chunk_tokens: int = A_CHUNK_TOKENS,
+                     records: bool = True) -> List[Dict]:
+    """Summarize each document; with workers > 1 documents run on a bounded thread pool.
+
+    With ``records`` each markdown summary also gets a schema-validated
+    SUMMARY_<stem>.json (see pipeline.utils.summary_schema).
+
+    Documents longer than ``chunk_tokens`` are summarized window by window and merged
+    (nothing past the first window is dropped). Results keep the input order. A failing
+    document is recorded with an ``error`` entry (and in task_A_errors.json) instead of
+    aborting the batch.
+    """
     client = None if dry_run else get_client()
     system = "You are a disciplined legal evidence summarizer producing structured outputs."
     template = load_prompt("A_SUMMARY.txt")
-    results = []
-    for doc in docs:
-        raw = extract_text(doc)
-        prompt = f"{template}\n\nFILENAME: {doc.name}\nCHILDREN: {children}\nRAW CONTENT (truncate if huge):\n{raw[:12000]}"
-        if dry_run:
-            completion = f"# DRY RUN SUMMARY\nDocument: {doc.name}\nChildren: {children}\n(Note: This is placeholder content produced in dry-run mode.)\n\nPrimary Pattern: (placeholder)\nInclude? (Yes/No): Yes\n"[:4000]
-        else:
-            completion = client.complete(system, prompt)
-        out_path = out_dir / f"SUMMARY_{doc.stem}.md"
-        write_text(out_path, completion)
-        results.append({"filename": doc.name, "output": str(out_path)})
+    long_notes = (load_prompt("A_CHUNK.txt"), load_prompt("A_MERGE.txt"))
+    json_template = load_prompt("A_JSON.txt") if records else None
+
+    def run_one(doc: Path) -> Dict:
+        try:
+            return _summarize_document(doc, children, out_dir, template, system, client, dry_run, stub_latency,
+                                       chunk_tokens, long_notes, json_template)
+        except Exception as e:
+            return {"filename": doc.name, "output": None, "error": f"{type(e).__name__}: {e}"}
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_one, docs))  # map preserves input order
+    else:
+        results = [run_one(doc) for doc in docs]
+
+    failures = [r for r in results if r.get("error")]
+    errors_path = out_dir / "task_A_errors.json"
+    if failures:
+        json_dump(errors_path, {"failed": failures})
+        print(f"Task A: {len(failures)} of {len(results)} documents failed (see task_A_errors.json)")
+    else:
+        errors_path.unlink(missing_ok=True)  # a clean run must not leave the last run's errors behind
+    repaired = sum(1 for r in results if r.get("repairs"))
+    if repaired:
+        print(f"Task A: {repaired} JSON records needed local repair (see 'repairs' in each SUMMARY_*.json)")
     return results
 
-def task_B_contradictions(docs: List[Path], out_dir: Path, dry_run: bool=False):
+def _complete_all(client, system: str, prompts: Dict[str, str], dry_run: bool, placeholder: str) -> Dict[str, str]:
+    """Run prompts concurrently; failures become visible warning text instead of silently vanishing."""
+    if dry_run:
+        return {k: placeholder for k in prompts}
+    out = {}
+    for k, v in client.complete_many(system, prompts).items():
+        if isinstance(v, Exception):
+            print(f"Task B: {k} failed: {v}")
+            v = f"> WARNING: {k} failed ({type(v).__name__}: {v}); its documents are not covered.\n"
+        out[k] = v
+    return out
+
+def load_master_records() -> List[Dict]:
+    """Master table records (for Contradicts/Cross-Link hints); empty if unavailable."""
+    try:
+        return load_records()
+    except Exception:
+        return []
+
+def load_summary_records(out_dir: Path, docs: List[Path]) -> List[Dict]:
+    """Task A JSON records in master-table shape (their Contradicts refs become candidate links)."""
+    found = (load_record(json_path(summary_path(out_dir, d))) for d in docs)
+    return [master_fields(r) for r in found if r]
+
+def select_candidate_clusters(sections: Dict[str, Tuple[str, str]], children: str, top_k: int,
+                              out_dir: Path, records: Optional[List[Dict]] = None) -> List[Tuple[List[str], List[Tuple]]]:
+    """Pick the top-K likely-conflicting pairs and group them into connected clusters.
+
+    Returns [(doc names, pairs inside the cluster)] and writes CANDIDATE_PAIRS.json for review.
+    """
+    names = [c.strip() for c in children.split(",") if c.strip()]
+    index = CandidateIndex()
+    for name, (_, text) in sections.items():
+        index.add(name, extract_features(text, names))
+    if records:
+        index.link_records(records)
+    pairs = index.top_pairs(top_k)
+    groups = clusters(pairs)
+    json_dump(out_dir / "CANDIDATE_PAIRS.json", {
+        "documents": len(sections),
+        "pairs": [{"a": a, "b": b, "score": sc, "shared": feats} for a, b, sc, feats in pairs],
+        "clusters": groups,
+    })
+    member = {d: i for i, g in enumerate(groups) for d in g}
+    by_cluster: List[List[Tuple]] = [[] for _ in groups]
+    for pair in pairs:
+        by_cluster[member[pair[0]]].append(pair)
+    return list(zip(groups, by_cluster))
+
+def task_B_contradictions(docs: List[Path], out_dir: Path, dry_run: bool=False,
+                          shard_chars: int = B_SHARD_CHARS, use_summaries: bool = False,
+                          candidate_pairs: int = 0, children: str = ""):
+    """Hierarchical map-reduce contradiction mapping.
+
+    Map: full document texts (or their Task A summaries) are packed into shards of at most
+    ``shard_chars`` characters and mapped concurrently. Reduce: partial maps are merged in
+    bounded groups until one map remains. A set that fits one shard costs a single call.
+
+    With ``candidate_pairs`` > 0 a local index first selects the top-K document pairs likely
+    to conflict; only documents in those pairs are sent, shard by candidate cluster, and each
+    shard prompt lists the pairs to check.
+    """
     client = None if dry_run else get_client()
     system = "You map contradictions precisely."
     template = load_prompt("B_CONTRADICTIONS.txt")
-    combined = []
+    sections: Dict[str, Tuple[str, str]] = {}
     for doc in docs:
-        combined.append(f"== {doc.name} ==\n" + extract_text(doc)[:8000])
-    prompt = f"{template}\n\nDOCUMENT SET RAW EXTRACTS:\n\n" + "\n\n".join(combined)
-    if dry_run:
-        completion = "# DRY RUN CONTRADICTIONS MAP\n(No API calls made.)\n"
+        summary = summary_path(out_dir, doc)
+        if use_summaries and summary.exists():
+            sections[doc.name] = (f"{doc.name} [Task A summary]", summary.read_text(encoding="utf-8", errors="ignore"))
+        else:
+            sections[doc.name] = (doc.name, extract_text(doc))
+    pair_notes: List[str] = []
+    if candidate_pairs > 0:
+        records = load_master_records() + load_summary_records(out_dir, docs)
+        selected = select_candidate_clusters(sections, children, candidate_pairs, out_dir, records)
+        print(f"Task B: {sum(len(p) for _, p in selected)} candidate pairs in {len(selected)} clusters "
+              f"(of {len(sections)} documents)")
+        shards = []
+        for group, pairs in selected:
+            group_shards = pack_shards([sections[d] for d in group], shard_chars)
+            note = "CANDIDATE PAIRS TO CHECK (shared signals):\n" + "\n".join(
+                f"- {a} <-> {b} ({', '.join(feats[:6])})" for a, b, _, feats in pairs)
+            shards.extend(group_shards)
+            pair_notes.extend([note] * len(group_shards))
+        if not shards:
+            completion = "# Contradiction Map\n\nNo candidate document pairs share dates, agencies, citations or key phrases.\n"
+            out_path = out_dir / "CONTRADICTIONS_MAP.md"
+            write_text(out_path, completion)
+            return str(out_path)
     else:
-        completion = client.complete(system, prompt)
+        shards = pack_shards(list(sections.values()), shard_chars)
+        pair_notes = [""] * len(shards)
+    if len(shards) == 1:
+        prompt = f"{template}\n\n{pair_notes[0]}\n\nDOCUMENT SET RAW EXTRACTS:\n\n" + render_shard(shards[0])
+        completion = _complete_all(client, system, {"map": prompt}, dry_run,
+                                   "# DRY RUN CONTRADICTIONS MAP\n(No API calls made.)\n")["map"]
+    else:
+        map_note = load_prompt("B_MAP.txt")
+        prompts = {
+            f"shard {i}/{len(shards)}": f"{template}\n\n{map_note}\n\n{pair_notes[i - 1]}\n\nDOCUMENT SHARD {i} OF {len(shards)} RAW EXTRACTS:\n\n" + render_shard(shard)
+            for i, shard in enumerate(shards, 1)
+        }
+        print(f"Task B: mapping {len(prompts)} shards...")
+        partials = list(_complete_all(client, system, prompts, dry_run,
+                                      "# DRY RUN PARTIAL CONTRADICTION MAP\n(No API calls made.)\n").values())
+        reduce_note = load_prompt("B_REDUCE.txt")
+        level = 1
+        while len(partials) > 1:
+            groups = group_for_reduce([(f"partial map {i}", p) for i, p in enumerate(partials, 1)], shard_chars)
+            prompts = {
+                f"reduce L{level} group {g}": f"{template}\n\n{reduce_note}\n\nPARTIAL MAPS:\n\n" + render_shard(group)
+                for g, group in enumerate(groups, 1)
+            }
+            print(f"Task B: reduce level {level}, {len(prompts)} merges...")
+            merged = list(_complete_all(client, system, prompts, dry_run,
+                                        f"# DRY RUN CONTRADICTIONS MAP\n(No API calls made; {len(shards)} shards merged.)\n").values())
+            check_reduce_progress(partials, merged)
+            partials = merged
+            level += 1
+        completion = partials[0]
     out_path = out_dir / "CONTRADICTIONS_MAP.md"
     write_text(out_path, completion)
     return str(out_path)
@@ -80,11 +305,33 @@ def task_C_brief(docs: List[Path], out_dir: Path, dry_run: bool=False):
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input", required=True, help="Folder containing source evidence text files")
+    parser.add_argument("--input", required=True, help="Folder containing source evidence files (.txt/.md/.pdf/.docx)")
     parser.add_argument("--tasks", default="A,B,C", help="Comma list of tasks: A,B,C")
     parser.add_argument("--children", default="Jace,Josh", help="Children names for context")
     parser.add_argument("--out", default="pipeline/outputs", help="Output directory")
     parser.add_argument("--dry-run", action="store_true", help="Generate placeholder outputs without calling the API")
+    parser.add_argument("--workers", type=int, default=1, help="Documents processed concurrently in Task A (default 1 = sequential)")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="On-disk completion cache folder")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API; do not read or write the completion cache")
+    parser.add_argument("--a-chunk-tokens", type=int, default=A_CHUNK_TOKENS, help="Task A window size; longer documents are summarized per window and merged")
+    parser.add_argument("--no-a-json", action="store_true", help="Skip the per-document JSON record (SUMMARY_<stem>.json) in Task A")
+    parser.add_argument("--b-shard-chars", type=int, default=B_SHARD_CHARS, help="Max characters of evidence per Task B map/reduce prompt")
+    parser.add_argument("--b-from-summaries", action="store_true", help="Feed Task A summaries (when present) to Task B instead of raw text")
+    parser.add_argument("--b-candidates", type=int, default=0, metavar="K", help="Pre-filter Task B to the top-K likely-conflicting document pairs (0 = send every document)")
+    parser.add_argument("--extract-workers", type=int, default=0, help="Pre-extract documents on N worker processes (PDF parsing is CPU-bound)")
+    parser.add_argument("--extract-timeout", type=float, default=300.0, help="Per-file extraction timeout in seconds (with --extract-workers)")
+    parser.add_argument("--extract-cache", default=str(DEFAULT_EXTRACT_CACHE), help="SQLite store for extracted text")
+    parser.add_argument("--no-extract-cache", action="store_true", help="Re-parse every document instead of using the extract cache")
+    parser.add_argument("--no-ocr", action="store_true", help="Disable OCR fallback for scanned PDF pages")
+    parser.add_argument("--ocr-dpi", type=int, default=300, help="Render resolution for OCR pages")
+    parser.add_argument("--ocr-min-chars", type=int, default=25, help="OCR a PDF page when its text layer has fewer characters than this")
+    parser.add_argument("--ocr-workers", type=int, default=0, help="OCR worker processes (default: all cores)")
+    parser.add_argument("--ocr-lang", default="eng", help="Tesseract language code(s), e.g. eng or eng+spa")
+    parser.add_argument("--pdf-workers", type=int, default=None, help="PDF render processes (default: CPU count)")
+    parser.add_argument("--binder", action="store_true", help="Also build one exhibit-binder PDF (TOC, bookmarks, page index)")
+    parser.add_argument("--excel", action="store_true", help="Also regenerate the AI_Outputs sheet of the master workbook (default: index only)")
+    parser.add_argument("--full", action="store_true", help="Ignore the run manifest and regenerate every output")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Simulated seconds per completion in --dry-run (offline benchmarking of --workers)")
     args = parser.parse_args()
 
     input_dir = Path(args.input)
@@ -93,41 +340,125 @@ def main():
 
     docs = list_documents(input_dir)
     if not docs:
-        print("No supported documents (.txt/.md) found in input folder.")
+        print(f"No supported documents ({'/'.join(sorted(SUPPORTED_EXT))}) found in input folder.")
         return
     print(f"Found {len(docs)} documents.")
+    extract_cache = None if args.no_extract_cache else configure_extract_cache(Path(args.extract_cache))
+    if extract_cache is not None:
+        pruned = extract_cache.prune_missing()
+        if pruned:
+            print(f"Extract cache: pruned {pruned} entries for deleted sources.")
+    if not args.no_ocr:
+        configure_ocr(OcrConfig(dpi=args.ocr_dpi, min_chars=args.ocr_min_chars, lang=args.ocr_lang,
+                                workers=args.ocr_workers or None))
+    if args.extract_workers > 1:
+        _, report = batch_extract_with_report(docs, workers=args.extract_workers, timeout=args.extract_timeout)
+        print(f"Extracted {report['files']} files ({report['cached']} cached) / {report['pages']} pages parsed in "
+              f"{report['seconds']}s ({report['pages_per_sec']} pages/sec); {len(report['errors'])} errors, {len(report['timeouts'])} timeouts")
 
     tasks = {t.strip().upper() for t in args.tasks.split(',') if t.strip()}
+    client = None if args.dry_run else configure_client(Path(args.cache_dir), use_cache=not args.no_cache)
+
+    # Incremental mode: fingerprints of inputs/prompts/settings decide what reruns
+    manifest = RunManifest(out_dir)
+    mode = "dry-run" if args.dry_run else "live"
+    regenerated = 0
 
     if 'A' in tasks:
-        print("Running Task A (Summaries)...")
-        task_A_summaries(docs, args.children, out_dir, dry_run=args.dry_run)
-        print("Task A complete.")
+        prompt_hash = [manifest.file_hash(PROMPTS_DIR / n) for n in ("A_SUMMARY.txt", "A_CHUNK.txt", "A_MERGE.txt")]
+        if not args.no_a_json:
+            prompt_hash.append(manifest.file_hash(PROMPTS_DIR / "A_JSON.txt"))
+        fps = {doc.name: manifest.fingerprint(manifest.file_hash(doc), prompt_hash, args.children, args.a_chunk_tokens, mode)
+               for doc in docs}
+        todo = [doc for doc in docs
+                if args.full or not manifest.is_current(f"A:{doc.name}", fps[doc.name], summary_path(out_dir, doc))
+                or (not args.no_a_json and not json_path(summary_path(out_dir, doc)).exists())]
+        print(f"Running Task A (Summaries, workers={max(1, args.workers)}): "
+              f"{len(todo)} to process, {len(docs) - len(todo)} unchanged...")
+        t0 = time.perf_counter()
+        results = task_A_summaries(todo, args.children, out_dir, dry_run=args.dry_run,
+                                   workers=max(1, args.workers), stub_latency=args.stub_latency,
+                                   chunk_tokens=args.a_chunk_tokens, records=not args.no_a_json)
+        for r in results:
+            if not r.get("error"):
+                manifest.record(f"A:{r['filename']}", fps[r["filename"]])
+                regenerated += 1
+        manifest.save()
+        print(f"Task A complete in {time.perf_counter() - t0:.2f}s.")
     if 'B' in tasks:
-        print("Running Task B (Contradictions)...")
-        task_B_contradictions(docs, out_dir, dry_run=args.dry_run)
-        print("Task B complete.")
+        b_inputs = list(docs)
+        if args.b_from_summaries:
+            b_inputs += [p for p in (summary_path(out_dir, d) for d in docs) if p.exists()]
+        fp = manifest.set_fingerprint(b_inputs, [manifest.file_hash(PROMPTS_DIR / n) for n in ("B_CONTRADICTIONS.txt", "B_MAP.txt", "B_REDUCE.txt")],
+                                      args.b_shard_chars, args.b_candidates, args.children, mode)
+        if not args.full and manifest.is_current("B", fp, out_dir / "CONTRADICTIONS_MAP.md"):
+            print("Task B skipped (inputs unchanged).")
+        else:
+            print("Running Task B (Contradictions)...")
+            task_B_contradictions(docs, out_dir, dry_run=args.dry_run,
+                                  shard_chars=args.b_shard_chars, use_summaries=args.b_from_summaries,
+                                  candidate_pairs=args.b_candidates, children=args.children)
+            manifest.record("B", fp)
+            manifest.save()
+            regenerated += 1
+            print("Task B complete.")
     if 'C' in tasks:
-        print("Running Task C (Evidence Brief)...")
-        task_C_brief(docs, out_dir, dry_run=args.dry_run)
-        print("Task C complete.")
+        fp = manifest.set_fingerprint(docs, manifest.file_hash(PROMPTS_DIR / "C_BRIEF.txt"), mode)
+        if not args.full and manifest.is_current("C", fp, out_dir / "EVIDENCE_BRIEF.md"):
+            print("Task C skipped (inputs unchanged).")
+        else:
+            print("Running Task C (Evidence Brief)...")
+            task_C_brief(docs, out_dir, dry_run=args.dry_run)
+            manifest.record("C", fp)
+            manifest.save()
+            regenerated += 1
+            print("Task C complete.")
 
-    print(f"Outputs written to: {out_dir}")
-    # PDF export stage (now also runs in dry-run for layout testing)
+    print(f"Outputs written to: {out_dir} ({regenerated} regenerated)")
+    if client is not None and client.cache is not None:
+        print(client.cache.stats_line())
+    if extract_cache is not None:
+        print(extract_cache.stats_line())
+
+    # Export stages only rerun when the set of markdown outputs changed
     pdf_dir = Path("legal_export/pdf")
+    export_fp = manifest.set_fingerprint(sorted(out_dir.glob("*.md")) + sorted(out_dir.glob("SUMMARY_*.json")), str(pdf_dir), mode, ",".join(sorted(tasks)), "binder" if args.binder else "")
+    if not args.full and manifest.is_current("export", export_fp, pdf_dir):
+        print("PDF export and Excel sync skipped (outputs unchanged).")
+        return
+    export_ok = True
+    # PDF export stage (now also runs in dry-run for layout testing)
     try:
-        converted = bulk_convert(out_dir, pdf_dir)
-        print(f"PDF export complete: {converted} files -> {pdf_dir}")
+        report = bulk_convert(out_dir, pdf_dir, workers=args.pdf_workers, force=args.full)
+        print(f"PDF export complete: {summarize_report(report)} -> {pdf_dir}")
+        failed = [r for r in report if r["status"] == "failed"]
+        if failed:
+            export_ok = False
+            for r in failed:
+                print(f"  PDF failed: {r['file']}: {r['error']}")
     except Exception as e:
+        export_ok = False
         print(f"PDF export skipped (error): {e}")
+    if args.binder:
+        try:
+            binder = build_binder(out_dir, pdf_dir)
+            print(f"Exhibit binder: {len(binder['exhibits'])} exhibits, {binder['pages']} pages -> {pdf_dir / binder['binder']}")
+        except Exception as e:
+            export_ok = False
+            print(f"Exhibit binder skipped (error): {e}")
 
     # Excel sync stage
     excel_path = Path("MASTER_JUSTICE_FILE_SUPREME_v1.xlsx")
     try:
-        added = sync_markdowns(out_dir, excel_path, ",".join(sorted(tasks)), args.children, pdf_dir if not args.dry_run else None)
-        print(f"Excel sync: {added} new rows into AI_Outputs sheet.")
+        added = sync_markdowns(out_dir, excel_path, ",".join(sorted(tasks)), args.children,
+                               pdf_dir if not args.dry_run else None, export_excel=args.excel)
+        print(f"Excel sync: {added} new rows recorded in the AI outputs index.")
     except Exception as e:
+        export_ok = False
         print(f"Excel sync skipped (error): {e}")
+    if export_ok:
+        manifest.record("export", export_fp)
+        manifest.save()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,88 @@
+"""Benchmark: per-statistic DataFrame filters vs the shared case stats engine.
+
+Run:
+  python pipeline/diagnostics/bench_case_stats.py [--records 100000]
+
+Legacy is what the "📈 Case Summary" sheet and
+``JusticeFileManager.generate_case_summary`` used to do: one boolean mask or
+``.str.contains`` scan over all rows per statistic, plus ``value_counts`` /
+``unique``. The engine (pipeline/utils/case_stats.py) factorizes each column
+once. Both are run on the same synthetic records and compared.
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from pipeline.utils.case_stats import AGENCY_GROUPS, PATTERN_GROUPS, SEVERITY_ORDER, compute_case_stats  # noqa: E402
+
+PATTERNS = ["🟥 CPS Minimization", "🟥 Omission", "🟩 Validation", "🟩 Victory", "🟦 Legal Action", "🟨 Concern", None]
+AGENCIES = ["CPS", "YWCA / CPS", "Circuit Court", "Stephanie's Attorney", "State Review Committee", "Police", None]
+LAWS = ["MCL 722.638", "MCL 722.628", "MCL 722.638, Court Rules", "N/A", None]
+
+
+def make_frame(n: int, seed: int = 7) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    pick = lambda values: [rnd.choice(values) for _ in range(n)]  # noqa: E731
+    return pd.DataFrame({
+        "Filename": [f"Exhibit {i:06d}.pdf" for i in range(n)],
+        "Summary": [f"Finding {i}" for i in range(n)],
+        "Pattern": pick(PATTERNS), "Agency": pick(AGENCIES), "Law Violated": pick(LAWS),
+        "Smoking Gun": pick(["Yes", "No", "Review Needed"]), "Top 5": pick(["Yes", "No", "No", "No"]),
+        "Misconduct?": pick(["Yes", "No", "Yes (by CPS)"]), "needsReview": pick([True, False, False]),
+        "severity": pick(["High", "Medium", "Low", None]),
+    })
+
+
+def legacy_stats(df: pd.DataFrame) -> dict:
+    sev = df["severity"].fillna("Unknown").value_counts().reindex(SEVERITY_ORDER, fill_value=0)
+    top5_smoking = df[(df["Top 5"] == "Yes") & (df["Smoking Gun"] == "Yes")]
+    return {
+        "total": len(df),
+        "smoking_guns": len(df[df["Smoking Gun"] == "Yes"]),
+        "top5": len(df[df["Top 5"] == "Yes"]),
+        "misconduct": len(df[df["Misconduct?"] == "Yes"]),
+        "law_violations": len(df[df["Law Violated"] != "N/A"]),
+        "needs_review": int(df["needsReview"].fillna(False).sum()),
+        "patterns": {k: int(v) for k, v in df["Pattern"].value_counts().items()},
+        "agencies": {k: int(v) for k, v in df["Agency"].value_counts().items()},
+        "pattern_groups": {c: len(df[df["Pattern"].str.contains(c, na=False)]) for c in PATTERN_GROUPS},
+        "agency_groups": {rx: len(df[df["Agency"].str.contains(rx, na=False)]) for rx in AGENCY_GROUPS},
+        "severity": {k: int(v) for k, v in sev.items()},
+        "laws": [v for v in df[df["Law Violated"] != "N/A"]["Law Violated"].unique() if pd.notna(v)],
+        "top5_smoking": list(zip(top5_smoking["Filename"], top5_smoking["Summary"])),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    df = make_frame(args.records)
+
+    timings = {}
+    for label, fn in (("legacy", legacy_stats), ("engine", compute_case_stats)):
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            result = fn(df)
+        timings[label] = (time.perf_counter() - t0) / args.repeat
+        print(f"{label:7} {timings[label] * 1000:8.1f} ms  ({args.records} records)")
+        if label == "legacy":
+            expected = result
+    got = vars(result)
+    mismatched = [k for k, v in expected.items() if got[k] != v]
+    print(f"speedup {timings['legacy'] / timings['engine']:.1f}x; "
+          f"results match: {not mismatched}{'' if not mismatched else ' ' + str(mismatched)}")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
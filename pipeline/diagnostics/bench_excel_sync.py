@@ -0,0 +1,94 @@
+"""Benchmark: AI_Outputs sync against a large workbook.
+
+Run:
+  python pipeline/diagnostics/bench_excel_sync.py [--rows 50000] [--new 25]
+
+Builds a workbook whose AI_Outputs sheet already has ``--rows`` rows, then times
+each sync path on a copy of it, alternating runs that add ``--new`` unseen
+summaries with repeat runs where everything is already recorded (the common
+case). The first sync run seeds the AI outputs index from the sheet.
+"legacy" is the previous algorithm (full load, per-row scan, save every run),
+"sync" also regenerates the sheet (``--excel``), "index" is the default run.
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from openpyxl import Workbook, load_workbook  # noqa: E402
+
+from pipeline.utils.excel_sync import HEADERS, build_rows, sync_markdowns  # noqa: E402
+
+SUMMARY = """# Document Summary
+Include: Yes
+Smoking Gun: No
+Top 5: No
+Primary Pattern: RED_Omission
+Tags: [CPS, Police]
+"""
+
+
+def _legacy_sync(md_dir: Path, excel_path: Path, tasks: str, children: str, pdf_root) -> int:
+    wb = load_workbook(excel_path)
+    ws = wb['AI_Outputs']
+    existing = {row[1].value for row in ws.iter_rows(min_row=2, values_only=False)}
+    rows = build_rows(sorted(md_dir.glob('*.md')), existing, tasks, children, pdf_root)
+    for row in rows:
+        ws.append(row)
+    wb.save(excel_path)
+    return len(rows)
+
+
+def _make_workbook(path: Path, rows: int) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('AI_Outputs')
+    ws.append(HEADERS)
+    for i in range(rows):
+        ws.append(['2025-01-01T00:00:00Z', f'doc_{i:06d}.md', 'A', 'Jace,Josh', 'Yes', 'No', 'No',
+                   'RED_Omission', 'CPS, Police', f'AI_Outputs/SUMMARY_doc_{i:06d}.md', ''])
+    wb.save(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--new', type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base = tmp / 'base.xlsx'
+        t0 = time.perf_counter()
+        _make_workbook(base, args.rows)
+        print(f"workbook: {args.rows} AI_Outputs rows, {base.stat().st_size / 1e6:.1f} MB "
+              f"(built in {time.perf_counter() - t0:.1f}s)")
+        md_dir = tmp / 'md'
+        md_dir.mkdir()
+        for i in range(0, args.rows, max(1, args.rows // 25)):
+            (md_dir / f'SUMMARY_doc_{i:06d}.md').write_text(SUMMARY, encoding='utf-8')
+
+        for label, fn, extra in (('legacy', _legacy_sync, {}), ('sync', sync_markdowns, {'export_excel': True}),
+                                 ('index', sync_markdowns, {})):
+            target = tmp / f'{label}.xlsx'
+            shutil.copy(base, target)
+            for run in ('new rows', 'no change', 'new rows', 'no change'):
+                if run == 'new rows':
+                    batch = len(list(md_dir.glob('SUMMARY_new_*.md')))
+                    for i in range(batch, batch + args.new):
+                        (md_dir / f'SUMMARY_new_{i:04d}.md').write_text(SUMMARY, encoding='utf-8')
+                t0 = time.perf_counter()
+                added = fn(md_dir, target, 'A', 'Jace,Josh', None, **extra)
+                print(f"{label:<7} {run:<10} {time.perf_counter() - t0:7.2f}s  added={added}")
+            for stale in md_dir.glob('SUMMARY_new_*.md'):
+                stale.unlink()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Benchmark: row-by-row integrity checks vs the vectorized rule set.
+
+Run:
+  python pipeline/diagnostics/bench_integrity.py [--records 100000]
+
+Legacy is what ``JusticeFileManager.validate_data_integrity`` used to do: one
+``iterrows`` pass checking Summary / Smoking Gun per row, plus exact duplicate
+filenames. The rule engine (pipeline/utils/integrity.py) runs the full rule set
+(required fields, dates, enums, Contradicts references, near-duplicates) over
+the same synthetic records; the checks both implement are compared.
+
+"rules" is the manager / CLI path: the cross-reference graph is built once and
+saved (it is reused until the records change), and validation takes the
+unresolved references from it. "no graph" resolves them from scratch.
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from pipeline.utils.integrity import validate_records  # noqa: E402
+from pipeline.utils.xref_graph import load_or_build  # noqa: E402
+
+PATTERNS = ["🟥 CPS Minimization", "🟩 Validation", "🟦 Legal Action", "🟨 Review Needed", "Concern", None]
+STATUSES = ["✅ Include", "⬜ Review", "Done", None]
+SEVERITIES = ["High", "Medium", "Low", "Unknown", "Critical", None]
+DATES = ["2020-05-23", "2021-09-15", "5/23/20", "YYYY-MM-DD", "", None]
+
+def make_frame(n: int, seed: int = 11) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    pick = lambda values: [rnd.choice(values) for _ in range(n)]  # noqa: E731
+    names = [f"Exhibit {i:06d}, 5.23.20.pdf" for i in range(n)]
+    for i in range(0, n, 997):  # a few exact and near duplicates
+        names[i] = names[i - 1] if i % 2 else names[i - 1].replace(".pdf", " (1).PDF")
+    refs = [", ".join(f"exhibit {rnd.randrange(n * 11 // 10):06d} 5/23/20" for _ in range(rnd.randrange(3)))
+            for _ in range(n)]
+    return pd.DataFrame({
+        "Filename": names, "Date": pick(DATES), "Type": pick(["CPS Report", "Court Order", None]),
+        "Summary": pick(["Finding", "", "[SUMMARY NEEDED - Review document]", None]),
+        "Smoking Gun": pick(["Yes", "No", "Review Needed"]), "Pattern": pick(PATTERNS),
+        "Status": pick(STATUSES), "severity": pick(SEVERITIES), "Contradicts": refs,
+    })
+
+def legacy_validate(df: pd.DataFrame) -> list:
+    issues = []
+    for idx, row in df.iterrows():
+        if pd.isna(row.get('Summary')) or row.get('Summary') == "":
+            issues.append(f"Row {idx+1}: Missing summary for {row.get('Filename', 'Unknown')}")
+        if row.get('Smoking Gun') == "Review Needed":
+            issues.append(f"Row {idx+1}: Smoking Gun status needs review for {row.get('Filename', 'Unknown')}")
+    duplicates = df['Filename'].duplicated()
+    if duplicates.any():
+        issues.append(f"Duplicate filenames found: {df[duplicates]['Filename'].tolist()}")
+    return issues
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    df = make_frame(args.records)
+
+    t0 = time.perf_counter()
+    legacy = legacy_validate(df)
+    t_legacy = time.perf_counter() - t0
+    print(f"legacy  {t_legacy * 1000:8.1f} ms  ({args.records} records, {len(legacy)} issues)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "master.xref.npz"
+        t0 = time.perf_counter()
+        load_or_build(df, path)
+        print(f"graph   {(time.perf_counter() - t0) * 1000:8.1f} ms  (built and saved once per change of the records)")
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            report = validate_records(df, graph=load_or_build(df, path)[0])
+        t_rules = (time.perf_counter() - t0) / args.repeat
+    t0 = time.perf_counter()
+    plain = validate_records(df)
+    t_plain = time.perf_counter() - t0
+    counts = report.to_dict()["by_rule"]
+    print(f"rules   {t_rules * 1000:8.1f} ms  ({args.records} records, {len(report.issues)} issues, saved graph loaded)")
+    print(f"no graph{t_plain * 1000:8.1f} ms  (references resolved from scratch)")
+    for name, count in counts.items():
+        print(f"        {name}: {count}")
+
+    # legacy's empty-summary rows are a subset of 'required' (which also flags [placeholders])
+    blank = (df["Summary"].isna() | (df["Summary"] == "")).sum()
+    expected = {"review:Smoking Gun": int((df["Smoking Gun"] == "Review Needed").sum()),
+                "duplicate exact": int(df["Filename"].duplicated().sum())}
+    got = {"review:Smoking Gun": counts.get("review:Smoking Gun", 0),
+           "duplicate exact": sum(1 for i in report.issues if i["rule"] == "duplicate" and i["level"] == "error")}
+    ok = got == expected and counts.get("required:Summary", 0) >= blank and plain.issues == report.issues
+    print(f"speedup {t_legacy / t_rules:.1f}x; shared checks match: {ok}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Benchmark: master records in Python source vs the SQLite master store.
+
+Run:
+  python pipeline/diagnostics/bench_master_store.py [--records 100000]
+
+Writes ``--records`` master records both ways in a temp folder, then times
+loading them (legacy: slice the ``master_data`` literal out of the .py and exec
+it, as JusticeFileManager did; store: ``load_dataframe``) and adding one record
+(legacy: splice it into the .py, rewriting the file; store: one INSERT).
+Compiling a literal that large needs several GB of memory, so the legacy side
+runs on the first ``--legacy-records`` records only.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from pipeline.utils.master_store import MasterStore, load_dataframe  # noqa: E402
+
+
+def make_record(i: int) -> dict:
+    return {
+        "Filename": f"Exhibit {i:06d} CPS Report {i % 12 + 1}.{i % 28 + 1}.21.pdf",
+        "Date": f"2021-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        "Type": "CPS Report", "Agency": "CPS", "Children": "Jace, Josh", "Parent": "Stephanie",
+        "Pattern": "🟥 Omission", "Summary": f"Caseworker omits finding {i} from the report.",
+        "Misconduct?": "Yes", "Law Violated": "MCL 722.638", "Contradicts": f"Exhibit {i + 1:06d}",
+        "Smoking Gun": "No", "Reviewer Note": "", "Faith/Prayer": "", "Phase": "Phase 3", "Batch": i % 7,
+        "Status": "⬜ Review", "Exhibit Cat.": "CPS", "AI Summary": "", "Cross-Link": "", "Top 5": "No",
+        "entities": ["CPS", "Jace"] if i % 5 == 0 else [], "legalCodes": [], "violations": [],
+        "contradictions": [], "needsReview": i % 3 == 0, "severity": "Medium",
+    }
+
+
+def _legacy_load(py_path: Path) -> pd.DataFrame:
+    namespace: dict = {}
+    content = py_path.read_text(encoding="utf-8")
+    start = content.find("master_data = [")
+    end = content.find("\n]", start) + 2  # the old "first ]" slice breaks on nested lists
+    exec(content[start:end], namespace)
+    return pd.DataFrame(namespace["master_data"])
+
+
+def _legacy_append(py_path: Path, doc: dict) -> None:
+    content = py_path.read_text(encoding="utf-8")
+    insert_point = content.find("\n]", content.find("master_data = ["))
+    entry = "    {\n" + "".join(f'        "{k}": {v!r},\n' for k, v in doc.items()) + "    }"
+    py_path.write_text(content[:insert_point] + ",\n" + entry + content[insert_point:], encoding="utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--legacy-records", type=int, default=10000)
+    args = parser.parse_args()
+    records = [make_record(i) for i in range(args.records)]
+    extra = make_record(args.records)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        py_path = tmp / "MASTER_JUSTICE_FILE_SUPREME.py"
+        legacy_n = min(args.legacy_records, args.records)
+        body = ",\n".join(f"    {r!r}" for r in records[:legacy_n])
+        py_path.write_text(f"master_data = [\n{body}\n]\n", encoding="utf-8")
+        db_path = tmp / "master_records.sqlite"
+        t0 = time.perf_counter()
+        store = MasterStore(db_path)
+        store.append(records)
+        store.close()
+        print(f"store: {args.records} records, {db_path.stat().st_size / 1e6:.1f} MB (bulk insert {time.perf_counter() - t0:.2f}s); "
+              f"legacy source: {legacy_n} records, {py_path.stat().st_size / 1e6:.1f} MB")
+
+        t0 = time.perf_counter()
+        legacy_df = _legacy_load(py_path)
+        t_legacy = time.perf_counter() - t0
+        print(f"load    legacy {t_legacy:6.2f}s for {len(legacy_df)} records ({t_legacy * 1e6 / len(legacy_df):.0f} ms/1k)")
+        for label in ("store, first load (writes Parquet snapshot)", "store"):
+            t0 = time.perf_counter()
+            df = load_dataframe(db_path)
+            t_store = time.perf_counter() - t0
+            print(f"load    {t_store:6.2f}s for {len(df)} records ({t_store * 1e6 / len(df):.1f} ms/1k)  {label}")
+
+        t0 = time.perf_counter()
+        _legacy_append(py_path, extra)
+        t_legacy = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        store = MasterStore(db_path)
+        store.append([extra])
+        store.close()
+        t_store = time.perf_counter() - t0
+        print(f"append  legacy {t_legacy * 1000:6.1f}ms ({legacy_n} records)  store {t_store * 1000:6.1f}ms ({args.records} records)")
+        t0 = time.perf_counter()
+        after = load_dataframe(db_path)
+        print(f"load    {time.perf_counter() - t0:6.2f}s for {len(after)} records  store, snapshot + appended tail")
+        head = df.iloc[:len(legacy_df)].reset_index(drop=True)
+        same = head.astype(str).equals(legacy_df[df.columns].astype(str))
+        print(f"store round-trip matches source: {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
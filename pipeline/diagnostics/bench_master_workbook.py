@@ -0,0 +1,166 @@
+"""Benchmark: in-memory master workbook build vs the streamed single-save builder.
+
+Run:
+  python pipeline/diagnostics/bench_master_workbook.py [--sizes 1000,10000,100000]
+
+For each size, builds MASTER_JUSTICE_FILE_SUPREME_v1.xlsx both ways in a temp
+folder and reports wall time and peak Python memory (tracemalloc, second
+run). Legacy is the old script body: ``Workbook()`` + ``dataframe_to_rows``,
+separate walks for pattern colors and column widths, ``wb.save`` and two
+``pd.ExcelWriter(mode="a")`` reopens for Records and Summary. It keeps every cell in memory and re-parses
+the saved file twice, so it runs up to ``--legacy-max`` records only.
+
+Then stores the records in a master store, builds from it and patches with
+``update_master_workbook``: once with nothing changed and once with one
+appended record that carries only a few fields (the rest empty, as from
+``master_store import-summaries``). Up to
+``--legacy-max`` records the patched file is reopened and the appended row
+checked; a mismatch exits with 1.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+from openpyxl import Workbook, load_workbook  # noqa: E402
+from openpyxl.styles import Font, PatternFill  # noqa: E402
+from openpyxl.utils.dataframe import dataframe_to_rows  # noqa: E402
+
+from pipeline.diagnostics.bench_master_store import make_record  # noqa: E402
+from pipeline.utils.case_stats import compute_case_stats  # noqa: E402
+from pipeline.utils.master_store import MasterStore, normalize_record  # noqa: E402
+from pipeline.utils.master_workbook import (  # noqa: E402
+    MAIN_SHEET, PATTERN_COLORS, build_master_workbook, case_summary_rows, sheet_frame, summary_tables,
+    update_master_workbook,
+)
+
+PATTERNS = ["🟥 Omission", "🟦 Motion", "🟩 Validation", "🟨 Concern", ""]
+
+
+def make_frame(n: int) -> pd.DataFrame:
+    rows = []
+    for i in range(n):
+        rec = make_record(i)
+        rec["Pattern"] = PATTERNS[i % len(PATTERNS)]
+        rec["Smoking Gun"] = "Yes" if i % 11 == 0 else "No"
+        rec["Top 5"] = "Yes" if i % 97 == 0 else "No"
+        rec["severity"] = ["High", "Medium", "Low", None][i % 4]
+        rows.append(normalize_record(rec))
+    return pd.DataFrame(rows)
+
+
+def _legacy_build(df: pd.DataFrame, path: Path) -> None:
+    sheet_df = sheet_frame(df)
+    wb = Workbook()
+    wb.active.title = "🙏 Dedication & Prayer"
+    ws = wb.create_sheet(title="⚖️ Justice Master Table")
+    for r_idx, row in enumerate(dataframe_to_rows(sheet_df, index=False, header=True), 1):
+        ws.append(row)
+        if r_idx == 1:
+            for c in ws[r_idx]:
+                c.font = Font(bold=True, color="FFFFFF", size=12)
+                c.fill = PatternFill(start_color="2F4F4F", end_color="2F4F4F", fill_type="solid")
+    cols = {c.value: i for i, c in enumerate(ws[1])}
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        pat = str(row[cols["Pattern"]].value)
+        for code, color in PATTERN_COLORS.items():
+            if pat.startswith(code):
+                for cell in row:
+                    if not cell.fill.start_color.rgb or cell.fill.start_color.rgb == "00000000":
+                        cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        for name, shown, color in (("Smoking Gun", "🔥 YES", "8B0000"), ("Top 5", "⭐ YES", "DAA520")):
+            cell = row[cols[name]]
+            if str(cell.value) == "Yes":
+                cell.font = Font(bold=True, color=color)
+                cell.value = shown
+    for column in ws.columns:
+        width = max(len(str(cell.value)) for cell in column)
+        ws.column_dimensions[column[0].column_letter].width = min(width + 2, 50)
+    ws_summary = wb.create_sheet(title="📈 Case Summary")
+    for item in case_summary_rows(compute_case_stats(df)):
+        ws_summary.append(item)
+    wb.save(path)
+    with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as xw:
+        sheet_df.to_excel(xw, sheet_name="Records", index=False)
+    metrics, severity = summary_tables(compute_case_stats(df))
+    with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="overlay") as xw:
+        pd.DataFrame(metrics, columns=["Metric", "Value"]).to_excel(xw, sheet_name="Summary", index=False)
+        pd.DataFrame(severity, columns=["Severity", "Count"]).to_excel(xw, sheet_name="Summary", index=False, startcol=4)
+
+
+def _measure(fn, *args):
+    """(seconds, peak MB); timed on its own run, since tracemalloc slows allocation-heavy code several-fold."""
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def _check_patch(df: pd.DataFrame, tmp: Path, verify: bool) -> tuple:
+    """(unchanged s, append s, ok): the records go through a master store, the workbook is built
+    once, then patched with nothing new and with one appended record that has only a few fields."""
+    store = MasterStore(tmp / f"patch_{len(df)}.sqlite")
+    path = tmp / f"patch_{len(df)}.xlsx"
+    try:
+        store.append(df.to_dict("records"))
+        build_master_workbook(store.dataframe(), path)
+        t0 = time.perf_counter()
+        same = update_master_workbook(store.dataframe(), path)
+        t_same = time.perf_counter() - t0
+        store.append([{"Filename": "late_arrival.pdf", "Date": "2024-05-01", "Summary": "Added later"}])
+        t0 = time.perf_counter()
+        update = update_master_workbook(store.dataframe(), path)
+        t_add = time.perf_counter() - t0
+    finally:
+        store.close()
+    ok = same.mode == "unchanged" and update.mode == "patch" and update.added == 1
+    if ok and verify:
+        wb = load_workbook(path, read_only=True)
+        try:
+            rows = list(wb[MAIN_SHEET].iter_rows(values_only=True))
+        finally:
+            wb.close()
+        header, last = rows[0], rows[-1]
+        ok = len(rows) == len(df) + 2 and last[header.index("Filename")] == "late_arrival.pdf" \
+            and last[header.index("Reviewer Note")] is None
+    return t_same, t_add, ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    args = parser.parse_args()
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for n in (int(s) for s in args.sizes.split(",")):
+            df = make_frame(n)
+            path = tmp / f"stream_{n}.xlsx"
+            t, mem = _measure(build_master_workbook, df, path)
+            line = (f"{n:>7} records  stream {t:6.2f}s ({t * 1e6 / n:5.1f} ms/1k) peak {mem:7.1f} MB"
+                    f"  file {path.stat().st_size / 1e6:5.1f} MB")
+            if n <= args.legacy_max:
+                t, mem = _measure(_legacy_build, df, tmp / f"legacy_{n}.xlsx")
+                line += f"  |  legacy {t:6.2f}s ({t * 1e6 / n:5.1f} ms/1k) peak {mem:7.1f} MB"
+            print(line)
+            t_same, t_add, patched = _check_patch(df, tmp, verify=n <= args.legacy_max)
+            print(f"{'':>7}          patch  unchanged {t_same:6.2f}s  one sparse record appended {t_add:6.2f}s"
+                  f"  {'ok' if patched else 'MISMATCH'}")
+            ok &= patched
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
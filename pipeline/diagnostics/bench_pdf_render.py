@@ -0,0 +1,106 @@
+"""Micro-benchmark: per-document PDF render cost, per-call setup vs PdfRenderer.
+
+Run:
+  python pipeline/diagnostics/bench_pdf_render.py [--files 500] [--stage html|pdf]
+
+"legacy" repeats the old per-document work: optional imports, a fresh
+``markdown.markdown`` converter, and a document with the stylesheet inlined
+(re-parsed by WeasyPrint every time). "renderer" uses one ``PdfRenderer``.
+Both render the same synthetic A_SUMMARY-shaped markdown files in-process.
+``--stage html`` times markdown -> HTML only (useful without WeasyPrint).
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from pipeline.utils import pdf_export  # noqa: E402
+from pipeline.utils.pdf_export import PdfRenderer  # noqa: E402
+
+SAMPLE = """# Document Summary
+
+**File:** exhibit_{i}.pdf
+**Date:** 2024-03-{day:02d}
+
+## Key Facts
+- Caseworker visit recorded on 2024-03-{day:02d}; injuries noted.
+- Police report #{i} lists a different timeline.
+- MCL 722.628 cited by the agency.
+
+## Contradictions
+| Statement | Source | Conflicts with |
+|---|---|---|
+| No marks observed | CPS note {i} | Medical exam {i} |
+| Child not present | Police {i} | School record {i} |
+
+```
+Quoted: "we did not see anything" - report {i}
+```
+"""
+
+
+def _legacy_convert(md_path: Path, pdf_dir: Path) -> None:
+    md_text = md_path.read_text(encoding="utf-8")
+    md_mod = pdf_export.try_import_markdown()
+    body = md_mod.markdown(md_text, extensions=pdf_export.MD_EXTENSIONS) if md_mod else f"<pre>{md_text}</pre>"
+    html = pdf_export.HTML_WRAPPER.replace("{content}", body)
+    HTML = pdf_export.try_import_weasyprint()
+    pdf_path = pdf_dir / (md_path.stem + ".pdf")
+    if HTML:
+        HTML(string=html).write_pdf(str(pdf_path))
+    else:
+        pdf_export.text_to_pdf_fallback(md_text, pdf_path)
+
+
+def _legacy_html(md_path: Path) -> str:
+    md_mod = pdf_export.try_import_markdown()
+    md_text = md_path.read_text(encoding="utf-8")
+    return pdf_export.HTML_WRAPPER.replace("{content}", md_mod.markdown(md_text, extensions=pdf_export.MD_EXTENSIONS))
+
+
+def _time(label: str, fn, files) -> float:
+    t0 = time.perf_counter()
+    for f in files:
+        fn(f)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<9} {elapsed:7.2f}s total  {1000 * elapsed / len(files):7.2f} ms/doc")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--stage", choices=("html", "pdf"), default="pdf")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = Path(tmp) / "md", Path(tmp) / "pdf"
+        src.mkdir()
+        out.mkdir()
+        files = []
+        for i in range(args.files):
+            path = src / f"SUMMARY_{i:04d}.md"
+            path.write_text(SAMPLE.format(i=i, day=i % 28 + 1), encoding="utf-8")
+            files.append(path)
+
+        t0 = time.perf_counter()
+        renderer = PdfRenderer()
+        setup = time.perf_counter() - t0
+        print(f"{args.files} files, stage={args.stage}, engine={renderer.engine}, renderer setup {setup * 1000:.1f} ms")
+        if args.stage == "html":
+            legacy = _time("legacy", _legacy_html, files)
+            shared = _time("renderer", lambda f: renderer.md_to_html(f.read_text(encoding="utf-8")), files)
+        else:
+            legacy = _time("legacy", lambda f: _legacy_convert(f, out), files)
+            shared = _time("renderer", lambda f: renderer.convert_file(f, out), files)
+        print(f"speedup   {legacy / shared:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
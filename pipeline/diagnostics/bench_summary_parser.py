@@ -0,0 +1,156 @@
+"""Benchmark: summary parsing, legacy nested-regex loop vs single-pass parser.
+
+Run:
+  python pipeline/diagnostics/bench_summary_parser.py [--count 10000]
+
+Generates A_SUMMARY-schema summaries in memory (header, fact bullets, the three
+tables, classification, inclusion block, tags) and times both parsers over them.
+Also counts disagreements on the Yes/No flags, where the legacy substring test
+('y' in value) mis-reads values such as "Unknown" or "No".
+"""
+from __future__ import annotations
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from pipeline.utils.excel_sync import parse_summary  # noqa: E402
+from pipeline.utils.summary_parser import parse_summary_record  # noqa: E402
+
+LEGACY_PATTERNS = [
+    ('include', [re.compile(r'^Include\??.*?:\s*(.*)$', re.I), re.compile(r'^Include Decision\s*:?\s*(.*)$', re.I)]),
+    ('smoking', [re.compile(r'^Smoking Gun\??.*?:\s*(.*)$', re.I), re.compile(r'^Is Smoking Gun\s*:?\s*(.*)$', re.I)]),
+    ('top5', [re.compile(r'^Top\s*5\??.*?:\s*(.*)$', re.I), re.compile(r'^Top Five\s*:?\s*(.*)$', re.I)]),
+    ('primary_pattern', [re.compile(r'^Primary Pattern\s*:?\s*(.*)$', re.I), re.compile(r'^Key Pattern\s*:?\s*(.*)$', re.I)]),
+    ('tags', [re.compile(r'^Tags?\s*:?\s*\[(.*?)]\s*$', re.I), re.compile(r'^Tags?\s*:?\s*(.+)$', re.I)]),
+]
+
+
+def legacy_parse_summary(md_text: str) -> Dict[str, str]:
+    """The previous excel_sync.parse_summary, verbatim in behaviour."""
+    data: Dict[str, str] = {}
+    for raw_line in md_text.splitlines():
+        line = raw_line.strip()
+        if not line or len(line) > 500:
+            continue
+        for key, patterns in LEGACY_PATTERNS:
+            if key in data:
+                continue
+            for rx in patterns:
+                m = rx.match(line)
+                if m:
+                    data[key] = m.group(1).strip().rstrip('#*').strip() or 'UNKNOWN'
+                    break
+
+    def norm_yes_no(v: Optional[str]) -> str:
+        if not v:
+            return 'UNKNOWN'
+        v2 = v.lower()
+        if any(tok in v2 for tok in ['yes', 'y']):
+            return 'Yes'
+        if any(tok in v2 for tok in ['no', 'n']):
+            return 'No'
+        return 'UNKNOWN'
+    for key in ('include', 'smoking', 'top5'):
+        data[key] = norm_yes_no(data.get(key))
+    return data
+
+
+PATTERNS = ['RED_Omission', 'RED_CPS_Minimization', 'GREEN_Validation', 'GREEN_Victory', 'BLUE_Legal_Action']
+FLAGS = ['Yes', 'No', 'No - insufficient', 'Unknown', '**Yes**', 'No.', 'UNKNOWN']
+
+
+def make_summary(rng: random.Random, i: int) -> str:
+    def rows(n, fn):
+        return "\n".join(fn(k) for k in range(1, n + 1))
+    facts = rows(rng.randint(3, 5), lambda k: f"- Fact {k}: caseworker note on visit {k} for exhibit {i}.")
+    findings = rows(rng.randint(2, 6), lambda k: f'| {k} | Finding {k} about injuries | "quoted text {k}" p{k}:¶2 '
+                                                 f'| High | {rng.choice(PATTERNS)} |')
+    violations = rows(rng.randint(1, 4), lambda k: f"| {k} | MCL 722.6{k:02d} | p{k}:¶1 | omitted report {k} | mandatory duty |")
+    conflicts = rows(rng.randint(0, 3), lambda k: f"| exhibit_{rng.randint(0, 9999):05d}.pdf | timeline | before | after "
+                                                  f"| {rng.choice('LMH')} |")
+    return f"""# Document Summary
+Filename: exhibit_{i:05d}.pdf
+Date: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}
+Type: CPS Investigation Report
+Agency: {rng.choice(['CPS', 'Police', 'School', 'Hospital'])}
+Children: Jace, Josh
+Parent: Stephanie
+
+## 1. Core Fact Pattern (3-5 bullet points)
+{facts}
+
+## 2. Key Findings With Citations
+| # | Finding | Support (quote w/ page:¶) | Impact | Pattern Tag |
+|---|---------|---------------------------|--------|-------------|
+{findings}
+
+## 3. Misconduct / Violations Table
+| # | Law / Policy | Page:¶ | Quote / Omission | Rationale |
+|---|--------------|--------|------------------|-----------|
+{violations}
+
+## 4. Contradictions / Cross-Links
+| Ref Doc | Nature of Conflict | This Doc Position | Other Doc Position | Severity (L/M/H) |
+|---------|--------------------|-------------------|--------------------|------------------|
+{conflicts}
+
+## 5. Repeated Language / Omission Signals
+- "no concerns noted" repeated
+
+## 6. Agency Pattern Classification
+Primary Pattern: {rng.choice(PATTERNS)}
+Secondary Patterns: {rng.choice(PATTERNS)}, {rng.choice(PATTERNS)}
+
+## 7. Inclusion Recommendation
+Include? (Yes/No): {rng.choice(FLAGS)}
+Reason: contradicts exhibit {i + 1}
+Smoking Gun? (Yes/No): {rng.choice(FLAGS)}
+Top 5? (Yes/No): {rng.choice(FLAGS)}
+
+## 8. Prayer / Faith Note (if provided)
+None
+
+## 9. Export Tags
+Tags: [Pattern:{rng.choice(PATTERNS)}, Agency:CPS, Phase:1, Batch:{i % 7}]
+"""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=10000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+    docs = [make_summary(rng, i) for i in range(args.count)]
+    print(f"{len(docs)} summaries, {sum(map(len, docs)) / 1e6:.1f} MB")
+
+    t0 = time.perf_counter()
+    legacy = [legacy_parse_summary(d) for d in docs]
+    t_legacy = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for d in docs:
+        parse_summary(d)
+    t_sync = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    records = [parse_summary_record(d) for d in docs]
+    t_full = time.perf_counter() - t0
+    for label, t, what in (('legacy', t_legacy, 'row fields, old nested loops'),
+                           ('sync', t_sync, 'row fields, excel_sync.parse_summary'),
+                           ('full', t_full, 'whole schema incl. tables')):
+        print(f"{label:<7} {t:6.2f}s  {1e6 * t / len(docs):7.1f} us/doc  {t_legacy / t:5.2f}x  ({what})")
+
+    diffs = sum(1 for old, rec in zip(legacy, records)
+                for key in ('include', 'smoking', 'top5') if old[key] != rec.sync_fields()[key])
+    rows = sum(len(r.findings) + len(r.violations) + len(r.contradictions) for r in records)
+    print(f"table rows parsed: {rows}; Yes/No flags the legacy parser read differently: {diffs}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
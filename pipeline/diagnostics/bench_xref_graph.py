@@ -0,0 +1,125 @@
+"""Benchmark: cross-reference map vs the resolved cross-reference graph.
+
+Run:
+  python pipeline/diagnostics/bench_xref_graph.py [--records 100000] [--k 2]
+
+Legacy is what ``JusticeFileManager.generate_cross_reference_map`` used to do:
+``iterrows`` + comma split + one JSON dump, with nothing resolved. The graph
+(pipeline/utils/xref_graph.py) is built (exact keys + fuzzy index), saved,
+loaded again and queried. Synthetic references are exact filenames, respelled
+ones, partial names with the document's date, and free text; the share of
+each resolved to the intended record is reported.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd  # noqa: E402
+
+from pipeline.utils.xref_graph import CrossRefGraph  # noqa: E402
+
+DOC_TYPES = ["CPS Report", "Nurse Exam", "Court Order", "Motion", "Police Report", "Review Letter"]
+AGENCIES = ["CPS", "YWCA / CPS", "Circuit Court", "Police", "State Review Committee"]
+FREE_TEXT = ["Cited in court motions", "timeline.", "Multiple CPS reports 2020-2021", "[To be determined after review]"]
+
+def make_frame(n: int, seed: int = 5) -> tuple:
+    """(records, intended target per reference: [(row, kind, target or -1)])."""
+    rnd = random.Random(seed)
+    dates = [f"20{rnd.randrange(18, 24)}-{rnd.randrange(1, 13):02d}-{rnd.randrange(1, 29):02d}" for _ in range(n)]
+    types = [rnd.choice(DOC_TYPES) for _ in range(n)]
+    names = [f"{t} {i:06d} {d[5:7]}.{d[8:]}.{d[2:4]}.pdf" for i, (t, d) in enumerate(zip(types, dates))]
+    contradicts, cross, truth = [], [], []
+    for i in range(n):
+        refs = []
+        for _ in range(rnd.randrange(3)):
+            j = rnd.randrange(n)
+            style = rnd.randrange(4)
+            if style == 0:
+                refs.append((names[j], j, "exact"))
+            elif style == 1:
+                refs.append((names[j][:-4].upper().replace(".", "/"), j, "respelled"))
+            elif style == 2:
+                m, d, y = dates[j][5:7], dates[j][8:], dates[j][2:4]
+                refs.append((f"{types[j].split()[0]} {j:06d} {int(m)}/{int(d)}/{y}", j, "partial"))
+            else:
+                refs.append((rnd.choice(FREE_TEXT), -1, "free text"))
+        contradicts.append(", ".join(r for r, _, _ in refs) or None)
+        truth.extend((i, j, style) for _, j, style in refs)
+        cross.append(rnd.choice(FREE_TEXT))
+    df = pd.DataFrame({
+        "Filename": names, "Date": dates, "Type": types, "Agency": [rnd.choice(AGENCIES) for _ in range(n)],
+        "Contradicts": contradicts, "Cross-Link": cross, "Pattern": "🟥 Omission",
+        "Smoking Gun": [rnd.choice(["Yes", "No", "No", "No", "No"]) for _ in range(n)], "Top 5": "No",
+    })
+    return df, truth
+
+def legacy_map(df: pd.DataFrame, path: Path) -> dict:
+    cross_refs = {}
+    for idx, row in df.iterrows():
+        contradicts = str(row.get('Contradicts', ''))
+        cross_link = str(row.get('Cross-Link', ''))
+        refs = []
+        if contradicts and contradicts != 'nan':
+            refs.extend([r.strip() for r in contradicts.split(',')])
+        if cross_link and cross_link != 'nan':
+            refs.extend([r.strip() for r in cross_link.split(',')])
+        cross_refs[row['Filename']] = {'contradicts': contradicts, 'cross_links': cross_link, 'references': refs,
+                                       'pattern': row.get('Pattern', ''), 'smoking_gun': row.get('Smoking Gun', ''),
+                                       'top_5': row.get('Top 5', '')}
+    path.write_text(json.dumps(cross_refs, indent=2))
+    return cross_refs
+
+def timed(label: str, fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    print(f"{label:24} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+    return result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=2)
+    args = parser.parse_args()
+    df, truth = make_frame(args.records)
+    print(f"{args.records} records, {len(truth)} Contradicts references")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        timed("legacy map (json)", legacy_map, df, Path(tmp) / "cross_reference_map.json")
+        graph = timed("graph build", CrossRefGraph.build, df)
+        path = Path(tmp) / "master.xref.npz"
+        timed("graph save", graph.save, path)
+        graph = timed("graph load", CrossRefGraph.load, path)
+        size = path.stat().st_size
+    ids, _ = timed(f"within {args.k} hops", graph.within_hops, args.k)
+    comps = timed("components", graph.components)
+    top = timed("most contradicted", graph.most_contradicted, 10)
+    print(f"{len(graph.src)} links, {len(graph.unresolved_ref)} unresolved, {size / 1e6:.1f} MB on disk; "
+          f"{len(ids)} docs within {args.k} hops of {int(graph.smoking.sum())} smoking guns, "
+          f"{len(comps)} components (largest {len(comps[0]) if comps else 0}), top contradicted {top[:1]}")
+
+    contradicts = graph.kind == 0
+    linked = set(zip(graph.src[contradicts].tolist(), graph.dst[contradicts].tolist()))
+    ok = True
+    for style in ("exact", "respelled", "partial", "free text"):
+        cases = [(i, j) for i, j, s in truth if s == style]
+        if style == "free text":
+            print(f"  {style:10} {len(cases):7}  (no target)")
+            continue
+        hits = sum((i, j) in linked or i == j for i, j in cases)
+        print(f"  {style:10} {len(cases):7}  resolved {hits / max(1, len(cases)):.1%}")
+        ok &= style == "partial" or hits == len(cases)
+    intended = {(i, j) for i, j, _ in truth}
+    wrong = [(a, b) for a, b in linked if (a, b) not in intended]
+    print(f"  wrong links: {len(wrong)}")
+    return 0 if ok and not wrong else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,40 +2,351 @@
 
 Uncomment OpenAI code and set environment variable OPENAI_API_KEY to enable live calls.
 Falls back to stub responses when API key not set.
+
+Live completions are memoized in an on-disk, size-bounded LRU cache keyed by
+model, temperature, system prompt and prompt hash, so re-running the pipeline on
+unchanged inputs costs no network round trips.
+
+Batch use: ``acomplete`` / ``complete_many`` keep up to ``max_in_flight`` requests
+running per client (across every thread and event loop using it), pace them with
+token buckets for requests- and tokens-per-minute (env GPT5_RPM / GPT5_TPM /
+GPT5_MAX_IN_FLIGHT) and retry 429/5xx responses with jittered exponential backoff.
+Both limits serve waiters in arrival order.
+
+JSON mode: ``complete_json`` requests a JSON object (optionally constrained by a
+JSON schema via structured outputs); its completions are cached under separate keys.
 """
 from __future__ import annotations
+import asyncio
+import json
 import os
-from typing import List, Optional
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Union
+
+from pipeline.utils.io_utils import estimate_tokens, hash_text
 
 STUB = "[STUB COMPLETION – Replace with real GPT-5 output after enabling OpenAI API key]"
+DEFAULT_CACHE_DIR = Path("pipeline/cache/completions")
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+class CompletionCache:
+    """Directory-backed LRU cache: one file per completion, recency tracked by mtime."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> size in bytes, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        entries = sorted(self.cache_dir.glob("*.txt"), key=lambda p: p.stat().st_mtime)
+        for p in entries:
+            self._index[p.stem] = p.stat().st_size
+        self._total = sum(self._index.values())
+
+    @staticmethod
+    def make_key(model: str, temperature: float, system: str, prompt: str, max_tokens: int,
+                 response_format: Optional[dict] = None) -> str:
+        parts = [model, temperature, system, max_tokens, hash_text(prompt)]
+        if response_format:
+            parts.append(hash_text(json.dumps(response_format, sort_keys=True)))
+        material = json.dumps(parts)
+        return hash_text(material)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                text = path.read_text(encoding="utf-8")
+                os.utime(path)  # persist recency for the next run
+            except OSError:
+                self._total -= self._index.pop(key)
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        data = text.encode("utf-8")
+        with self._lock:
+            path = self._path(key)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._total += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            while self._total > self.max_bytes and len(self._index) > 1:
+                old_key, size = self._index.popitem(last=False)
+                self._path(old_key).unlink(missing_ok=True)
+                self._total -= size
+                self.evictions += 1
+
+    def stats_line(self) -> str:
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return (f"Completion cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), "
+                f"{self.evictions} evicted, {len(self._index)} entries / {self._total / 1e6:.1f} MB in {self.cache_dir}")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class TransientAPIError(Exception):
+    """Raised (or mapped from the SDK) for responses worth retrying."""
+    def __init__(self, status_code: int, message: str = ""):
+        super().__init__(message or f"HTTP {status_code}")
+        self.status_code = status_code
+
+def is_retryable(exc: BaseException) -> bool:
+    # openai>=1.0 errors expose status_code as well
+    return getattr(exc, "status_code", None) in RETRYABLE_STATUS or isinstance(exc, (TimeoutError, ConnectionError))
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` / 60 per second.
+
+    Callers reserve their tokens on arrival and the balance may go negative, so
+    each one sleeps until the requests ahead of it are paid for: first come,
+    first served, and a large request is never overtaken by smaller ones. State
+    is guarded by a thread lock (never held across an await), so one bucket can
+    pace coroutines running on several event loops / threads at once.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: float) -> float:
+        """Take ``amount`` (possibly into debt) and return the seconds until it is covered."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def _refund(self, amount: float) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)  # oversize requests wait for a full bucket
+        wait = self._reserve(amount)
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._refund(amount)
+                raise
+
+class SlotLimiter:
+    """Counting semaphore shared by coroutines on any thread / event loop, FIFO.
+
+    ``asyncio.Semaphore`` belongs to one loop; this one hands a freed slot to the
+    oldest waiter through its own loop (``call_soon_threadsafe``), so the limit
+    holds for the whole client however many loops drive it.
+    """
+
+    def __init__(self, slots: int):
+        self.free = slots
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self.free and not self._waiters:
+                self.free -= 1
+                return
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+            raise  # a slot granted meanwhile is passed on by _grant
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                fut = self._waiters.popleft()
+                try:
+                    fut.get_loop().call_soon_threadsafe(self._grant, fut)
+                    return
+                except RuntimeError:  # its loop is closed
+                    continue
+            self.free += 1
+
+    def _grant(self, fut: asyncio.Future) -> None:
+        if fut.done():  # cancelled after it was picked
+            self.release()
+        else:
+            fut.set_result(None)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+def _env_number(name: str) -> Optional[float]:
+    raw = os.getenv(name)
+    try:
+        return float(raw) if raw else None
+    except ValueError:
+        return None
 
 class GPT5Client:
-    def __init__(self, model: str = "gpt-5", temperature: float = 0.2):
+    def __init__(self, model: str = "gpt-5", temperature: float = 0.2, cache: Optional[CompletionCache] = None,
+                 max_in_flight: Optional[int] = None, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 max_retries: int = 5, backoff_base: float = 1.0, backoff_cap: float = 60.0):
         self.model = model
         self.temperature = temperature
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.live = bool(self.api_key)
+        self.cache = cache
+        self.max_in_flight = int(max_in_flight or _env_number("GPT5_MAX_IN_FLIGHT") or 8)
+        self.rpm = rpm if rpm is not None else _env_number("GPT5_RPM")
+        self.tpm = tpm if tpm is not None else _env_number("GPT5_TPM")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        # in-flight slots and RPM/TPM buckets are shared by every caller of this client
+        self._slots = SlotLimiter(self.max_in_flight)
+        self._rpm_bucket = TokenBucket(self.rpm) if self.rpm else None
+        self._tpm_bucket = TokenBucket(self.tpm) if self.tpm else None
         # To enable live mode install openai>=1.0 and uncomment below
         # from openai import OpenAI
         # self.client = OpenAI(api_key=self.api_key)
 
     def complete(self, system: str, prompt: str, max_tokens: int = 3000) -> str:
         if not self.live:
-            return f"SYSTEM:\n{system}\nPROMPT:\n{prompt[:500]}...\n{STUB}"
+            return self._stub(system, prompt)
+        key, cached = self._cache_lookup(system, prompt, max_tokens)
+        if cached is not None:
+            return cached
+        return self._complete_and_store(key, system, prompt, max_tokens)
+
+    def complete_json(self, system: str, prompt: str, schema: Optional[dict] = None,
+                      name: str = "record", max_tokens: int = 3000) -> str:
+        """Completion constrained to one JSON object (raw text; callers parse and validate).
+
+        With ``schema`` the request uses structured outputs (``json_schema``), else
+        plain JSON mode. Without an API key this returns the stub text, which is
+        not JSON, so callers must handle unparseable replies.
+        """
+        if schema is not None:
+            response_format = {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": True}}
+        else:
+            response_format = {"type": "json_object"}
+        if not self.live:
+            return self._stub(system, prompt)
+        key, cached = self._cache_lookup(system, prompt, max_tokens, response_format)
+        if cached is not None:
+            return cached
+        return self._complete_and_store(key, system, prompt, max_tokens, response_format)
+
+    def _stub(self, system: str, prompt: str) -> str:
+        return f"SYSTEM:\n{system}\nPROMPT:\n{prompt[:500]}...\n{STUB}"
+
+    def _cache_lookup(self, system: str, prompt: str, max_tokens: int, response_format: Optional[dict] = None):
+        if self.cache is None:
+            return None, None
+        key = CompletionCache.make_key(self.model, self.temperature, system, prompt, max_tokens, response_format)
+        return key, self.cache.get(key)
+
+    def _complete_and_store(self, key: Optional[str], system: str, prompt: str, max_tokens: int,
+                            response_format: Optional[dict] = None) -> str:
+        text = self._complete_live(system, prompt, max_tokens, response_format)
+        if key is not None and text != STUB:
+            self.cache.put(key, text)
+        return text
+
+    def _complete_live(self, system: str, prompt: str, max_tokens: int, response_format: Optional[dict] = None) -> str:
         # Uncomment for real calls
+        # extra = {"response_format": response_format} if response_format else {}
         # resp = self.client.chat.completions.create(
         #     model=self.model,
         #     messages=[{"role":"system","content":system},{"role":"user","content":prompt}],
         #     temperature=self.temperature,
-        #     max_tokens=max_tokens
+        #     max_tokens=max_tokens,
+        #     **extra
         # )
         # return resp.choices[0].message.content.strip()
         return STUB
 
+    # --- async batch surface -------------------------------------------------
+
+    async def _admit(self, tokens: int) -> None:
+        if self._rpm_bucket:
+            await self._rpm_bucket.acquire(1)
+        if self._tpm_bucket:
+            await self._tpm_bucket.acquire(tokens)
+
+    def _backoff(self, attempt: int) -> float:
+        # "full jitter": uniform in [0, min(cap, base * 2**attempt)]
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    async def acomplete(self, system: str, prompt: str, max_tokens: int = 3000) -> str:
+        """Async single completion honoring the in-flight, RPM and TPM limits."""
+        key = None
+        if self.live:
+            key, cached = self._cache_lookup(system, prompt, max_tokens)
+            if cached is not None:
+                return cached  # cache hits spend no quota
+        tokens = estimate_tokens(system) + estimate_tokens(prompt) + max_tokens
+        attempt = 0
+        while True:
+            async with self._slots:
+                await self._admit(tokens)
+                try:
+                    if not self.live:
+                        return self._stub(system, prompt)
+                    return await asyncio.to_thread(self._complete_and_store, key, system, prompt, max_tokens)
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+            await asyncio.sleep(self._backoff(attempt))  # back off without holding a slot
+            attempt += 1
+
+    async def acomplete_many(self, system: str, prompts: Mapping[str, str],
+                             max_tokens: int = 3000) -> Dict[str, Union[str, Exception]]:
+        """Complete every prompt concurrently. Returns {key: text}; failed keys map to their exception."""
+        keys = list(prompts)
+        outs = await asyncio.gather(*(self.acomplete(system, prompts[k], max_tokens) for k in keys),
+                                    return_exceptions=True)
+        return dict(zip(keys, outs))
+
+    def complete_many(self, system: str, prompts: Mapping[str, str],
+                      max_tokens: int = 3000) -> Dict[str, Union[str, Exception]]:
+        """Blocking wrapper around ``acomplete_many`` for synchronous callers."""
+        return asyncio.run(self.acomplete_many(system, prompts, max_tokens))
+
 _client_singleton: Optional[GPT5Client] = None
 
-def get_client() -> GPT5Client:
+def configure_client(cache_dir: Optional[Path] = DEFAULT_CACHE_DIR, use_cache: bool = True) -> GPT5Client:
+    """(Re)create the shared client; call before tasks run to choose cache settings."""
     global _client_singleton
+    cache = CompletionCache(cache_dir) if (use_cache and cache_dir) else None
+    _client_singleton = GPT5Client(cache=cache)
+    return _client_singleton
+
+def get_client() -> GPT5Client:
     if _client_singleton is None:
-        _client_singleton = GPT5Client()
+        return configure_client()
     return _client_singleton
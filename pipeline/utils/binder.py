@@ -0,0 +1,170 @@
+"""Exhibit binder: all AI outputs in one PDF with a table of contents.
+
+Summaries (SUMMARY_*.md, sorted), CONTRADICTIONS_MAP.md and EVIDENCE_BRIEF.md
+become numbered exhibits of a single HTML document rendered in one WeasyPrint
+pass. The TOC page numbers come from CSS ``target-counter``; each exhibit gets a
+top-level PDF bookmark; the exhibit -> page range index is written next to the
+PDF as JSON. Without WeasyPrint a plain ReportLab binder is produced instead
+(same TOC, bookmarks and index) using the streaming ``pdf_fallback`` writer.
+"""
+from __future__ import annotations
+import html
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from pipeline.utils.io_utils import json_dump
+from pipeline.utils.pdf_export import get_renderer, try_import_reportlab, try_import_weasyprint
+from pipeline.utils.pdf_fallback import MarkdownPdfWriter
+
+BINDER_NAME = "EXHIBIT_BINDER"
+TRAILING_EXHIBITS = ("CONTRADICTIONS_MAP.md", "EVIDENCE_BRIEF.md")
+
+BINDER_CSS = """
+@page{size:letter;margin:54px;@bottom-center{content:counter(page);font-size:9pt;color:#666}}
+body{font-family:Arial,Helvetica,sans-serif;line-height:1.35;font-size:12pt;color:#222}
+h1,h2,h3,h4,h5,h6{color:#2a2a2a;margin-top:1.2em;bookmark-level:none}
+code,pre{background:#f5f5f5;padding:4px 6px;border-radius:4px;font-size:11pt}
+table{border-collapse:collapse;width:100%;margin:12px 0}
+th,td{border:1px solid #999;padding:4px 6px;font-size:10pt;vertical-align:top}
+th{background:#eee}
+section.exhibit{page-break-before:always}
+h1.exhibit-title{bookmark-level:1;bookmark-label:content();border-bottom:2px solid #444;padding-bottom:4px}
+ol.toc{list-style:none;padding:0}
+ol.toc li{margin:4px 0}
+ol.toc a{color:#222;text-decoration:none}
+ol.toc a::after{content:leader('.') target-counter(attr(href), page)}
+"""
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$", re.M)
+
+class Exhibit(NamedTuple):
+    number: int
+    source: Path
+    title: str
+
+    @property
+    def label(self) -> str:
+        return f"Exhibit {self.number}"
+
+    @property
+    def anchor(self) -> str:
+        return f"exhibit-{self.number}"
+
+def collect_exhibits(md_folder: Path) -> List[Exhibit]:
+    """Summaries first (by name), then the contradictions map and evidence brief."""
+    paths = sorted(md_folder.glob("SUMMARY_*.md"))
+    paths += [md_folder / name for name in TRAILING_EXHIBITS if (md_folder / name).exists()]
+    exhibits = []
+    for i, path in enumerate(paths, 1):
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        m = _HEADING_RE.search(text)
+        exhibits.append(Exhibit(i, path, m.group(1) if m else path.stem))
+    return exhibits
+
+def _binder_html(exhibits: List[Exhibit]) -> str:
+    renderer = get_renderer()
+    toc = "".join(
+        f"<li><a href='#{ex.anchor}'>{ex.label} &mdash; {html.escape(ex.title)}</a></li>" for ex in exhibits
+    )
+    parts = [f"<h1>Exhibit Binder</h1><ol class='toc'>{toc}</ol>"]
+    for ex in exhibits:
+        text = ex.source.read_text(encoding="utf-8", errors="ignore")
+        body = renderer.markdown_body(text)
+        parts.append(
+            f"<section class='exhibit' id='{ex.anchor}'>"
+            f"<h1 class='exhibit-title'>{ex.label} &mdash; {html.escape(ex.title)}</h1>{body}</section>"
+        )
+    return (f"<html><head><meta charset='utf-8'><style>{BINDER_CSS}</style></head>"
+            f"<body>{''.join(parts)}</body></html>")
+
+def _render_weasyprint(HTML, exhibits: List[Exhibit], pdf_path: Path) -> Tuple[Dict[int, int], int]:
+    document = HTML(string=_binder_html(exhibits)).render()
+    start_pages: Dict[int, int] = {}
+    anchors = {ex.anchor: ex.number for ex in exhibits}
+    for page_no, page in enumerate(document.pages, 1):
+        for name in page.anchors:
+            if name in anchors:
+                start_pages.setdefault(anchors[name], page_no)
+    document.write_pdf(str(pdf_path))
+    return start_pages, len(document.pages)
+
+def _layout_reportlab(writer: MarkdownPdfWriter, exhibits: List[Exhibit], toc_pages: Dict[int, int]) -> Dict[int, int]:
+    writer.heading("Exhibit Binder", 1)
+    for ex in exhibits:
+        # always one line, so placeholder numbers in the measure pass keep the layout
+        writer.leader_line(f"{ex.label} - {ex.title}", str(toc_pages.get(ex.number, "")))
+    start_pages: Dict[int, int] = {}
+    for ex in exhibits:
+        writer.start_fresh_page()
+        start_pages[ex.number] = writer.page
+        writer.bookmark(ex.anchor, f"{ex.label} - {ex.title}")
+        writer.heading(f"{ex.label} - {ex.title}", 1)
+        writer.rule()
+        with open(ex.source, encoding="utf-8", errors="ignore") as fh:
+            writer.write(fh)
+    return start_pages
+
+def _render_reportlab(rl, exhibits: List[Exhibit], pdf_path: Path) -> Tuple[Dict[int, int], int]:
+    # Measure pass (no canvas) gives the TOC its page numbers; the draw pass then
+    # produces the identical layout. Both passes stream each exhibit from disk.
+    measure = MarkdownPdfWriter(rl)
+    start_pages = _layout_reportlab(measure, exhibits, {})
+    writer = MarkdownPdfWriter(rl, pdf_path)
+    _layout_reportlab(writer, exhibits, start_pages)
+    return start_pages, writer.close()
+
+def build_binder(md_folder: Path, out_dir: Path, name: str = BINDER_NAME) -> Dict:
+    """Render every exhibit in ``md_folder`` into ``out_dir/<name>.pdf``.
+
+    Writes ``out_dir/<name>.json`` (exhibit -> source and page range) and returns it.
+    """
+    exhibits = collect_exhibits(md_folder)
+    if not exhibits:
+        raise FileNotFoundError(f"No SUMMARY_*.md or brief/map files in {md_folder}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = out_dir / f"{name}.pdf"
+    t0 = time.perf_counter()
+    HTML = try_import_weasyprint()
+    rl = try_import_reportlab() if not HTML else None
+    if HTML:
+        engine = "weasyprint"
+        start_pages, total = _render_weasyprint(HTML, exhibits, pdf_path)
+    elif rl:
+        engine = "reportlab"
+        start_pages, total = _render_reportlab(rl, exhibits, pdf_path)
+    else:
+        raise RuntimeError("Binder needs WeasyPrint or ReportLab installed")
+    index = []
+    for i, ex in enumerate(exhibits):
+        start = start_pages.get(ex.number)
+        nxt = start_pages.get(exhibits[i + 1].number) if i + 1 < len(exhibits) else total + 1
+        index.append({
+            "exhibit": ex.number,
+            "label": ex.label,
+            "title": ex.title,
+            "source": ex.source.name,
+            "start_page": start,
+            "end_page": (nxt - 1) if start and nxt else None,
+        })
+    report = {
+        "binder": pdf_path.name,
+        "engine": engine,
+        "pages": total,
+        "seconds": round(time.perf_counter() - t0, 3),
+        "exhibits": index,
+    }
+    json_dump(out_dir / f"{name}.json", report)
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build one exhibit-binder PDF from AI outputs")
+    parser.add_argument("--in", dest="in_dir", required=True, help="Folder with SUMMARY_*.md and brief/map files")
+    parser.add_argument("--out", dest="out_dir", required=True, help="Folder for the binder PDF and its JSON index")
+    parser.add_argument("--name", default=BINDER_NAME, help="Binder file name without extension")
+    args = parser.parse_args()
+    report = build_binder(Path(args.in_dir), Path(args.out_dir), args.name)
+    print(f"Binder: {len(report['exhibits'])} exhibits, {report['pages']} pages "
+          f"({report['engine']}, {report['seconds']:.2f}s) -> {Path(args.out_dir) / report['binder']}")
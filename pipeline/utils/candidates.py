@@ -0,0 +1,186 @@
+"""Candidate-pair pre-filter for contradiction detection.
+
+Builds an inverted index over features that conflicting documents tend to
+share (dates, agencies, children names, MCL citations, key phrases) and scores
+document pairs by the IDF-weighted features they have in common. Explicit
+``Contradicts`` / ``Cross-Link`` references from the master records add a
+strong bonus. Only the top-K pairs are sent to the model, grouped into
+connected clusters.
+
+Features that occur in more than ``max_df`` of the documents (e.g. the
+children's names in every file) carry no signal and are skipped, as are
+features shared by more than ``max_posting`` documents. The second cap bounds
+pair generation to max_posting² / 2 pairs per feature, so the cost grows
+linearly with the number of documents rather than quadratically.
+"""
+from __future__ import annotations
+import math
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from pipeline.utils.integrity import name_key
+
+AGENCIES = {
+    "CPS": r"\bCPS\b|child protective",
+    "DHHS": r"\bDHHS\b|\bMDHHS\b",
+    "YWCA": r"\bYWCA\b",
+    "GAL": r"\bGAL\b|guardian ad litem",
+    "FOC": r"\bFOC\b|friend of the court",
+    "Court": r"\bcircuit court\b|\bfamily court\b|\bjudge\b",
+    "Police": r"\bpolice\b|\bsheriff\b|\bofficer\b",
+    "Prosecutor": r"\bprosecutor\b|\bAPA\b",
+    "Independent Review": r"\bindependent review\b|review committee",
+}
+KEY_PHRASES = [
+    "within normal limits", "non-accidental", "no concerns", "insufficient evidence",
+    "unsubstantiated", "substantiated", "failed to", "omitted", "did not include",
+    "forensic", "injury", "bruise", "fracture", "safety plan", "removal", "petition",
+    "dismissed", "custody", "parenting time", "sanctions",
+]
+MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+
+DATE_RES = [
+    (re.compile(r"\b(\d{4})[./-](\d{1,2})[./-](\d{1,2})\b"), "ymd"),
+    (re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{2,4})\b"), "mdy"),
+    (re.compile(rf"\b({MONTHS})\s+(\d{{1,2}}),?\s+(\d{{4}})\b", re.IGNORECASE), "text"),
+]
+MCL_RE = re.compile(r"\bMCL\s*§?\s*(\d{3}\.\d+[a-z]?)", re.IGNORECASE)
+AGENCY_RES = {name: re.compile(rx, re.IGNORECASE) for name, rx in AGENCIES.items()}
+PHRASE_RE = re.compile("|".join(re.escape(p) for p in KEY_PHRASES), re.IGNORECASE)
+
+Pair = Tuple[str, str]
+
+def _norm_date(m: re.Match, kind: str) -> Optional[str]:
+    try:
+        if kind == "ymd":
+            y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        elif kind == "mdy":
+            mo, d, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
+            if y < 100:
+                y += 2000
+        else:
+            mo = datetime.strptime(m.group(1).title(), "%B").month
+            d, y = int(m.group(2)), int(m.group(3))
+        return datetime(y, mo, d).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+def extract_dates(text: str) -> Set[str]:
+    """Dates written in ``text`` as YYYY-MM-DD."""
+    dates: Set[str] = set()
+    for rx, kind in DATE_RES:
+        for m in rx.finditer(text):
+            d = _norm_date(m, kind)
+            if d:
+                dates.add(d)
+    return dates
+
+def extract_agencies(text: str) -> Set[str]:
+    """AGENCIES keys mentioned in ``text``."""
+    return {name for name, rx in AGENCY_RES.items() if rx.search(text)}
+
+def extract_features(text: str, children: Iterable[str] = ()) -> Set[str]:
+    feats: Set[str] = {f"date:{d}" for d in extract_dates(text)}
+    feats.update(f"agency:{name}" for name in extract_agencies(text))
+    for m in MCL_RE.finditer(text):
+        feats.add(f"mcl:{m.group(1).lower()}")
+    for m in PHRASE_RE.finditer(text):
+        feats.add(f"phrase:{m.group(0).lower()}")
+    lowered = text.lower()
+    for child in children:
+        if child and re.search(rf"\b{re.escape(child.lower())}\b", lowered):
+            feats.add(f"child:{child.lower()}")
+    return feats
+
+class CandidateIndex:
+    LINK_BONUS = 10.0
+
+    def __init__(self, max_df: float = 0.5, max_posting: int = 200):
+        self.max_df = max_df
+        self.max_posting = max_posting
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.docs: Set[str] = set()
+        self.links: Set[Pair] = set()
+
+    def add(self, doc_id: str, features: Iterable[str]) -> None:
+        self.docs.add(doc_id)
+        for f in features:
+            self.postings[f].add(doc_id)
+
+    def add_link(self, a: str, b: str) -> None:
+        if a != b and a in self.docs and b in self.docs:
+            self.links.add(tuple(sorted((a, b))))
+
+    def link_records(self, records: Iterable[Dict], fields: Tuple[str, ...] = ("Contradicts", "Cross-Link")) -> int:
+        """Resolve free-text references in master records to indexed document names.
+
+        A filename or reference matches a document with the same ``name_key``
+        (case, extension, copy suffixes and punctuation ignored); one dict lookup each.
+        Records without a Filename and blank references are skipped.
+        """
+        docs = sorted(self.docs)
+        by_key: Dict[str, str] = {}
+        for doc, key in zip(docs, name_key(pd.Series(docs, dtype=object)).tolist()):
+            if key:
+                by_key.setdefault(key, doc)
+        sources, refs = [], []
+        for rec in records:
+            sources.append(rec.get("Filename"))
+            refs.append([r for field in fields for r in str(rec.get(field) or "").split(",") if r.strip()])
+        src_docs = [by_key.get(k) if k else None for k in name_key(pd.Series(sources, dtype=object)).tolist()]
+        pairs = [(src, ref) for src, rec_refs in zip(src_docs, refs) if src for ref in rec_refs]
+        before = len(self.links)
+        if pairs:
+            keys = name_key(pd.Series([ref for _, ref in pairs], dtype=object)).tolist()
+            for (src, _), key in zip(pairs, keys):
+                if key in by_key:
+                    self.add_link(src, by_key[key])
+        return len(self.links) - before
+
+    def score_pairs(self) -> Dict[Pair, Tuple[float, List[str]]]:
+        n = max(1, len(self.docs))
+        limit = max(2, min(int(self.max_df * n), self.max_posting))
+        scores: Dict[Pair, float] = defaultdict(float)
+        shared: Dict[Pair, List[str]] = defaultdict(list)
+        for feat, posting in self.postings.items():
+            df = len(posting)
+            if df < 2 or df > limit:
+                continue
+            w = math.log(n / df) + 1.0
+            members = sorted(posting)
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    scores[(a, b)] += w
+                    shared[(a, b)].append(feat)
+        for pair in self.links:
+            scores[pair] += self.LINK_BONUS
+            shared[pair].append("link:master-record")
+        return {p: (s, shared[p]) for p, s in scores.items()}
+
+    def top_pairs(self, k: int) -> List[Tuple[str, str, float, List[str]]]:
+        ranked = sorted(self.score_pairs().items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [(a, b, round(score, 3), feats) for (a, b), (score, feats) in ranked[:k]]
+
+def clusters(pairs: Iterable[Tuple]) -> List[List[str]]:
+    """Connected components of the candidate graph, largest first (union-find)."""
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b, *_ in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+    groups: Dict[str, List[str]] = defaultdict(list)
+    for x in parent:
+        groups[find(x)].append(x)
+    return sorted((sorted(g) for g in groups.values()), key=lambda g: (-len(g), g[0]))
@@ -0,0 +1,113 @@
+"""Case statistics for the master records (one categorical pass per column).
+
+Each column the summaries look at is factorized once (hash pass -> integer
+codes + distinct values) and counted with ``np.bincount``. Every statistic is
+then a predicate over the few distinct values (emoji patterns, agency regexes,
+"Yes", "N/A"), weighted by their counts, instead of a boolean mask or
+``.str.contains`` scan over all rows. Used by the "📈 Case Summary" / Summary
+sheets (master_workbook.py) and ``JusticeFileManager.generate_case_summary``.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+PATTERN_GROUPS = ["🟥", "🟩", "🟦"]
+AGENCY_GROUPS = ["CPS", "YWCA", "Court|Attorney", "Review"]  # regexes
+SEVERITY_ORDER = ["High", "Medium", "Low", "Unknown"]
+
+class ColumnCounts:
+    """Distinct values of one column with their row counts (NaN/None counted apart)."""
+
+    def __init__(self, col: pd.Series):
+        codes, uniques = pd.factorize(col, use_na_sentinel=True)
+        counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+        self.missing = int(counts[0])
+        self.values = list(uniques)
+        self.counts = counts[1:]
+        self.codes = codes
+        self.total = len(codes)
+
+    @classmethod
+    def of(cls, df: pd.DataFrame, name: str) -> "ColumnCounts":
+        return cls(df[name] if name in df.columns else pd.Series([None] * len(df), dtype=object))
+
+    def count(self, value) -> int:
+        """Rows equal to ``value``."""
+        try:
+            return int(self.counts[self.values.index(value)])
+        except ValueError:
+            return 0
+
+    def count_where(self, predicate) -> int:
+        """Rows whose (non-null) value satisfies ``predicate``, evaluated once per distinct value."""
+        return int(sum(n for v, n in zip(self.values, self.counts) if predicate(v)))
+
+    def contains(self, pattern: str) -> int:
+        """Like ``col.str.contains(pattern, na=False).sum()`` (regex, non-strings never match)."""
+        rx = re.compile(pattern)
+        return self.count_where(lambda v: isinstance(v, str) and rx.search(v) is not None)
+
+    def mask(self, value) -> np.ndarray:
+        """Row mask for ``col == value`` from the codes (no second hash pass)."""
+        try:
+            return self.codes == self.values.index(value)
+        except ValueError:
+            return np.zeros(self.total, dtype=bool)
+
+    def value_counts(self) -> Dict[str, int]:
+        """Non-null values by descending count (ties in first-seen order), like ``value_counts()``."""
+        order = np.argsort(-self.counts, kind="stable")
+        return {self.values[i]: int(self.counts[i]) for i in order}
+
+@dataclass
+class CaseStats:
+    total: int = 0
+    smoking_guns: int = 0
+    top5: int = 0
+    misconduct: int = 0
+    law_violations: int = 0  # rows whose 'Law Violated' is not 'N/A'
+    needs_review: int = 0
+    patterns: Dict[str, int] = field(default_factory=dict)
+    agencies: Dict[str, int] = field(default_factory=dict)
+    pattern_groups: Dict[str, int] = field(default_factory=dict)  # emoji -> rows containing it
+    agency_groups: Dict[str, int] = field(default_factory=dict)   # AGENCY_GROUPS regex -> rows matching
+    severity: Dict[str, int] = field(default_factory=dict)        # SEVERITY_ORDER, missing -> Unknown
+    laws: List[str] = field(default_factory=list)                 # distinct 'Law Violated' except N/A
+    top5_smoking: List[Tuple[str, str]] = field(default_factory=list)  # (Filename, Summary)
+
+def compute_case_stats(df: pd.DataFrame) -> CaseStats:
+    """All case statistics from one factorize + bincount per column."""
+    smoking = ColumnCounts.of(df, "Smoking Gun")
+    top5 = ColumnCounts.of(df, "Top 5")
+    misconduct = ColumnCounts.of(df, "Misconduct?")
+    law = ColumnCounts.of(df, "Law Violated")
+    pattern = ColumnCounts.of(df, "Pattern")
+    agency = ColumnCounts.of(df, "Agency")
+    severity = ColumnCounts.of(df, "severity")
+    review = ColumnCounts.of(df, "needsReview")
+
+    stats = CaseStats(
+        total=len(df),
+        smoking_guns=smoking.count("Yes"),
+        top5=top5.count("Yes"),
+        misconduct=misconduct.count("Yes"),
+        law_violations=law.total - law.count("N/A"),
+        needs_review=review.count_where(bool),
+        patterns=pattern.value_counts(),
+        agencies=agency.value_counts(),
+        pattern_groups={code: pattern.contains(code) for code in PATTERN_GROUPS},
+        agency_groups={rx: agency.contains(rx) for rx in AGENCY_GROUPS},
+        laws=[v for v in law.values if v != "N/A"],
+    )
+    counts = {s: severity.count(s) for s in SEVERITY_ORDER}
+    counts["Unknown"] += severity.missing
+    stats.severity = counts
+    rows = np.flatnonzero(top5.mask("Yes") & smoking.mask("Yes"))
+    if len(rows):
+        picked = df.iloc[rows]
+        stats.top5_smoking = list(zip(picked["Filename"], picked["Summary"]))
+    return stats
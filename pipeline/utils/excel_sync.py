@@ -1,7 +1,8 @@
 """Excel synchronization utilities.
 
-Appends parsed AI output metadata into MASTER_JUSTICE_FILE_SUPREME_v1.xlsx
-Sheet: AI_Outputs (created if missing)
+Records parsed AI output metadata in the AI outputs index (see outputs_index)
+and, on request, regenerates sheet AI_Outputs of MASTER_JUSTICE_FILE_SUPREME_v1.xlsx
+from it.
 
 Captured fields per markdown summary file (Task A focus):
 - Timestamp
@@ -15,113 +16,39 @@ Captured fields per markdown summary file (Task A focus):
 - Tags (raw list)
 - Markdown Path
 - PDF Path (if exists)
+
+Fields come from the Task A JSON record (SUMMARY_<stem>.json) when one exists;
+the markdown is parsed only for summaries without a record.
 """
 from __future__ import annotations
-import re
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
-from openpyxl import load_workbook, Workbook
-
-SUMMARY_PATTERNS = [
-    ('include', [
-        re.compile(r'^Include\??.*?:\s*(.*)$', re.IGNORECASE),
-        re.compile(r'^Include Decision\s*:?\s*(.*)$', re.IGNORECASE)
-    ]),
-    ('smoking', [
-        re.compile(r'^Smoking Gun\??.*?:\s*(.*)$', re.IGNORECASE),
-        re.compile(r'^Is Smoking Gun\s*:?\s*(.*)$', re.IGNORECASE)
-    ]),
-    ('top5', [
-        re.compile(r'^Top\s*5\??.*?:\s*(.*)$', re.IGNORECASE),
-        re.compile(r'^Top Five\s*:?\s*(.*)$', re.IGNORECASE)
-    ]),
-    ('primary_pattern', [
-        re.compile(r'^Primary Pattern\s*:?\s*(.*)$', re.IGNORECASE),
-        re.compile(r'^Key Pattern\s*:?\s*(.*)$', re.IGNORECASE)
-    ]),
-    ('tags', [
-        re.compile(r'^Tags?\s*:?\s*\[(.*?)]\s*$', re.IGNORECASE),
-        re.compile(r'^Tags?\s*:?\s*(.+)$', re.IGNORECASE)
-    ]),
-]
+from typing import Dict, List, Set
 
-HEADERS = [
-    'Timestamp','Filename','Tasks','Children','Include','Smoking Gun','Top 5',
-    'Primary Pattern','Tags','Markdown Path','PDF Path'
-]
+from pipeline.utils.outputs_index import HEADERS, OutputsIndex, default_index_path
+from pipeline.utils.summary_parser import parse_summary_record
+from pipeline.utils.summary_schema import json_path, load_record, sync_fields
 
 def parse_summary(md_text: str) -> Dict[str,str]:
-    data: Dict[str,str] = {}
-    for raw_line in md_text.splitlines():
-        line = raw_line.strip()
-        if not line or len(line) > 500:
-            continue
-        for key, patterns in SUMMARY_PATTERNS:
-            if key in data:
-                continue
-            for rx in patterns:
-                m = rx.match(line)
-                if m:
-                    captured = m.group(1).strip()
-                    # Trim trailing markdown artifacts
-                    captured = captured.rstrip('#*').strip()
-                    data[key] = captured or 'UNKNOWN'
-                    break
-    # Normalize values
-    def norm_yes_no(v: Optional[str]) -> str:
-        if not v:
-            return 'UNKNOWN'
-        v2 = v.lower()
-        if any(tok in v2 for tok in ['yes','y']):
-            return 'Yes'
-        if any(tok in v2 for tok in ['no','n']):
-            return 'No'
-        return 'UNKNOWN'
-    data['include'] = norm_yes_no(data.get('include'))
-    data['smoking'] = norm_yes_no(data.get('smoking'))
-    data['top5'] = norm_yes_no(data.get('top5'))
-    # Normalize tags: split by comma if not already bracket list format
-    if 'tags' in data and data['tags'] and '[' not in data['tags']:
-        parts = [p.strip() for p in re.split(r'[;,]', data['tags']) if p.strip()]
-        if parts:
-            data['tags'] = ', '.join(parts)
-    return data
+    """Row fields (include, smoking, top5, primary_pattern, tags) of one summary."""
+    return parse_summary_record(md_text, tables=False).sync_fields()
 
-def ensure_workbook(path: Path) -> Workbook:
-    if path.exists():
-        try:
-            return load_workbook(path)
-        except Exception:
-            pass
-    wb = Workbook()
-    wb.active.title = 'AI_Outputs'
-    ws = wb['AI_Outputs']
-    ws.append(HEADERS)
-    return wb
-
-def sync_markdowns(md_dir: Path, excel_path: Path, tasks: str, children: str, pdf_root: Path | None) -> int:
-    md_files = list(md_dir.glob('*.md'))
-    if not md_files:
-        return 0
-    wb = ensure_workbook(excel_path)
-    if 'AI_Outputs' not in wb.sheetnames:
-        ws = wb.create_sheet('AI_Outputs')
-        ws.append(HEADERS)
-    ws = wb['AI_Outputs']
-    existing = {row[1].value for row in ws.iter_rows(min_row=2, values_only=False)}  # existing filenames
-    added = 0
+def build_rows(md_files: List[Path], existing: Set[str], tasks: str, children: str, pdf_root: Path | None) -> List[list]:
+    """AI_Outputs rows for markdown files whose display name is not in ``existing``."""
+    stamp = datetime.utcnow().isoformat(timespec='seconds')+'Z'
+    seen = set(existing)
+    rows = []
     for md in md_files:
-        base_name = md.stem
-        display_name = base_name.replace('SUMMARY_','') + md.suffix
-        if display_name in existing:
+        display_name = md.stem.replace('SUMMARY_','') + md.suffix
+        if display_name in seen:
             # skip duplicates of same summary
             continue
-        content = md.read_text(encoding='utf-8', errors='ignore')
-        parsed = parse_summary(content)
-    pdf_path = (pdf_root / (md.stem + '.pdf')) if pdf_root else None
-    row = [
-            datetime.utcnow().isoformat(timespec='seconds')+'Z',
+        seen.add(display_name)
+        record = load_record(json_path(md))
+        parsed = sync_fields(record) if record else parse_summary(md.read_text(encoding='utf-8', errors='ignore'))
+        pdf_path = (pdf_root / (md.stem + '.pdf')) if pdf_root else None
+        rows.append([
+            stamp,
             display_name,
             tasks,
             children,
@@ -132,8 +59,38 @@ def sync_markdowns(md_dir: Path, excel_path: Path, tasks: str, children: str, pd
             parsed.get('tags',''),
             str(md),
             str(pdf_path) if (pdf_path and pdf_path.exists()) else ''
-        ]
-        ws.append(row)
-        added += 1
-    wb.save(excel_path)
-    return added
+        ])
+    return rows
+
+def export_ai_outputs(index: OutputsIndex, excel_path: Path) -> bool:
+    """Regenerate the AI_Outputs sheet from the index; False if the workbook is locked."""
+    try:
+        index.export_excel(excel_path)
+        return True
+    except PermissionError:
+        print(f"Excel export skipped: {excel_path.name} is open elsewhere. Rows are saved in "
+              f"{index.db_path.name}; rerun `python -m pipeline.utils.outputs_index export` after closing it.")
+        return False
+
+def sync_markdowns(md_dir: Path, excel_path: Path, tasks: str, children: str, pdf_root: Path | None,
+                   export_excel: bool = False, db_path: Path | None = None) -> int:
+    """Record one AI outputs row per new markdown file; returns rows added.
+
+    The index (``<workbook stem>.ai_outputs.sqlite``, seeded once from the existing
+    AI_Outputs sheet) is the source of truth and handles dedupe. The sheet is
+    regenerated from it only when rows were added and ``export_excel`` is set
+    (otherwise ``python -m pipeline.utils.outputs_index export`` does it).
+    """
+    md_files = sorted(md_dir.glob('*.md'))
+    if not md_files:
+        return 0
+    index = OutputsIndex(db_path or default_index_path(excel_path))
+    try:
+        if not len(index):
+            index.import_workbook(excel_path)
+        added = index.add_rows(build_rows(md_files, index.filenames(), tasks, children, pdf_root))
+        if added and export_excel:
+            export_ai_outputs(index, excel_path)
+        return added
+    finally:
+        index.close()
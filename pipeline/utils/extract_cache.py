@@ -0,0 +1,121 @@
+"""Persistent extracted-text cache (SQLite, default pipeline/cache/extract.sqlite).
+
+Rows are keyed by source path and validated by size + mtime; when those
+changed but the content hash did not (file touched or copied), the stored text
+is reused without re-parsing. Content hashes are also looked up across paths
+so renamed exhibits are free. Page start offsets are stored with the text.
+OCR output is stored per page (content hash, page, dpi, lang).
+"""
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pipeline.utils.io_utils import hash_file
+
+DEFAULT_EXTRACT_CACHE = Path("pipeline/cache/extract.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS extracts (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha TEXT NOT NULL,
+    text TEXT NOT NULL,
+    page_offsets TEXT NOT NULL,
+    extracted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extracts_sha ON extracts(sha);
+CREATE TABLE IF NOT EXISTS ocr_pages (
+    sha TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    dpi INTEGER NOT NULL,
+    lang TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (sha, page, dpi, lang)
+);
+"""
+
+class ExtractCache:
+    def __init__(self, db_path: Path = DEFAULT_EXTRACT_CACHE):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: Path) -> Optional[Tuple[str, List[int]]]:
+        key = self._key(path)
+        st = Path(path).stat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, sha, text, page_offsets FROM extracts WHERE path=?", (key,)).fetchone()
+            if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                self.hits += 1
+                return row[3], json.loads(row[4])
+        # stat changed or unknown path: fall back to the content hash
+        sha = hash_file(Path(path))
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, page_offsets FROM extracts WHERE sha=? LIMIT 1", (sha,)).fetchone()
+            if row:
+                self._put_locked(key, st.st_size, st.st_mtime_ns, sha, row[0], row[1])
+                self.hits += 1
+                return row[0], json.loads(row[1])
+            self.misses += 1
+        return None
+
+    def put(self, path: Path, text: str, page_offsets: List[int]) -> None:
+        st = Path(path).stat()
+        sha = hash_file(Path(path))
+        with self._lock:
+            self._put_locked(self._key(path), st.st_size, st.st_mtime_ns, sha, text, json.dumps(page_offsets))
+
+    def _put_locked(self, key: str, size: int, mtime_ns: int, sha: str, text: str, offsets_json: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extracts(path, size, mtime_ns, sha, text, page_offsets, extracted_at) "
+            "VALUES (?,?,?,?,?,?,?)",
+            (key, size, mtime_ns, sha, text, offsets_json, datetime.now().isoformat(timespec="seconds")))
+        self._conn.commit()
+
+    def get_ocr_pages(self, sha: str, dpi: int, lang: str) -> Dict[int, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, text FROM ocr_pages WHERE sha=? AND dpi=? AND lang=?", (sha, dpi, lang)).fetchall()
+        return dict(rows)
+
+    def put_ocr_pages(self, sha: str, dpi: int, lang: str, pages: Dict[int, str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ocr_pages(sha, page, dpi, lang, text) VALUES (?,?,?,?,?)",
+                [(sha, page, dpi, lang, text) for page, text in pages.items()])
+            self._conn.commit()
+
+    def prune_missing(self) -> int:
+        """Drop rows whose source file no longer exists."""
+        with self._lock:
+            gone = [(p,) for (p,) in self._conn.execute("SELECT path FROM extracts") if not Path(p).exists()]
+            if gone:
+                self._conn.executemany("DELETE FROM extracts WHERE path=?", gone)
+                self._conn.execute("DELETE FROM ocr_pages WHERE sha NOT IN (SELECT sha FROM extracts)")
+                self._conn.commit()
+        return len(gone)
+
+    def stats_line(self) -> str:
+        with self._lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM extracts").fetchone()[0]
+        return f"Extract cache: {self.hits} hits, {self.misses} misses, {rows} files in {self.db_path}"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
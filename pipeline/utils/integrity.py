@@ -0,0 +1,264 @@
+"""Integrity rules for the master records, run as column operations.
+
+``RULES`` is the rule set: each ``Rule`` names a check, the column it looks at
+and whether a hit is an error or a warning. Every check works on whole columns
+(string ops, ``isin`` hash lookups, dates parsed once per distinct value), never
+row by row, so 100k records validate in a fraction of a second:
+
+- required     value missing, blank or a ``[placeholder]`` left by the importer
+- date         Date present but not parseable
+- enum         Pattern / Status must start with a known marker (🟥 🟦 ... / ✅ ⬜ 🔄),
+               severity one of High/Medium/Low/Unknown
+- review       Smoking Gun still "Review Needed"
+- reference    ``Contradicts`` entries that match no record, resolved exactly as
+               the cross-reference graph does (``name_key``, then the fuzzy
+               index; see xref_graph), so both report the same references.
+               Given the saved graph its unresolved list is used as is;
+               otherwise only references without an exact match are scored
+- duplicate    the same Filename twice; near-duplicates (same name up to case,
+               punctuation, extension or "(1)" / "copy") as warnings
+
+CLI (exit code 1 when there are errors, or warnings with --strict):
+  python -m pipeline.utils.integrity [--db data/master_records.sqlite] [--json report.json]
+"""
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline.utils.master_workbook import PATTERN_COLORS, STATUS_COLORS
+from pipeline.utils.summary_schema import SEVERITIES
+
+REQUIRED_FIELDS = ["Filename", "Date", "Type", "Summary", "Smoking Gun"]
+ISSUE_KEYS = ("rule", "level", "row", "filename", "column", "value", "message")
+
+_PLACEHOLDER_RE = r"^\s*(?:\[.*\])?\s*$"  # blank or "[SUMMARY NEEDED - ...]"
+_EXT_RE = r"\.[a-z0-9]{2,4}$"
+_COPY_RE = r"^copy of\s+|\s*\(\d+\)$|[\s_-]+copy(?:\s*\d+)?$"
+_NONWORD_RE = r"[\W_]+"
+
+@dataclass(frozen=True)
+class Rule:
+    check: str             # key of _CHECKS
+    column: str
+    level: str = "error"   # "error" | "warning"
+    allowed: Tuple[str, ...] = ()
+    prefix: bool = False   # enum: match the leading marker only
+
+RULES: List[Rule] = [
+    *(Rule("required", name) for name in REQUIRED_FIELDS),
+    Rule("date", "Date"),
+    Rule("enum", "Pattern", allowed=tuple(PATTERN_COLORS), prefix=True),
+    Rule("enum", "Status", allowed=tuple(STATUS_COLORS), prefix=True),
+    Rule("enum", "severity", allowed=SEVERITIES),
+    Rule("review", "Smoking Gun", level="warning", allowed=("Review Needed",)),
+    Rule("reference", "Contradicts", level="warning"),
+    Rule("duplicate", "Filename"),
+]
+
+@dataclass
+class IntegrityReport:
+    records: int = 0
+    issues: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def errors(self) -> int:
+        return sum(1 for i in self.issues if i["level"] == "error")
+
+    @property
+    def warnings(self) -> int:
+        return len(self.issues) - self.errors
+
+    def exit_code(self, strict: bool = False) -> int:
+        return 1 if self.errors or (strict and self.issues) else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        by_rule = Counter(f"{i['rule']}:{i['column']}" for i in self.issues)
+        return {"records": self.records, "errors": self.errors, "warnings": self.warnings,
+                "by_rule": dict(sorted(by_rule.items())), "issues": self.issues}
+
+# --- column helpers ---------------------------------------------------------
+
+def _text(col: pd.Series) -> pd.Series:
+    """Column as str with missing values as ''."""
+    return col.where(col.notna(), "").astype(str)
+
+def _blank(col: pd.Series) -> np.ndarray:
+    return _text(col).str.match(_PLACEHOLDER_RE).to_numpy(dtype=bool)
+
+def _blank_in(ctx: Dict[str, Any], df: pd.DataFrame, column: str) -> np.ndarray:
+    """``_blank`` of a column, computed once per validation run."""
+    if column not in ctx["blank"]:
+        ctx["blank"][column] = _blank(df[column])
+    return ctx["blank"][column]
+
+def name_key(names: pd.Series) -> pd.Series:
+    """Normalized document name: lower-case, no extension or copy suffix, words joined by one space.
+
+    'CPS Investigation Report, 5/23/20.pdf' and 'CPS investigation report 5.23.20'
+    both give 'cps investigation report 5 23 20'.
+    """
+    key = _text(names).str.lower().str.strip()
+    key = key.str.replace(_EXT_RE, "", regex=True).str.replace(_COPY_RE, "", regex=True)
+    return key.str.replace(_NONWORD_RE, " ", regex=True).str.strip().astype(object)  # object: khash isin
+
+def parse_dates(col: pd.Series) -> pd.Series:
+    """``pd.to_datetime`` of each distinct value once (ISO first, other layouts as a fallback)."""
+    codes, uniques = pd.factorize(_text(col))
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce", format="ISO8601")
+    retry = parsed.isna() & (pd.Series(uniques) != "")
+    if retry.any():
+        parsed[retry] = pd.to_datetime(pd.Series(uniques)[retry], errors="coerce", format="mixed")
+    return pd.Series(parsed.to_numpy()[codes], index=col.index)
+
+def _hits(rule: Rule, rows: np.ndarray, values, messages) -> pd.DataFrame:
+    return pd.DataFrame({"row": rows, "value": values, "message": messages}).assign(
+        rule=rule.check, level=rule.level, column=rule.column)
+
+# --- checks: (rule, df, context) -> DataFrame[row, value, message] -----------
+
+def _check_required(rule: Rule, df: pd.DataFrame, ctx: Dict[str, Any]) -> pd.DataFrame:
+    rows = np.flatnonzero(_blank_in(ctx, df, rule.column))
+    value = df[rule.column].iloc[rows]
+    return _hits(rule, rows, value.to_numpy(), f"missing {rule.column}")
+
+def _check_date(rule: Rule, df: pd.DataFrame, ctx: Dict[str, Any]) -> pd.DataFrame:
+    bad = parse_dates(df[rule.column]).isna().to_numpy() & ~_blank_in(ctx, df, rule.column)
+    rows = np.flatnonzero(bad)
+    values = _text(df[rule.column]).iloc[rows]
+    return _hits(rule, rows, values.to_numpy(), [f"unparseable {rule.column} {v!r}" for v in values.tolist()])
+
+def _check_enum(rule: Rule, df: pd.DataFrame, ctx: Dict[str, Any]) -> pd.DataFrame:
+    text = _text(df[rule.column]).str.strip()
+    probe = text.str[:1] if rule.prefix else text
+    bad = ~probe.isin(rule.allowed).to_numpy() & ~_blank_in(ctx, df, rule.column)
+    rows = np.flatnonzero(bad)
+    expected = " ".join(rule.allowed)
+    what = f"{rule.column} must start with one of {expected}" if rule.prefix else f"{rule.column} not in {expected}"
+    values = text.iloc[rows]
+    return _hits(rule, rows, values.to_numpy(), [f"{what}: {v!r}" for v in values.tolist()])
+
+def _check_review(rule: Rule, df: pd.DataFrame, ctx: Dict[str, Any]) -> pd.DataFrame:
+    rows = np.flatnonzero(df[rule.column].isin(rule.allowed).to_numpy())
+    return _hits(rule, rows, df[rule.column].iloc[rows].to_numpy(), f"{rule.column} status needs review")
+
+def _check_reference(rule: Rule, df: pd.DataFrame, ctx: Dict[str, Any]) -> pd.DataFrame:
+    """References no record resolves to, by the same rules as the cross-reference graph."""
+    from pipeline.utils.xref_graph import REF_COLUMNS, resolve_references  # xref_graph imports this module
+
+    graph = ctx["graph"]
+    if graph is not None and rule.column in REF_COLUMNS:
+        mine = graph.unresolved_kind == REF_COLUMNS[rule.column]
+        rows, refs = graph.unresolved_row[mine].astype(np.int64), graph.unresolved_ref[mine].tolist()
+    else:
+        bad = resolve_references(df, {rule.column: 0})
+        bad = bad[bad["target"] < 0]
+        rows, refs = bad["row"].to_numpy(dtype=np.int64), bad["ref"].tolist()
+    return _hits(rule, rows, np.array(refs, dtype=object),
+                 [f"{rule.column} reference matches no record: {r!r}" for r in refs])
+
+def _check_duplicate(rule: Rule, df: pd.DataFrame, ctx: Dict[str, Any]) -> pd.DataFrame:
+    names = _text(df[rule.column])
+    live = ~_blank_in(ctx, df, rule.column)
+    exact = (names.duplicated(keep="first").to_numpy() & live)
+    rows = np.flatnonzero(exact)
+    dup = _hits(rule, rows, names.iloc[rows].to_numpy(), f"duplicate {rule.column}")
+
+    # near-duplicates: same key, different spelling; reported against the first spelling
+    keys = ctx["keys"]
+    named = pd.DataFrame({"key": keys, "name": names})[live & ~exact & (keys != "").to_numpy()]
+    spellings = named.drop_duplicates("name")
+    repeated = spellings["key"].duplicated(keep="first").to_numpy()
+    original = spellings[~repeated].set_index("key")["name"]
+    near = spellings[repeated]
+    near_hits = _hits(Rule("duplicate", rule.column, level="warning"), near.index.to_numpy(), near["name"].to_numpy(),
+                      [f"near-duplicate of {original[k]!r}" for k in near["key"].tolist()])
+    return pd.concat([dup, near_hits], ignore_index=True)
+
+_CHECKS = {
+    "required": _check_required,
+    "date": _check_date,
+    "enum": _check_enum,
+    "review": _check_review,
+    "reference": _check_reference,
+    "duplicate": _check_duplicate,
+}
+
+def validate_records(df: pd.DataFrame, rules: Optional[List[Rule]] = None, graph=None) -> IntegrityReport:
+    """Run ``rules`` (default RULES) over the records; issues ordered by row, then rule order.
+
+    ``graph`` is an optional CrossRefGraph of the same records (``xref_graph.load_or_build``);
+    the reference rule then reports its unresolved references instead of resolving them again.
+    """
+    rules = RULES if rules is None else rules
+    df = df.reset_index(drop=True)
+    report = IntegrityReport(records=len(df))
+    missing = dict.fromkeys(r.column for r in rules if r.check == "required" and r.column not in df.columns)
+    for column in missing:
+        report.issues.append(dict(rule="required", level="error", row=None, filename=None, column=column,
+                                  value=None, message=f"Missing required field: {column}"))
+
+    keys = name_key(df["Filename"]) if "Filename" in df.columns else pd.Series([""] * len(df))
+    ctx = {"keys": keys, "blank": {}, "graph": graph}
+    frames = []
+    for order, rule in enumerate(rules):
+        if rule.column in df.columns:
+            frames.append(_CHECKS[rule.check](rule, df, ctx).assign(order=order))
+    if not frames:
+        return report
+    hits = pd.concat(frames, ignore_index=True)
+    rows = hits["row"].to_numpy(dtype=np.int64)
+    order = np.lexsort((hits["order"].to_numpy(), rows))
+    rows = rows[order]
+    filenames = _text(df["Filename"]).to_numpy(dtype=object) if "Filename" in df.columns else np.full(len(df), "")
+    values = hits["value"].to_numpy(dtype=object)[order]
+    missing = pd.isna(values)
+    values = [None if m else (v if isinstance(v, str) else str(v)) for v, m in zip(values.tolist(), missing.tolist())]
+    columns = [hits[k].to_numpy(dtype=object)[order].tolist() for k in ("rule", "level")]
+    columns += [(rows + 1).tolist(), filenames[rows].tolist(),  # 1-based record number
+                hits["column"].to_numpy(dtype=object)[order].tolist(), values,
+                hits["message"].to_numpy(dtype=object)[order].tolist()]
+    report.issues.extend(dict(zip(ISSUE_KEYS, issue)) for issue in zip(*columns))
+    return report
+
+def print_report(report: IntegrityReport, limit: int = 50) -> None:
+    if not report.issues:
+        print(f"✅ All integrity checks passed! ({report.records} records)")
+        return
+    print(f"⚠️  Found {len(report.issues)} integrity issues in {report.records} records "
+          f"({report.errors} errors, {report.warnings} warnings):")
+    for name, count in report.to_dict()["by_rule"].items():
+        print(f"   • {name}: {count}")
+    for i, issue in enumerate(report.issues[:limit], 1):
+        where = f"Row {issue['row']} ({issue['filename'] or 'Unknown'}): " if issue["row"] is not None else ""
+        print(f"   {i}. [{issue['level']}] {where}{issue['message']}")
+    if len(report.issues) > limit:
+        print(f"   ... {len(report.issues) - limit} more (see the JSON report)")
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    from pathlib import Path
+
+    from pipeline.utils.io_utils import json_dump
+    from pipeline.utils.master_store import DEFAULT_MASTER_DB, load_dataframe
+
+    parser = argparse.ArgumentParser(description="Validate the master evidence records")
+    parser.add_argument('--db', default=str(DEFAULT_MASTER_DB), help='Store path')
+    parser.add_argument('--json', default=None, help='Write the report as JSON')
+    parser.add_argument('--strict', action='store_true', help='Exit 1 on warnings too')
+    parser.add_argument('--limit', type=int, default=50, help='Issues to print')
+    args = parser.parse_args()
+
+    from pipeline.utils.xref_graph import graph_path, load_or_build
+
+    df = load_dataframe(Path(args.db))
+    report = validate_records(df, graph=load_or_build(df, graph_path(Path(args.db)))[0])
+    print_report(report, args.limit)
+    if args.json:
+        json_dump(Path(args.json), report.to_dict())
+        print(f"📄 Report saved to: {args.json}")
+    sys.exit(report.exit_code(args.strict))
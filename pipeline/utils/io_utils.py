@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 ENCODINGS = ["utf-8","utf-16","latin-1"]
+CHARS_PER_TOKEN = 4  # rough average for English prose; used for budgeting only
 
 def read_text(path: Path) -> str:
     for enc in ENCODINGS:
@@ -25,3 +26,13 @@ def json_dump(path: Path, data: Dict[str, Any]) -> None:
 
 def hash_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
@@ -0,0 +1,62 @@
+"""Run manifest for incremental pipeline runs.
+
+Stored as ``run_manifest.json`` in the output directory. It remembers:
+- a content hash per input file (reused while size + mtime are unchanged)
+- a fingerprint per task output (Task A per document, B and C per document set)
+
+A task output is regenerated only when its fingerprint changed or the output
+file is missing.
+"""
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from pipeline.utils.io_utils import hash_file, hash_text, json_dump
+
+MANIFEST_NAME = "run_manifest.json"
+MANIFEST_VERSION = 1
+
+class RunManifest:
+    def __init__(self, out_dir: Path):
+        self.path = Path(out_dir) / MANIFEST_NAME
+        self.data: Dict[str, Any] = {"version": MANIFEST_VERSION, "files": {}, "outputs": {}}
+        if self.path.exists():
+            try:
+                loaded = json.loads(self.path.read_text(encoding="utf-8"))
+                if loaded.get("version") == MANIFEST_VERSION:
+                    self.data = loaded
+            except Exception:
+                pass  # corrupt manifest -> full rebuild
+        self._seen: set[str] = set()
+
+    def file_hash(self, path: Path) -> str:
+        key = str(path)
+        st = path.stat()
+        entry = self.data["files"].get(key)
+        self._seen.add(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha"]
+        sha = hash_file(path)
+        self.data["files"][key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha": sha}
+        return sha
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        return hash_text(json.dumps(parts, sort_keys=True, default=str))
+
+    def set_fingerprint(self, docs: Iterable[Path], *parts: Any) -> str:
+        """Fingerprint for a task that consumes a whole document set."""
+        return self.fingerprint(sorted((d.name, self.file_hash(d)) for d in docs), *parts)
+
+    def is_current(self, output_key: str, fp: str, output_path: Path) -> bool:
+        return self.data["outputs"].get(output_key) == fp and output_path.exists()
+
+    def record(self, output_key: str, fp: str) -> None:
+        self.data["outputs"][output_key] = fp
+
+    def save(self) -> None:
+        # Forget files that were not seen this run (deleted or moved sources)
+        if self._seen:
+            self.data["files"] = {k: v for k, v in self.data["files"].items() if k in self._seen}
+        json_dump(self.path, self.data)
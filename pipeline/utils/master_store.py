@@ -0,0 +1,432 @@
+"""Master evidence table store (SQLite, default data/master_records.sqlite).
+
+The records behind the Justice Master Table used to live as a literal
+``master_data`` list inside MASTER_JUSTICE_FILE_SUPREME.py; every tool now
+reads and appends through this module instead:
+
+- MASTER_JUSTICE_FILE_SUPREME.py builds the workbook from ``load_dataframe``
+- JusticeFileManager loads ``load_dataframe``
+- JusticeFileImporter / QuickUpdate merge templates with ``append_records``
+
+One column per master field (list fields as JSON text, ``needsReview`` as 0/1),
+fields outside MASTER_COLUMNS kept as JSON in ``extra``, rows ordered by ``seq``.
+Appending is a plain INSERT; columns added to MASTER_COLUMNS later are added to
+existing stores on open. SQLite is the source of truth; when pyarrow is
+installed, ``dataframe()`` also keeps a derived Parquet snapshot
+(``<stem>.snapshot.parquet``) and reads only rows appended since from SQLite.
+Triggers count every UPDATE / DELETE (``update_record``, ``delete_records`` or
+any other SQLite client) in ``store_meta``; a snapshot taken before the count
+changed is discarded.
+
+CLI:
+  python -m pipeline.utils.master_store migrate MASTER_JUSTICE_FILE_SUPREME.py
+  python -m pipeline.utils.master_store append new_documents_template.json
+  python -m pipeline.utils.master_store import-summaries pipeline/outputs
+  python -m pipeline.utils.master_store export --parquet master.parquet
+"""
+from __future__ import annotations
+import ast
+import gc
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Set
+
+DEFAULT_MASTER_DB = Path("data/master_records.sqlite")
+
+# --- Spark/AI schema enforcement ---
+NEW_FIELDS = {
+    "entities": [],            # list[str]
+    "legalCodes": [],         # list[str]
+    "violations": [],         # list[str]
+    "contradictions": [],     # list[str] or objects
+    "needsReview": False,     # bool
+    "severity": "Unknown"    # "High"|"Medium"|"Low"|"Unknown"
+}
+MASTER_COLUMNS = [
+    "Filename", "Date", "Type", "Agency", "Children", "Parent", "Pattern", "Summary", "Misconduct?",
+    "Law Violated", "Contradicts", "Smoking Gun", "Reviewer Note", "Faith/Prayer", "Phase", "Batch",
+    "Status", "Exhibit Cat.", "AI Summary", "Cross-Link", "Top 5",
+    # Spark/AI fields
+    *NEW_FIELDS,
+]
+LIST_FIELDS = [k for k, v in NEW_FIELDS.items() if isinstance(v, list)]
+TABLE = "master_records"
+META = "store_meta"
+SNAPSHOT_MIN_TAIL = 2000  # rows appended after the Parquet snapshot before it is rewritten
+
+def normalize_record(r: dict) -> dict:
+    r = dict(r or {})
+    for k, v in NEW_FIELDS.items():
+        if k not in r or r[k] is None:
+            r[k] = [] if isinstance(v, list) else v
+    return r
+
+def _q(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+def _encode(column: str, value: Any) -> Any:
+    if column in LIST_FIELDS:
+        return json.dumps(value if isinstance(value, list) else ([] if value in (None, "") else [value]),
+                          ensure_ascii=False)
+    if column == "needsReview":
+        return 1 if value is True or str(value).strip().lower() in ("1", "true", "yes") else 0
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+def _decode_lists(values: Sequence[str]) -> List[list]:
+    # one C-level parse for the whole column instead of one json.loads per row
+    return json.loads("[" + ",".join(values) + "]")
+
+@contextmanager
+def _gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def try_import_pyarrow():
+    try:
+        import pyarrow  # type: ignore
+        import pyarrow.parquet  # type: ignore
+        return pyarrow
+    except Exception:
+        return None
+
+def snapshot_path(db_path: Path) -> Path:
+    """Derived Parquet snapshot next to the store: <stem>.snapshot.parquet (safe to delete)."""
+    return Path(db_path).with_name(Path(db_path).stem + ".snapshot.parquet")
+
+def _write_snapshot(pa, path: Path, data: Dict[str, list], max_seq: int, changes: int) -> None:
+    """Columns Arrow can hold natively are stored as is; mixed-type ones (e.g. Batch 1 / "Quick Add",
+    contradictions holding objects) as JSON text, so a load returns exactly what SQLite holds."""
+    arrays, json_columns = [], []
+    for name, values in data.items():
+        arr = None
+        if name in LIST_FIELDS:
+            if all(isinstance(x, str) for v in values for x in v):
+                arr = pa.array(values, type=pa.list_(pa.string()))
+        else:
+            try:
+                arr = pa.array(values)
+                if not (pa.types.is_string(arr.type) or pa.types.is_integer(arr.type) or pa.types.is_floating(arr.type)
+                        or pa.types.is_boolean(arr.type) or pa.types.is_null(arr.type)):
+                    arr = None
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                arr = None
+        if arr is None:
+            json_columns.append(name)
+            arr = pa.array([None if v is None else json.dumps(v, ensure_ascii=False) for v in values], pa.string())
+        arrays.append(arr)
+    meta = {"max_seq": max_seq, "changes": changes, "rows": len(data["Filename"]), "columns": list(data),
+            "json_columns": json_columns}
+    table = pa.Table.from_arrays(arrays, names=list(data)).replace_schema_metadata(
+        {"master_store": json.dumps(meta)})
+    tmp = path.with_suffix(".tmp")
+    pa.parquet.write_table(table, tmp)
+    os.replace(tmp, path)
+
+def _read_snapshot(pa, path: Path, store: "MasterStore"):
+    """(DataFrame, max_seq) from the snapshot, or None when it is unreadable or no longer matches the store."""
+    import pandas as pd
+    try:
+        table = pa.parquet.read_table(path)
+        meta = json.loads(table.schema.metadata[b"master_store"])
+    except Exception:
+        return None
+    if meta.get("changes") != store._changes():
+        return None  # rows were edited or removed since the snapshot
+    with store._lock:
+        count = store._conn.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE seq <= ?", (meta["max_seq"],)).fetchone()[0]
+    if count != meta["rows"]:
+        return None  # rows removed while the triggers were missing (e.g. a store restored from an old backup)
+    lists = [c for c in meta["columns"] if c in LIST_FIELDS or c in meta["json_columns"]]
+    df = table.drop_columns(lists).to_pandas()
+    with _gc_paused():
+        for name in lists:
+            values = table.column(name).to_pylist()
+            if name not in meta["json_columns"]:
+                df[name] = values
+            elif name in LIST_FIELDS:
+                df[name] = _decode_lists(values)
+            else:
+                df[name] = [None if v is None else json.loads(v) for v in values]
+    return df[meta["columns"]], meta["max_seq"]
+
+def _literal_list_after(source: str, marker: str) -> str:
+    """Source text of the ``[...]`` literal that follows ``marker`` (brackets inside strings ignored)."""
+    start = source.find(marker)
+    if start < 0:
+        raise ValueError(f"{marker!r} not found")
+    start = source.index("[", start)
+    depth, i, quote = 0, start, None
+    while i < len(source):
+        ch = source[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif source.startswith(quote, i):
+                i += len(quote) - 1
+                quote = None
+        elif ch == "#":
+            i = source.find("\n", i)
+            if i < 0:
+                break
+        elif ch in "\"'":
+            quote = ch * 3 if source.startswith(ch * 3, i) else ch
+            i += len(quote) - 1
+        elif ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                return source[start:i + 1]
+        i += 1
+    raise ValueError(f"unterminated list after {marker!r}")
+
+def read_legacy_records(py_path: Path) -> List[Dict[str, Any]]:
+    """Records of a legacy ``master_data = [...]`` literal, read with ast.literal_eval (nothing is executed)."""
+    source = Path(py_path).read_text(encoding="utf-8")
+    data = ast.literal_eval(_literal_list_after(source, "master_data = ["))
+    return [r for r in data if isinstance(r, dict)]
+
+class MasterStore:
+    def __init__(self, db_path: Path = DEFAULT_MASTER_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(_q(c) for c in MASTER_COLUMNS)
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {TABLE} (seq INTEGER PRIMARY KEY AUTOINCREMENT, {columns}, extra TEXT);
+            CREATE INDEX IF NOT EXISTS {TABLE}_filename ON {TABLE}("Filename");
+            CREATE TABLE IF NOT EXISTS {META} (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO {META} VALUES ('changes', 0);
+            CREATE TRIGGER IF NOT EXISTS {TABLE}_updated AFTER UPDATE ON {TABLE}
+                BEGIN UPDATE {META} SET value = value + 1 WHERE key = 'changes'; END;
+            CREATE TRIGGER IF NOT EXISTS {TABLE}_deleted AFTER DELETE ON {TABLE}
+                BEGIN UPDATE {META} SET value = value + 1 WHERE key = 'changes'; END;
+        """)
+        present = {r[1] for r in self._conn.execute(f"PRAGMA table_info({TABLE})")}
+        missing = [c for c in MASTER_COLUMNS if c not in present]
+        for column in missing:
+            self._conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_q(column)}")
+        if missing:
+            self._conn.execute(f"UPDATE {META} SET value = value + 1 WHERE key = 'changes'")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+
+    def filenames(self) -> Set[str]:
+        with self._lock:
+            return {r[0] for r in self._conn.execute(f'SELECT "Filename" FROM {TABLE}') if r[0] is not None}
+
+    def append(self, records: Iterable[Dict[str, Any]], skip_existing: bool = False) -> int:
+        """Insert records in order; with ``skip_existing`` known filenames are left out. Returns rows added."""
+        known = self.filenames() if skip_existing else set()
+        rows = []
+        for rec in records:
+            rec = normalize_record(rec)
+            if skip_existing:
+                if rec.get("Filename") in known:
+                    continue
+                known.add(rec.get("Filename"))
+            extra = {k: v for k, v in rec.items() if k not in MASTER_COLUMNS}
+            rows.append([_encode(c, rec.get(c)) for c in MASTER_COLUMNS]
+                        + [json.dumps(extra, ensure_ascii=False, default=str) if extra else None])
+        if rows:
+            sql = (f"INSERT INTO {TABLE} ({', '.join(_q(c) for c in MASTER_COLUMNS)}, extra) "
+                   f"VALUES ({', '.join('?' * (len(MASTER_COLUMNS) + 1))})")
+            with self._lock, self._conn:
+                self._conn.executemany(sql, rows)
+        return len(rows)
+
+    def update_record(self, filename: str, fields: Dict[str, Any]) -> int:
+        """Set ``fields`` on every row with this filename (keys outside MASTER_COLUMNS go to ``extra``).
+        Returns rows changed."""
+        fields = dict(fields)
+        if "Filename" in fields and fields["Filename"] != filename:
+            raise ValueError("Filename is the record key; delete and append to rename")
+        columns = {c: _encode(c, v) for c, v in fields.items() if c in MASTER_COLUMNS}
+        extra = {k: v for k, v in fields.items() if k not in MASTER_COLUMNS}
+        with self._lock, self._conn:
+            rows = self._conn.execute(f'SELECT seq, extra FROM {TABLE} WHERE "Filename" = ?', (filename,)).fetchall()
+            for seq, raw in rows:
+                values = dict(columns)
+                if extra:
+                    merged = {**(json.loads(raw) if raw else {}), **extra}
+                    values["extra"] = json.dumps(merged, ensure_ascii=False, default=str)
+                if values:
+                    assign = ", ".join(f"{_q(c)} = ?" for c in values)
+                    self._conn.execute(f"UPDATE {TABLE} SET {assign} WHERE seq = ?", [*values.values(), seq])
+        return len(rows) if (columns or extra) else 0
+
+    def delete_records(self, filenames: Iterable[str]) -> int:
+        """Remove every row whose filename is listed; returns rows removed."""
+        names = [(f,) for f in dict.fromkeys(filenames)]
+        with self._lock, self._conn:
+            return self._conn.executemany(f'DELETE FROM {TABLE} WHERE "Filename" = ?', names).rowcount
+
+    def _changes(self) -> int:
+        """UPDATE / DELETE count kept by the store_meta triggers."""
+        with self._lock:
+            return self._conn.execute(f"SELECT value FROM {META} WHERE key = 'changes'").fetchone()[0]
+
+    def _columns(self, after_seq: int = 0) -> Dict[str, list]:
+        """Column name -> decoded values for rows with seq > ``after_seq``, in row order (extra keys included)."""
+        select = ", ".join(f"COALESCE({_q(c)}, '[]')" if c in LIST_FIELDS else _q(c) for c in MASTER_COLUMNS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {select}, extra FROM {TABLE} WHERE seq > ? ORDER BY seq", (after_seq,)).fetchall()
+        if not rows:
+            return {c: [] for c in MASTER_COLUMNS}
+        with _gc_paused():  # hundreds of thousands of small lists; collection passes would dominate
+            cols = list(zip(*rows))
+            data: Dict[str, list] = {}
+            for name, values in zip(MASTER_COLUMNS, cols):
+                if name in LIST_FIELDS:
+                    data[name] = _decode_lists(values)
+                elif name == "needsReview":
+                    data[name] = [bool(v) for v in values]
+                else:
+                    data[name] = list(values)
+            extras = cols[-1]
+            if any(extras):
+                for i, raw in enumerate(extras):
+                    for k, v in (json.loads(raw) if raw else {}).items():
+                        data.setdefault(k, [None] * len(rows))[i] = v
+        return data
+
+    def _max_seq(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {TABLE}").fetchone()[0]
+
+    def records(self) -> List[Dict[str, Any]]:
+        data = self._columns()
+        names = list(data)
+        return [dict(zip(names, values)) for values in zip(*(data[n] for n in names))]
+
+    def dataframe(self):
+        """All records as a DataFrame.
+
+        With pyarrow installed, rows up to the snapshot's seq come from the Parquet
+        snapshot and only later appends are read from SQLite; the snapshot is
+        rewritten once that tail reaches SNAPSHOT_MIN_TAIL rows (or a tenth of the table).
+        """
+        import pandas as pd
+        arrow = try_import_pyarrow()
+        if arrow is None:
+            return pd.DataFrame(self._columns())
+        snap_path = snapshot_path(self.db_path)
+        changes = self._changes()  # read before the rows, so a concurrent edit invalidates the snapshot
+        max_seq = self._max_seq()
+        loaded = _read_snapshot(arrow, snap_path, self) if snap_path.exists() else None
+        if loaded is not None:
+            df, snap_seq = loaded
+            tail = self._columns(after_seq=snap_seq)
+            tail_rows = len(tail["Filename"])
+            if tail_rows < max(SNAPSHOT_MIN_TAIL, len(df) // 10):
+                if not tail_rows:
+                    return df
+                return pd.concat([df, pd.DataFrame(tail)], ignore_index=True)
+        data = self._columns()
+        try:
+            _write_snapshot(arrow, snap_path, data, max_seq, changes)
+        except Exception as e:
+            print(f"Master store: snapshot not written ({e}); loads read SQLite only")
+        return pd.DataFrame(data)
+
+    def export_parquet(self, path: Path) -> int:
+        df = self.dataframe()
+        for c in LIST_FIELDS:
+            # contradictions may mix strings and objects; keep lists Arrow-friendly
+            df[c] = df[c].map(lambda v: [x if isinstance(x, str) else json.dumps(x, ensure_ascii=False) for x in v])
+        df.to_parquet(path, index=False)
+        return len(df)
+
+    def backup(self, dest: Path) -> Path:
+        """Consistent copy of the store (safe while other connections are open)."""
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        target = sqlite3.connect(str(dest))
+        try:
+            with self._lock:
+                self._conn.backup(target)
+        finally:
+            target.close()
+        return dest
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def load_records(db_path: Path = DEFAULT_MASTER_DB) -> List[Dict[str, Any]]:
+    store = MasterStore(db_path)
+    try:
+        return store.records()
+    finally:
+        store.close()
+
+def load_dataframe(db_path: Path = DEFAULT_MASTER_DB):
+    store = MasterStore(db_path)
+    try:
+        return store.dataframe()
+    finally:
+        store.close()
+
+def append_records(records: Iterable[Dict[str, Any]], db_path: Path = DEFAULT_MASTER_DB,
+                   skip_existing: bool = False) -> int:
+    store = MasterStore(db_path)
+    try:
+        return store.append(records, skip_existing=skip_existing)
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Manage the master evidence records store")
+    parser.add_argument('--db', default=str(DEFAULT_MASTER_DB), help='Store path')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    m = sub.add_parser('migrate', help='Import the master_data literal of a legacy MASTER_JUSTICE_FILE_SUPREME.py')
+    m.add_argument('source')
+    a = sub.add_parser('append', help='Append records from a JSON list (e.g. new_documents_template.json)')
+    a.add_argument('json_file')
+    a.add_argument('--allow-duplicates', action='store_true', help='Also append filenames already stored')
+    s = sub.add_parser('import-summaries', help='Append Task A JSON records (SUMMARY_*.json) not stored yet')
+    s.add_argument('out_dir')
+    e = sub.add_parser('export', help='Write the records to Parquet and/or JSON')
+    e.add_argument('--parquet', default=None)
+    e.add_argument('--json', default=None)
+    args = parser.parse_args()
+
+    store = MasterStore(Path(args.db))
+    if args.cmd == 'migrate':
+        legacy = read_legacy_records(Path(args.source))
+        added = store.append(legacy, skip_existing=True)
+        print(f"Migrated {added} of {len(legacy)} records ({len(legacy) - added} already stored) -> {store.db_path}")
+    elif args.cmd == 'append':
+        docs = json.loads(Path(args.json_file).read_text(encoding='utf-8'))
+        added = store.append(docs, skip_existing=not args.allow_duplicates)
+        print(f"Appended {added} of {len(docs)} records -> {store.db_path}")
+    elif args.cmd == 'import-summaries':
+        from pipeline.utils.summary_schema import load_record, master_fields
+        found = [r for r in map(load_record, sorted(Path(args.out_dir).glob('SUMMARY_*.json'))) if r]
+        added = store.append((master_fields(r) for r in found), skip_existing=True)
+        print(f"Imported {added} of {len(found)} Task A records -> {store.db_path}")
+    else:
+        if args.parquet:
+            print(f"Parquet: {store.export_parquet(Path(args.parquet))} records -> {args.parquet}")
+        if args.json:
+            Path(args.json).write_text(json.dumps(store.records(), indent=2, ensure_ascii=False), encoding='utf-8')
+            print(f"JSON: {len(store)} records -> {args.json}")
+    store.close()
@@ -0,0 +1,582 @@
+"""Master workbook builder (MASTER_JUSTICE_FILE_SUPREME_v1.xlsx).
+
+Single pass, write-only: every sheet (dedication, phase status, the Justice
+Master Table, case summary, Records, Summary) is streamed into one
+``Workbook(write_only=True)`` and saved once. Nothing is re-read or re-walked:
+column widths are computed column-wise from the DataFrame before the rows are
+streamed (write-only sheets need them up front), and each row's styles are
+decided as it is written. Styled cells copy a prepared style array instead of
+resolving Font/Fill objects per cell, so time and memory stay flat per row.
+
+Incremental updates (``update_master_workbook``): a manifest next to the
+workbook (``<name>.manifest.json``) keeps a digest per record row and per
+derived sheet from the last write. The next run patches the saved file
+instead of rebuilding it: the Justice Master Table and Records sheet XML is
+streamed through, with only new or changed rows rendered, and the other
+sheets are re-rendered only when their inputs changed. All styles are
+registered in one fixed order, so a patched sheet is byte-identical to a
+full rebuild. Anything unexpected (no manifest, other columns, the workbook
+saved by Excel or another tool, most rows changed, an openpyxl version other
+than the one that wrote it or one pipeline/utils/xlsx_internals.py was not
+checked against) falls back to a full build.
+Sheets this module does not own (e.g. AI_Outputs, written by the pipeline's
+outputs index) are carried over into the rebuilt file as plain values.
+"""
+from __future__ import annotations
+import base64
+import json
+import os
+import re
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from pipeline.utils.case_stats import CaseStats, compute_case_stats
+from pipeline.utils.io_utils import hash_text, json_dump
+from pipeline.utils.master_store import LIST_FIELDS
+from pipeline.utils import xlsx_internals as xlsx
+
+MASTER_XLSX = Path("MASTER_JUSTICE_FILE_SUPREME_v1.xlsx")
+PRAYER_SHEET = "🙏 Dedication & Prayer"
+STATUS_SHEET = "📊 Phase Status"
+MAIN_SHEET = "⚖️ Justice Master Table"
+CASE_SUMMARY_SHEET = "📈 Case Summary"
+RECORDS_SHEET = "Records"
+SUMMARY_SHEET = "Summary"
+SHEETS = [PRAYER_SHEET, STATUS_SHEET, MAIN_SHEET, CASE_SUMMARY_SHEET, RECORDS_SHEET, SUMMARY_SHEET]
+ROW_SHEETS = [MAIN_SHEET, RECORDS_SHEET]  # one row per record, patched row by row
+STATUS_HEADERS = ["Phase", "Status", "Documents", "Key Findings", "Next Action"]
+MAX_COL_WIDTH = 50  # cap for readability
+CHUNK_ROWS = 10000  # rows converted to sheet values at a time
+LAYOUT_VERSION = 1  # bump when sheet layout or styles change (invalidates manifests)
+PATCH_MAX_CHANGED = 0.5  # rebuild instead of patching when more of the rows changed
+
+PATTERN_COLORS = {
+    "🟥": "FFC7CE",    # Light red - Problems/Misconduct
+    "🟦": "D9E1F2",    # Light blue - Legal Actions
+    "🟩": "C6EFCE",    # Light green - Victories/Validation
+    "🟨": "FFEB9C",    # Light yellow - Warnings/Concerns
+    "🟧": "FFD8B0",    # Light orange - Important Notes
+    "🟪": "E4DFEC",    # Light purple - Special Categories
+}
+STATUS_COLORS = {"✅": "C6EFCE", "⬜": "FFEB9C", "🔄": "D9E1F2"}
+
+def _fill(color: str) -> PatternFill:
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+def _style_table() -> List[tuple]:
+    """(key, style) for every styled cell in the workbook, in registration order."""
+    table = [
+        ("prayer.title", dict(font=Font(bold=True, size=16, color="8B0000"), alignment=Alignment(horizontal="center"))),
+        ("prayer.scripture", dict(font=Font(italic=True, color="4B0082"))),
+        ("prayer.declaration", dict(font=Font(bold=True, size=14, color="FF4500"), alignment=Alignment(horizontal="center"))),
+        ("prayer.signature", dict(font=Font(bold=True, color="2F4F4F"))),
+        ("status.header", dict(font=Font(bold=True, color="FFFFFF"), fill=_fill("4472C4"))),
+    ]
+    table += [(f"status.{mark}", dict(fill=_fill(color))) for mark, color in STATUS_COLORS.items()]
+    table += [
+        ("main.header", dict(font=Font(bold=True, color="FFFFFF", size=12), fill=_fill("2F4F4F"),
+                             alignment=Alignment(horizontal="center", vertical="center"))),
+        ("main.smoking", dict(font=Font(bold=True, color="8B0000"))),
+        ("main.top5", dict(font=Font(bold=True, color="DAA520"))),
+    ]
+    for code, color in PATTERN_COLORS.items():
+        table += [
+            (f"main.{code}", dict(fill=_fill(color))),
+            (f"main.{code}smoking", dict(fill=_fill(color), font=Font(bold=True, color="8B0000"))),
+            (f"main.{code}top5", dict(fill=_fill(color), font=Font(bold=True, color="DAA520"))),
+        ]
+    table += [
+        ("case.title", dict(font=Font(bold=True, size=14, color="8B0000"), alignment=Alignment(horizontal="center"))),
+        ("case.section", dict(font=Font(bold=True, size=12, color="4B0082"))),
+        ("case.pattern", dict(font=Font(bold=True))),
+        ("case.pattern_value", dict(font=Font(bold=True, color="8B0000"))),
+    ]
+    return table
+
+class CellFactory:
+    """Write-only cells for one workbook; each distinct style is resolved once, then its style array is copied.
+
+    Every style is registered with the workbook up front and in a fixed order,
+    so a style's id in styles.xml is the same in every workbook built by this
+    module (what lets patched rows reuse the saved styles.xml).
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._styles: Dict[str, object] = {}
+        for key, style in _style_table():
+            if not xlsx.SUPPORTED:  # public API only: attributes are set per cell
+                self._styles[key] = style
+                continue
+            proto = WriteOnlyCell(ws)
+            for attr, value in style.items():
+                setattr(proto, attr, value)
+            self._styles[key] = xlsx.cell_style(proto)
+            xlsx.register_style(ws, self._styles[key])
+
+    def __call__(self, value, key: Optional[str] = None):
+        if key is None:
+            return value
+        cell = WriteOnlyCell(self.ws, value)
+        if xlsx.SUPPORTED:
+            xlsx.apply_style(cell, self._styles[key])
+        else:
+            for attr, style in self._styles[key].items():
+                setattr(cell, attr, style)
+        return cell
+
+def list_cell(values):
+    """Sheets get list fields as text (openpyxl cannot write lists)."""
+    return "; ".join(v if isinstance(v, str) else str(v) for v in values) if isinstance(values, list) else values
+
+def sheet_column(col):
+    """One master column as sheet values: list fields joined, NaN/NA -> None."""
+    if col.name in LIST_FIELDS:
+        col = col.map(list_cell)
+    col = col.astype(object)
+    return col.where(col.notna(), None)
+
+def sheet_frame(df):
+    """Copy of (part of) the master DataFrame as sheet values."""
+    return df.apply(sheet_column)
+
+def sheet_rows(df, chunk_rows: int = CHUNK_ROWS):
+    """Row tuples of sheet values, converted ``chunk_rows`` at a time (never a full copy)."""
+    for start in range(0, len(df), chunk_rows):
+        yield from sheet_frame(df.iloc[start:start + chunk_rows]).itertuples(index=False, name=None)
+
+def text_widths(df) -> List[int]:
+    """Longest str() of each column's sheet values, header included (one vectorized pass per column).
+
+    Empty cells count as 0, so a column with no values at all is as wide as its header.
+    """
+    widths = []
+    for name in df.columns:
+        longest = sheet_column(df[name]).astype("string").str.len().max() if len(df) else 0
+        widths.append(max(0 if pd.isna(longest) else int(longest), len(str(name))))
+    return widths
+
+def row_digests(df) -> np.ndarray:
+    """One uint64 per record over its sheet values (hashed column by column)."""
+    digest = np.zeros(len(df), dtype=np.uint64)
+    for name in df.columns:
+        col = pd.util.hash_pandas_object(sheet_column(df[name]), index=False).to_numpy()
+        digest = (digest * np.uint64(1099511628211)) ^ col  # FNV prime; wraps around
+    return digest
+
+def _set_widths(ws, widths: Sequence[float]) -> None:
+    for i, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+
+# --- sheet rows ---------------------------------------------------------------
+
+def _prayer_rows(cells: CellFactory, lines: Sequence[Sequence[str]]):
+    for i, line in enumerate(lines, 1):
+        text = line[0] if line else ""
+        if i == 1:  # Title
+            key = "prayer.title"
+        elif "Amos" in text or "Psalm" in text:  # Scripture
+            key = "prayer.scripture"
+        elif "TRUTH WILL PREVAIL" in text:  # Final declaration
+            key = "prayer.declaration"
+        elif "Stephanie" in text:  # Signature
+            key = "prayer.signature"
+        else:
+            key = None
+        yield [cells(text or None, key)]
+
+def _status_rows(cells: CellFactory, rows: Sequence[Sequence]):
+    yield [cells(h, "status.header") for h in STATUS_HEADERS]
+    for row in rows:
+        status = str(row[1])
+        mark = next((mark for mark in STATUS_COLORS if mark in status), None)
+        yield [row[0], cells(row[1], mark and f"status.{mark}"), *row[2:]]
+
+class MainTable:
+    """Justice Master Table layout: which columns drive the row styles."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.pattern_col = self.columns.index("Pattern") if "Pattern" in self.columns else None
+        self.smoking_col = self.columns.index("Smoking Gun") if "Smoking Gun" in self.columns else None
+        self.top5_col = self.columns.index("Top 5") if "Top 5" in self.columns else None
+
+    def widths(self, df) -> List[int]:
+        """Text widths of the sheet cells (before padding/cap), 🔥 YES / ⭐ YES included."""
+        widths = text_widths(df)
+        for col, shown in ((self.smoking_col, "🔥 YES"), (self.top5_col, "⭐ YES")):
+            if col is not None and (df.iloc[:, col] == "Yes").any():
+                widths[col] = max(widths[col], len(shown))
+        return widths
+
+    def header(self, cells: CellFactory) -> list:
+        return [cells(h, "main.header") for h in self.columns]
+
+    def row(self, cells: CellFactory, values: Sequence) -> list:
+        code = None
+        if self.pattern_col is not None:
+            pat = str(values[self.pattern_col])
+            code = next((c for c in PATTERN_COLORS if pat.startswith(c)), None)
+        row = [cells(v, f"main.{code}") for v in values] if code else list(values)
+        # Highlight smoking guns / Top 5 (shown as 🔥 YES / ⭐ YES)
+        if self.smoking_col is not None and values[self.smoking_col] == "Yes":
+            row[self.smoking_col] = cells("🔥 YES", f"main.{code or ''}smoking")
+        if self.top5_col is not None and values[self.top5_col] == "Yes":
+            row[self.top5_col] = cells("⭐ YES", f"main.{code or ''}top5")
+        return row
+
+def case_summary_rows(stats: CaseStats) -> List[list]:
+    """The "📈 Case Summary" sheet rows ([title] or [label, value])."""
+    patterns, agencies = stats.pattern_groups, stats.agency_groups
+    return [
+        ["CASE STATISTICS & KEY METRICS"],
+        [""],
+        ["Total Documents Reviewed:", stats.total],
+        ["Smoking Gun Evidence:", stats.smoking_guns],
+        ["Top 5 Priority Items:", stats.top5],
+        ["Misconduct Documented:", stats.misconduct],
+        ["Legal Violations Found:", stats.law_violations],
+        [""],
+        ["PATTERN BREAKDOWN:"],
+        ["🟥 CPS Misconduct/Minimization:", patterns["🟥"]],
+        ["🟩 Victories/Validation:", patterns["🟩"]],
+        ["🟦 Legal Actions:", patterns["🟦"]],
+        [""],
+        ["AGENCIES INVOLVED:"],
+        ["CPS:", agencies["CPS"]],
+        ["Medical/YWCA:", agencies["YWCA"]],
+        ["Court/Legal:", agencies["Court|Attorney"]],
+        ["Independent Review:", agencies["Review"]],
+        [""],
+        ["🔥 CASE STRENGTH: OVERWHELMING EVIDENCE 🔥"],
+        ["📖 STATUS: READY FOR JUSTICE ⚖️"],
+    ]
+
+def _case_summary_sheet_rows(cells: CellFactory, items: Iterable[list]):
+    for item in items:
+        if len(item) == 1:
+            text = item[0]
+            key = None
+            if "STATISTICS" in text or "CASE STRENGTH" in text or "STATUS" in text:
+                key = "case.title"
+            elif "BREAKDOWN" in text or "AGENCIES" in text:
+                key = "case.section"
+            yield [cells(text or None, key)]
+        else:
+            label, value = item
+            emphasized = "🟥" in label or "🟩" in label or "🟦" in label
+            yield [cells(label, "case.pattern" if emphasized else None),
+                   cells(value, "case.pattern_value" if emphasized else None)]
+
+def summary_tables(stats: CaseStats):
+    """(Metric/Value rows, Severity/Count rows) for the Summary sheet."""
+    metrics = [["Total Records", stats.total], ["Needs Review", stats.needs_review]]
+    severity = [[s, n] for s, n in stats.severity.items()]
+    return metrics, severity
+
+def _summary_sheet_rows(stats: CaseStats):
+    metrics, severity = summary_tables(stats)
+    # two tables side by side: Metric/Value in A:B, Severity/Count in E:F
+    yield ["Metric", "Value", None, None, "Severity", "Count"]
+    for i in range(max(len(metrics), len(severity))):
+        left = metrics[i] if i < len(metrics) else [None, None]
+        right = severity[i] if i < len(severity) else [None, None]
+        yield [*left, None, None, *right]
+
+FIXED_WIDTHS = {PRAYER_SHEET: {"A": 60}, CASE_SUMMARY_SHEET: {"A": 40, "B": 15}}
+
+def _small_sheets(cells: CellFactory, prayer_content, status_rows, stats: CaseStats) -> Dict[str, list]:
+    """Rows of the sheets that are rebuilt whole (not per record)."""
+    return {
+        PRAYER_SHEET: list(_prayer_rows(cells, prayer_content)),
+        STATUS_SHEET: list(_status_rows(cells, status_rows)),
+        CASE_SUMMARY_SHEET: list(_case_summary_sheet_rows(cells, case_summary_rows(stats))),
+        SUMMARY_SHEET: list(_summary_sheet_rows(stats)),
+    }
+
+def _sheet_digest(rows: Sequence[Sequence]) -> str:
+    plain = [[c.value if isinstance(c, Cell) else c for c in row] for row in rows]
+    keyed = [[xlsx.style_key(c) if isinstance(c, Cell) else None for c in row] for row in rows]
+    return hash_text(json.dumps([plain, keyed], default=str))
+
+# --- full build -----------------------------------------------------------------
+
+def _open_foreign_sheets(path: Path):
+    """Read-only view of an existing workbook that has sheets besides SHEETS, else None."""
+    if not path.exists():
+        return None
+    try:
+        old = load_workbook(path, read_only=True)
+    except Exception as e:
+        print(f"⚠️ Could not read {path.name} to keep its other sheets: {e}")
+        return None
+    if all(title in SHEETS for title in old.sheetnames):
+        old.close()
+        return None
+    return old
+
+def build_master_workbook(df, path: Path = MASTER_XLSX, prayer_content: Sequence[Sequence[str]] = (),
+                          status_rows: Sequence[Sequence] = (), stats: Optional[CaseStats] = None) -> Path:
+    """Write the whole master workbook in one streamed save (and its manifest); returns the path.
+
+    Other sheets of an existing workbook at ``path`` are copied over (values only).
+    """
+    path = Path(path)
+    stats = stats or compute_case_stats(df)
+    wb = Workbook(write_only=True)
+    sheets = {title: wb.create_sheet(title) for title in SHEETS}
+    old = _open_foreign_sheets(path)
+    cells = CellFactory(sheets[PRAYER_SHEET])
+    small = _small_sheets(cells, prayer_content, status_rows, stats)
+    for title, widths in FIXED_WIDTHS.items():
+        for letter, width in widths.items():
+            sheets[title].column_dimensions[letter].width = width
+    for title in (PRAYER_SHEET, STATUS_SHEET):
+        for row in small[title]:
+            sheets[title].append(row)
+
+    table = MainTable(df.columns)
+    widths = table.widths(df)
+    ws = sheets[MAIN_SHEET]
+    _set_widths(ws, [min(w + 2, MAX_COL_WIDTH) for w in widths])
+    ws.append(table.header(cells))
+    for values in sheet_rows(df):
+        ws.append(table.row(cells, values))
+
+    for row in small[CASE_SUMMARY_SHEET]:
+        sheets[CASE_SUMMARY_SHEET].append(row)
+    ws = sheets[RECORDS_SHEET]
+    ws.append(list(df.columns))
+    for values in sheet_rows(df):
+        ws.append(values)
+    for row in small[SUMMARY_SHEET]:
+        sheets[SUMMARY_SHEET].append(row)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        if old is not None:
+            for title in old.sheetnames:
+                if title not in SHEETS:
+                    ws = wb.create_sheet(title)
+                    for values in old[title].iter_rows(values_only=True):
+                        ws.append(values)
+            old.close()
+        wb.save(tmp)
+        os.replace(tmp, path)
+    finally:
+        if old is not None:
+            old.close()
+        if tmp.exists():
+            tmp.unlink()
+
+    _write_manifest(path, {
+        "columns": [str(c) for c in df.columns],
+        "parts": {title: ws.path.lstrip("/") for title, ws in sheets.items()},
+        "sheets": {title: _sheet_digest(rows) for title, rows in small.items()},
+        "widths": widths,
+        "rows": _encode_digests(row_digests(df)),
+    })
+    return path
+
+# --- incremental update -------------------------------------------------------------
+
+@dataclass
+class WorkbookUpdate:
+    path: Path
+    mode: str  # "full" | "patch" | "unchanged"
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    sheets: List[str] = field(default_factory=list)  # sheets rewritten
+    reason: str = ""  # why a full build was needed
+
+def manifest_path(path: Path) -> Path:
+    return Path(path).with_suffix(".manifest.json")
+
+def _encode_digests(digests: np.ndarray) -> str:
+    return base64.b64encode(digests.astype("<u8").tobytes()).decode("ascii")
+
+def _decode_digests(text: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype="<u8")
+
+def _write_manifest(path: Path, manifest: dict) -> None:
+    st = path.stat()
+    manifest = {"version": LAYOUT_VERSION, "openpyxl": xlsx.VERSION, "workbook": [st.st_size, st.st_mtime_ns],
+                **manifest}
+    json_dump(manifest_path(path), manifest)
+
+def _load_manifest(path: Path) -> tuple:
+    """(manifest, None) when the saved workbook can be patched, else (None, reason)."""
+    mpath = manifest_path(path)
+    if not path.exists():
+        return None, "no workbook yet"
+    if not mpath.exists():
+        return None, "no manifest"
+    try:
+        manifest = json.loads(mpath.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None, "unreadable manifest"
+    if manifest.get("version") != LAYOUT_VERSION:
+        return None, "workbook layout changed"
+    if manifest.get("openpyxl") != xlsx.VERSION:
+        return None, f"written by openpyxl {manifest.get('openpyxl')}, now {xlsx.VERSION}"
+    st = path.stat()
+    if manifest.get("workbook") != [st.st_size, st.st_mtime_ns]:
+        return None, "workbook was modified outside this script"
+    return manifest, None
+
+_ROW_RE = re.compile(rb'<row r="(\d+)"[^>]*?(?:/>|>.*?</row>)', re.S)
+
+def _split_sheet_xml(xml: bytes):
+    """(head ending in <sheetData>, {row number: row xml}, tail starting at </sheetData>)."""
+    start = xml.index(b"<sheetData")
+    close = xml.index(b">", start) + 1
+    if xml[close - 2:close] == b"/>":  # empty <sheetData />
+        return xml[:start] + b"<sheetData>", {}, b"</sheetData>" + xml[close:]
+    end = xml.index(b"</sheetData>", close)
+    rows = {int(m.group(1)): m.group(0) for m in _ROW_RE.finditer(xml, close, end)}
+    return xml[:close], rows, xml[end:]
+
+def _stream_rows(src, chunk_size: int = 1 << 20):
+    """(row number, row xml) for each <row> of a sheet XML stream, without loading it whole."""
+    buf = b""
+    started = False
+    for data in iter(lambda: src.read(chunk_size), b""):
+        buf += data
+        if not started:
+            start = buf.find(b"<sheetData")
+            close = buf.find(b">", start) if start >= 0 else -1
+            if close < 0:
+                continue
+            if buf[close - 1:close + 1] == b"/>":
+                return
+            buf = buf[close + 1:]
+            started = True
+        pos = 0
+        for m in _ROW_RE.finditer(buf):
+            yield int(m.group(1)), m.group(0)
+            pos = m.end()
+        buf = buf[pos:]
+        if buf.lstrip().startswith(b"</sheetData>"):
+            return
+
+class _Renderer:
+    """Renders sheet XML the way the full build does (same writer, same style ids)."""
+
+    def __init__(self):
+        self.wb = Workbook(write_only=True)
+        self.cells = CellFactory(self.wb.create_sheet("styles"))
+
+    def sheet(self, rows: Iterable[tuple], widths: Optional[Dict[str, float]] = None) -> bytes:
+        """Full worksheet XML for ``(row number, values)`` pairs."""
+        ws = self.wb.create_sheet()
+        for letter, width in (widths or {}).items():
+            ws.column_dimensions[letter].width = width
+        xml = xlsx.render_sheet(ws, rows)
+        self.wb.remove(ws)
+        return xml
+
+def _patch_rows(zin, zout, part: str, head: bytes, tail: bytes, new_rows: Dict[int, bytes], keep_upto: int) -> None:
+    """Stream ``part`` from the old zip into the new one, swapping in ``new_rows`` and dropping rows past ``keep_upto``."""
+    with zin.open(part) as src, zout.open(part, "w", force_zip64=True) as dst:
+        dst.write(head)
+        for row_idx, xml in _stream_rows(src):
+            if row_idx > keep_upto:
+                break
+            dst.write(new_rows.pop(row_idx, xml))
+        for row_idx in sorted(new_rows):
+            dst.write(new_rows[row_idx])
+        dst.write(tail)
+
+def update_master_workbook(df, path: Path = MASTER_XLSX, prayer_content: Sequence[Sequence[str]] = (),
+                           status_rows: Sequence[Sequence] = (), full: bool = False) -> WorkbookUpdate:
+    """Bring the workbook up to date, patching the last written file when possible."""
+    path = Path(path)
+    stats = compute_case_stats(df)
+    if full:
+        manifest, reason = None, "--full"
+    elif not xlsx.SUPPORTED:
+        manifest, reason = None, xlsx.UNSUPPORTED_REASON
+    else:
+        manifest, reason = _load_manifest(path)
+    if manifest is not None and manifest.get("columns") != [str(c) for c in df.columns]:
+        manifest, reason = None, "columns changed"
+
+    if manifest is not None:
+        old = _decode_digests(manifest["rows"])
+        new = row_digests(df)
+        n_old, n_new = len(old), len(new)
+        common = min(n_old, n_new)
+        changed = np.flatnonzero(old[:common] != new[:common])
+        removed = max(n_old - n_new, 0)
+        if len(changed) + removed > PATCH_MAX_CHANGED * max(n_old, 1):
+            manifest, reason = None, f"{len(changed) + removed} of {n_old} rows changed"
+    if manifest is None:
+        build_master_workbook(df, path, prayer_content, status_rows, stats)
+        return WorkbookUpdate(path, "full", added=len(df), sheets=list(SHEETS), reason=reason)
+
+    render = _Renderer()
+    cells = render.cells
+    small = _small_sheets(cells, prayer_content, status_rows, stats)
+    digests = {title: _sheet_digest(rows) for title, rows in small.items()}
+    stale = [title for title in small if digests[title] != manifest["sheets"].get(title)]
+    touched = sorted(set(changed.tolist()) | set(range(n_old, n_new)))
+    if not stale and not touched and not removed:
+        return WorkbookUpdate(path, "unchanged")
+
+    parts = {}
+    for title in stale:
+        widths = FIXED_WIDTHS.get(title)
+        parts[manifest["parts"][title]] = render.sheet(enumerate(small[title], 1), widths)
+
+    table = MainTable(df.columns)
+    widths = manifest["widths"]
+    patches = {}
+    if touched or removed:
+        if len(changed) or removed:
+            widths = table.widths(df)  # a changed row may have been the widest one
+        elif n_new > n_old:
+            added = table.widths(df.iloc[n_old:])
+            widths = [max(a, b) for a, b in zip(widths, added)]
+        letters = {get_column_letter(i): min(w + 2, MAX_COL_WIDTH) for i, w in enumerate(widths, 1)}
+        rows = sheet_frame(df.iloc[touched]).itertuples(index=False, name=None) if touched else []
+        main_rows, record_rows = [], []
+        for i, values in zip(touched, rows):
+            main_rows.append((i + 2, table.row(cells, values)))  # row 1 is the header
+            record_rows.append((i + 2, values))
+        for title, sheet_widths, sheet_rows_ in ((MAIN_SHEET, letters, main_rows), (RECORDS_SHEET, None, record_rows)):
+            head, new_rows, tail = _split_sheet_xml(render.sheet(sheet_rows_, sheet_widths))
+            patches[manifest["parts"][title]] = (head, tail, new_rows)
+
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with zipfile.ZipFile(path) as zin, zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                if info.filename in patches:
+                    head, tail, new_rows = patches[info.filename]
+                    _patch_rows(zin, zout, info.filename, head, tail, new_rows, keep_upto=n_new + 1)
+                elif info.filename in parts:
+                    zout.writestr(info, parts[info.filename])
+                else:
+                    zout.writestr(info, zin.read(info.filename))
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    manifest["sheets"] = digests
+    manifest["widths"] = widths
+    if touched or removed:
+        manifest["rows"] = _encode_digests(new)
+    _write_manifest(path, {k: v for k, v in manifest.items() if k not in ("version", "openpyxl", "workbook")})
+    rewritten = [t for t in SHEETS if t in stale or (t in ROW_SHEETS and patches)]
+    return WorkbookUpdate(path, "patch", added=max(n_new - n_old, 0), changed=len(changed),
+                          removed=removed, sheets=rewritten)
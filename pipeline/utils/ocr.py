@@ -0,0 +1,126 @@
+"""OCR fallback for scanned PDF pages (pytesseract + pdfplumber page rendering).
+
+Pages whose text layer has fewer than ``min_chars`` characters are rendered at
+``dpi`` and OCR'd on one shared process pool, a run of pages from the same PDF
+per task, so a batch uses every core without reopening a file per page.
+Successful pages are persisted per (file hash, page, dpi, lang) in the extract
+cache, so no page is OCR'd twice; failed pages are retried on the next run.
+
+Requires the tesseract binary on PATH (Windows: install from UB Mannheim and
+add it to PATH). When it is missing OCR is skipped with a single warning.
+"""
+from __future__ import annotations
+import atexit
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+@lru_cache(maxsize=1)
+def try_import_pytesseract():
+    """pytesseract when the tesseract binary works; probed once per process."""
+    try:
+        import pytesseract  # type: ignore
+        pytesseract.get_tesseract_version()  # raises when the binary is missing
+        return pytesseract
+    except Exception:
+        return None
+
+class OcrConfig:
+    def __init__(self, dpi: int = 300, min_chars: int = 25, lang: str = "eng", workers: Optional[int] = None):
+        self.dpi = dpi
+        self.min_chars = min_chars
+        self.lang = lang
+        self.workers = workers or os.cpu_count() or 1
+
+    def needs_ocr(self, page_text: str) -> bool:
+        return len(page_text.strip()) < self.min_chars
+
+def ocr_file_pages(path: str, pages: List[int], dpi: int, lang: str) -> Dict[int, Optional[str]]:
+    """Render and OCR 1-based pages of one PDF, opened once (runs inside pool workers).
+
+    A page that fails maps to None so the caller can tell it from a blank page.
+    """
+    import pdfplumber  # type: ignore
+    pytesseract = try_import_pytesseract()
+    if pytesseract is None:
+        raise RuntimeError("tesseract not available")
+    out: Dict[int, Optional[str]] = {}
+    with pdfplumber.open(path) as pdf:
+        for page_no in pages:
+            try:
+                image = pdf.pages[page_no - 1].to_image(resolution=dpi).original
+                out[page_no] = pytesseract.image_to_string(image, lang=lang) or ""
+            except Exception:
+                out[page_no] = None
+    return out
+
+def ocr_page(path: str, page_no: int, dpi: int, lang: str) -> Optional[str]:
+    """Render one 1-based PDF page and OCR it; None when it fails."""
+    return ocr_file_pages(path, [page_no], dpi, lang)[page_no]
+
+# One pool per process, shared by every caller (Task A runs extraction on several
+# threads). Spawned, not forked: forking a multithreaded parent can copy held locks.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _shared_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+@atexit.register
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _chunks(jobs: List[Tuple[str, int]], workers: int) -> List[Tuple[str, List[int]]]:
+    """Group pages by file, split so one long scan still spreads over the pool."""
+    by_file: Dict[str, List[int]] = {}
+    for path, page in jobs:
+        by_file.setdefault(path, []).append(page)
+    out = []
+    for path, pages in by_file.items():
+        size = max(1, -(-len(pages) // workers))
+        out.extend((path, pages[k:k + size]) for k in range(0, len(pages), size))
+    return out
+
+def ocr_pages(jobs: List[Tuple[str, int]], config: OcrConfig) -> Dict[Tuple[str, int], Optional[str]]:
+    """OCR (path, page) jobs on the shared process pool; failed pages map to None."""
+    results: Dict[Tuple[str, int], Optional[str]] = {job: None for job in jobs}
+    if not jobs:
+        return results
+    chunks = _chunks(jobs, config.workers)
+    if config.workers <= 1 or len(chunks) == 1:
+        for path, pages in chunks:
+            try:
+                results.update(((path, n), t) for n, t in ocr_file_pages(path, pages, config.dpi, config.lang).items())
+            except Exception:
+                pass
+        return results
+    pool = _shared_pool(config.workers)
+    futures = {pool.submit(ocr_file_pages, path, pages, config.dpi, config.lang): path for path, pages in chunks}
+    for fut, path in futures.items():
+        try:
+            results.update(((path, n), t) for n, t in fut.result().items())
+        except BrokenProcessPool:
+            _discard_pool(pool)  # a worker died; the next call starts a fresh pool
+        except Exception:
+            pass
+    return results
@@ -0,0 +1,229 @@
+"""AI output metadata store (SQLite) - the source of truth behind AI_Outputs.
+
+One row per recorded markdown output, keyed by display filename, plus a tag
+table, with indexes for lookups by filename, primary pattern, smoking-gun flag
+and tag. The AI_Outputs sheet of the master workbook is an export of this table
+(``export_excel``); Parquet export is available when pandas + pyarrow are.
+
+CLI:
+  python -m pipeline.utils.outputs_index find --pattern "RED*" --smoking-gun
+  python -m pipeline.utils.outputs_index export --excel MASTER_JUSTICE_FILE_SUPREME_v1.xlsx
+"""
+from __future__ import annotations
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from openpyxl import Workbook, load_workbook
+
+HEADERS = [
+    'Timestamp','Filename','Tasks','Children','Include','Smoking Gun','Top 5',
+    'Primary Pattern','Tags','Markdown Path','PDF Path'
+]
+COLUMNS = [
+    'timestamp', 'filename', 'tasks', 'children', 'include', 'smoking_gun', 'top5',
+    'primary_pattern', 'tags', 'markdown_path', 'pdf_path'
+]
+SHEET = 'AI_Outputs'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_outputs (
+    filename TEXT PRIMARY KEY,
+    timestamp TEXT,
+    tasks TEXT,
+    children TEXT,
+    include TEXT,
+    smoking_gun TEXT,
+    top5 TEXT,
+    primary_pattern TEXT COLLATE NOCASE,
+    tags TEXT,
+    markdown_path TEXT,
+    pdf_path TEXT,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ai_outputs_pattern ON ai_outputs(primary_pattern);
+CREATE INDEX IF NOT EXISTS ai_outputs_smoking ON ai_outputs(smoking_gun);
+CREATE INDEX IF NOT EXISTS ai_outputs_seq ON ai_outputs(seq);
+CREATE TABLE IF NOT EXISTS ai_output_tags (
+    tag TEXT NOT NULL COLLATE NOCASE,
+    filename TEXT NOT NULL,
+    PRIMARY KEY (tag, filename)
+);
+"""
+
+def default_index_path(excel_path: Path) -> Path:
+    """Store lives next to the workbook it feeds: <stem>.ai_outputs.sqlite."""
+    return excel_path.with_name(excel_path.stem + '.ai_outputs.sqlite')
+
+def split_tags(tags: Optional[str]) -> List[str]:
+    if not tags:
+        return []
+    return [t for t in (p.strip(" []'\"") for p in re.split(r'[;,]', str(tags))) if t]
+
+def iter_sheet_rows(excel_path: Path) -> Iterator[list]:
+    """AI_Outputs rows of an existing workbook, streamed in read-only mode."""
+    wb = load_workbook(excel_path, read_only=True)
+    try:
+        if SHEET not in wb.sheetnames:
+            return
+        ws = wb[SHEET]
+        ws.reset_dimensions()  # don't trust the stored <dimension>; read to the real end
+        for values in ws.iter_rows(min_row=2, max_col=len(HEADERS), values_only=True):
+            if len(values) > 1 and values[1]:
+                yield [v if v is not None else '' for v in values] + [''] * (len(HEADERS) - len(values))
+    finally:
+        wb.close()
+
+class OutputsIndex:
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ai_outputs").fetchone()[0]
+
+    def filenames(self) -> Set[str]:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT filename FROM ai_outputs")}
+
+    def add_rows(self, rows: Iterable[Sequence]) -> int:
+        """Insert rows given in HEADERS order; already-known filenames are ignored."""
+        added = 0
+        with self._lock, self._conn:
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM ai_outputs").fetchone()[0]
+            for row in rows:
+                values = [('' if v is None else str(v)) for v in row]
+                seq += 1
+                cur = self._conn.execute(
+                    f"INSERT OR IGNORE INTO ai_outputs ({', '.join(COLUMNS)}, seq) "
+                    f"VALUES ({', '.join('?' * len(COLUMNS))}, ?)", (*values, seq))
+                if cur.rowcount:
+                    added += 1
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO ai_output_tags (tag, filename) VALUES (?, ?)",
+                        [(tag, values[1]) for tag in split_tags(values[8])])
+        return added
+
+    def import_workbook(self, excel_path: Path) -> int:
+        """Seed from an existing AI_Outputs sheet (rows already indexed are skipped)."""
+        if not excel_path.exists():
+            return 0
+        try:
+            return self.add_rows(iter_sheet_rows(excel_path))
+        except Exception as e:
+            print(f"AI outputs index: could not import {excel_path.name}: {e}")
+            return 0
+
+    def get(self, filename: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM ai_outputs WHERE filename=?", (filename,)).fetchone()
+        return dict(row) if row else None
+
+    def find(self, pattern: Optional[str] = None, smoking_gun: Optional[bool] = None,
+             tag: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Rows matching every given filter. ``pattern`` is case-insensitive; ``*`` is a wildcard."""
+        where, params = [], []
+        if pattern:
+            where.append("primary_pattern LIKE ?")
+            params.append(pattern.replace('*', '%'))
+        if smoking_gun is not None:
+            where.append("smoking_gun = ?")
+            params.append('Yes' if smoking_gun else 'No')
+        if tag:
+            where.append("filename IN (SELECT filename FROM ai_output_tags WHERE tag = ?)")
+            params.append(tag)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM ai_outputs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY seq"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params)]
+
+    def rows(self) -> List[list]:
+        """All rows in HEADERS order, in insertion order."""
+        with self._lock:
+            return [list(r) for r in self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM ai_outputs ORDER BY seq")]
+
+    def export_excel(self, excel_path: Path) -> int:
+        """Rewrite the AI_Outputs sheet of ``excel_path`` from the index; other sheets are kept."""
+        rows = self.rows()
+        wb = load_workbook(excel_path) if excel_path.exists() else None
+        if wb is None:
+            wb = Workbook()
+            wb.active.title = SHEET
+            ws = wb.active
+        elif SHEET in wb.sheetnames:
+            position = wb.sheetnames.index(SHEET)
+            wb.remove(wb[SHEET])
+            ws = wb.create_sheet(SHEET, position)
+        else:
+            ws = wb.create_sheet(SHEET)
+        ws.append(HEADERS)
+        for row in rows:
+            ws.append(row)
+        wb.save(excel_path)
+        return len(rows)
+
+    def export_parquet(self, path: Path) -> int:
+        try:
+            import pandas as pd  # type: ignore
+        except Exception as e:
+            raise RuntimeError("Parquet export needs pandas (and pyarrow)") from e
+        rows = self.rows()
+        pd.DataFrame(rows, columns=HEADERS).to_parquet(path, index=False)
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def _print_rows(rows: List[Dict[str, str]]) -> None:
+    for r in rows:
+        print(f"{r['filename']:<40} {r['primary_pattern']:<22} smoking={r['smoking_gun']:<7} tags={r['tags']}")
+    print(f"{len(rows)} row(s)")
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Query or export the AI outputs index")
+    parser.add_argument('--excel', default='MASTER_JUSTICE_FILE_SUPREME_v1.xlsx', help='Workbook the index belongs to')
+    parser.add_argument('--db', default=None, help='Index path (default: <workbook stem>.ai_outputs.sqlite)')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    q = sub.add_parser('find', help='Look up rows')
+    q.add_argument('--file', help='Exact filename')
+    q.add_argument('--pattern', help='Primary pattern, * wildcard (e.g. "RED*")')
+    q.add_argument('--smoking-gun', action='store_true', help='Only smoking-gun rows')
+    q.add_argument('--tag', help='Tag (case-insensitive)')
+    q.add_argument('--limit', type=int, default=None)
+    e = sub.add_parser('export', help='Regenerate the AI_Outputs sheet and/or a Parquet file')
+    e.add_argument('--parquet', default=None, help='Also write this Parquet file')
+    e.add_argument('--no-excel', action='store_true', help='Skip the workbook export')
+    args = parser.parse_args()
+
+    excel = Path(args.excel)
+    index = OutputsIndex(Path(args.db) if args.db else default_index_path(excel))
+    if not len(index):
+        print(f"Seeded {index.import_workbook(excel)} rows from {excel.name}")
+    if args.cmd == 'find':
+        t0 = time.perf_counter()
+        found = ([r for r in [index.get(args.file)] if r] if args.file else
+                 index.find(args.pattern, True if args.smoking_gun else None, args.tag, args.limit))
+        _print_rows(found)
+        print(f"({(time.perf_counter() - t0) * 1000:.1f} ms)")
+    else:
+        if not args.no_excel:
+            print(f"AI_Outputs: {index.export_excel(excel)} rows -> {excel}")
+        if args.parquet:
+            print(f"Parquet: {index.export_parquet(Path(args.parquet))} rows -> {args.parquet}")
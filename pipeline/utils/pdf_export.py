@@ -1,20 +1,42 @@
 """PDF export utilities: convert markdown outputs to PDF.
 
 Primary path: markdown -> HTML -> PDF via WeasyPrint (if installed)
-Fallback path: plain text -> simple PDF via ReportLab.
+Fallback path: markdown streamed line by line -> PDF via ReportLab (pdf_fallback).
+
+``PdfRenderer`` holds the per-process setup (imports, markdown converter, parsed
+stylesheet, font configuration); the module-level functions use a shared one.
+
+``bulk_convert`` renders on a process pool (rendering is CPU-bound) and skips a
+markdown file when its PDF is newer and was produced with the same template and
+engine (recorded in ``.render_manifest.json`` inside the PDF folder).
 """
 from __future__ import annotations
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
+
+from pipeline.utils.io_utils import hash_text, json_dump
+from pipeline.utils.pdf_fallback import FALLBACK_LAYOUT, stream_markdown_to_pdf
 
-HTML_WRAPPER = """<html><head><meta charset='utf-8'><style>
+RENDER_MANIFEST = ".render_manifest.json"
+
+BASE_CSS = """
 body{font-family:Arial,Helvetica,sans-serif;line-height:1.35;font-size:12pt;margin:32px;color:#222}
 h1,h2,h3,h4{color:#2a2a2a;margin-top:1.2em}
 code,pre{background:#f5f5f5;padding:4px 6px;border-radius:4px;font-size:11pt}
 table{border-collapse:collapse;width:100%;margin:12px 0}
 th,td{border:1px solid #999;padding:4px 6px;font-size:10pt;vertical-align:top}
 th{background:#eee}
-</style></head><body>{content}</body></html>"""
+"""
+
+HTML_WRAPPER = "<html><head><meta charset='utf-8'><style>" + BASE_CSS + "</style></head><body>{content}</body></html>"
+BODY_WRAPPER = "<html><head><meta charset='utf-8'></head><body>{content}</body></html>"
+MD_EXTENSIONS = ['tables', 'fenced_code']
 
 def try_import_markdown():
     try:
@@ -30,6 +52,18 @@ def try_import_weasyprint():
     except Exception:
         return None
 
+def try_import_weasyprint_styles():
+    """(CSS, FontConfiguration) from WeasyPrint, or None."""
+    try:
+        from weasyprint import CSS  # type: ignore
+        try:
+            from weasyprint.text.fonts import FontConfiguration  # type: ignore
+        except ImportError:  # WeasyPrint < 53
+            from weasyprint.fonts import FontConfiguration  # type: ignore
+        return CSS, FontConfiguration
+    except Exception:
+        return None
+
 def try_import_reportlab():
     try:
         from reportlab.lib.pagesizes import LETTER
@@ -38,66 +72,174 @@ def try_import_reportlab():
     except Exception:
         return None
 
+class PdfRenderer:
+    """Markdown -> PDF with all per-document setup hoisted out of the loop.
+
+    Optional libraries are imported once, one ``markdown.Markdown`` instance is
+    reset between documents, and the stylesheet is parsed once into a WeasyPrint
+    ``CSS`` object sharing a single ``FontConfiguration``. Not thread-safe; use
+    one renderer per thread/process (``get_renderer()`` does that per process).
+    """
+
+    def __init__(self, css: str = BASE_CSS):
+        md_mod = try_import_markdown()
+        self._md = md_mod.Markdown(extensions=MD_EXTENSIONS) if md_mod else None
+        self._HTML = try_import_weasyprint()
+        self._stylesheets: List = []
+        self._font_config = None
+        styles = try_import_weasyprint_styles() if self._HTML else None
+        if styles:
+            CSS, FontConfiguration = styles
+            self._font_config = FontConfiguration()
+            self._stylesheets = [CSS(string=css, font_config=self._font_config)]
+        self._rl = None if self._HTML else try_import_reportlab()
+        self.engine = 'weasyprint' if self._HTML else ('reportlab' if self._rl else 'text')
+        self.css = css
+
+    def markdown_body(self, md_text: str) -> str:
+        if self._md is None:
+            # crude fallback: wrap plain text
+            return f"<pre>{escape(md_text)}</pre>"
+        return self._md.reset().convert(md_text)
+
+    def md_to_html(self, md_text: str) -> str:
+        """Standalone HTML document with the stylesheet inlined."""
+        return HTML_WRAPPER.replace("{content}", self.markdown_body(md_text))
+
+    def html_to_pdf(self, html: str, out_path: Path, stylesheets: Optional[List] = None) -> bool:
+        if not self._HTML:
+            return False
+        try:
+            self._HTML(string=html).write_pdf(str(out_path), stylesheets=stylesheets, font_config=self._font_config)
+            return True
+        except Exception:
+            return False
+
+    def render_markdown(self, md_text: str, pdf_path: Path) -> Path:
+        body = self.markdown_body(md_text)
+        if self._stylesheets:
+            # Pre-parsed stylesheet: the document itself carries no <style> to re-parse
+            ok = self.html_to_pdf(BODY_WRAPPER.replace("{content}", body), pdf_path, self._stylesheets)
+        else:
+            ok = self.html_to_pdf(HTML_WRAPPER.replace("{content}", body), pdf_path)
+        if not ok:
+            text_to_pdf_fallback(md_text, pdf_path, self._rl)
+        return pdf_path
+
+    def convert_file(self, md_path: Path, pdf_dir: Path) -> Path:
+        pdf_dir.mkdir(parents=True, exist_ok=True)
+        if not self._HTML:
+            # No HTML stage: stream the file so large transcripts stay out of memory
+            pdf_path = pdf_dir / (md_path.stem + '.pdf')
+            with open(md_path, encoding='utf-8', errors='ignore') as fh:
+                markdown_stream_to_pdf(fh, pdf_path, self._rl)
+            return pdf_path
+        md_text = md_path.read_text(encoding='utf-8', errors='ignore')
+        return self.render_markdown(md_text, pdf_dir / (md_path.stem + '.pdf'))
+
+_renderer: Optional[PdfRenderer] = None
+
+def get_renderer() -> PdfRenderer:
+    """Process-wide renderer, created on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = PdfRenderer()
+    return _renderer
+
 def md_to_html(md_text: str) -> str:
-    md_mod = try_import_markdown()
-    if md_mod:
-        html_body = md_mod.markdown(md_text, extensions=['tables','fenced_code'])
-    else:
-        # crude fallback: wrap plain text
-        html_body = f"<pre>{md_text}</pre>"
-    return HTML_WRAPPER.format(content=html_body)
+    return get_renderer().md_to_html(md_text)
 
 def html_to_pdf(html: str, out_path: Path) -> bool:
-    HTML = try_import_weasyprint()
-    if not HTML:
-        return False
-    try:
-        HTML(string=html).write_pdf(str(out_path))
-        return True
-    except Exception:
-        return False
+    return get_renderer().html_to_pdf(html, out_path)
+
+def text_to_pdf_fallback(text: str, out_path: Path, rl=None) -> None:
+    markdown_stream_to_pdf(io.StringIO(text), out_path, rl)
 
-def text_to_pdf_fallback(text: str, out_path: Path) -> None:
-    rl = try_import_reportlab()
+def markdown_stream_to_pdf(lines: Iterable[str], out_path: Path, rl=None) -> None:
+    """ReportLab fallback: lays out markdown lines as they are read (see pdf_fallback)."""
+    rl = rl or try_import_reportlab()
     if not rl:
-        out_path.write_text(text, encoding='utf-8')  # last resort
+        with open(out_path, 'w', encoding='utf-8') as out:  # last resort
+            out.writelines(lines)
         return
-    LETTER, canvas = rl
-    c = canvas.Canvas(str(out_path), pagesize=LETTER)
-    width, height = LETTER
-    margin = 54
-    y = height - margin
-    for line in text.splitlines() or [""]:
-        if y < margin:
-            c.showPage()
-            y = height - margin
-        c.drawString(margin, y, line[:140])
-        y -= 14
-    c.save()
+    stream_markdown_to_pdf(lines, out_path, rl)
 
 def convert_markdown_file(md_path: Path, pdf_dir: Path) -> Optional[Path]:
+    return get_renderer().convert_file(md_path, pdf_dir)
+
+def render_engine() -> str:
+    return get_renderer().engine
+
+def template_fingerprint(engine: str) -> str:
+    layout = HTML_WRAPPER if engine == 'weasyprint' else FALLBACK_LAYOUT
+    return hash_text(engine + layout)
+
+def _convert_timed(md_path: str, pdf_dir: str) -> Dict:
+    t0 = time.perf_counter()
+    try:
+        convert_markdown_file(Path(md_path), Path(pdf_dir))
+        status, error = 'converted', None
+    except Exception as e:
+        status, error = 'failed', f"{type(e).__name__}: {e}"
+    return {'file': Path(md_path).name, 'status': status, 'seconds': round(time.perf_counter() - t0, 3), 'error': error}
+
+def bulk_convert(md_folder: Path, pdf_dir: Path, workers: Optional[int] = None, force: bool = False) -> List[Dict]:
+    """Convert every *.md in ``md_folder``; returns one status/timing record per file.
+
+    Status is 'converted', 'skipped' (PDF newer than the markdown, same template and
+    engine) or 'failed'. ``workers`` defaults to the CPU count; 1 renders in-process.
+    """
     pdf_dir.mkdir(parents=True, exist_ok=True)
-    pdf_path = pdf_dir / (md_path.stem + '.pdf')
-    md_text = md_path.read_text(encoding='utf-8', errors='ignore')
-    html = md_to_html(md_text)
-    if html_to_pdf(html, pdf_path):
-        return pdf_path
-    # fallback plain text
-    text_to_pdf_fallback(md_text, pdf_path)
-    return pdf_path
+    manifest_path = pdf_dir / RENDER_MANIFEST
+    try:
+        rendered = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except Exception:
+        rendered = {}
+    template_fp = template_fingerprint(render_engine())
+    report: List[Dict] = []
+    todo: List[Path] = []
+    for md_path in sorted(md_folder.glob('*.md')):
+        pdf_path = pdf_dir / (md_path.stem + '.pdf')
+        up_to_date = (not force and pdf_path.exists()
+                      and pdf_path.stat().st_mtime_ns >= md_path.stat().st_mtime_ns
+                      and rendered.get(md_path.name) == template_fp)
+        if up_to_date:
+            report.append({'file': md_path.name, 'status': 'skipped', 'seconds': 0.0, 'error': None})
+        else:
+            todo.append(md_path)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(todo) <= 1:
+        results = [_convert_timed(str(p), str(pdf_dir)) for p in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            results = list(pool.map(_convert_timed, [str(p) for p in todo], [str(pdf_dir)] * len(todo)))
+    for r in results:
+        if r['status'] == 'converted':
+            rendered[r['file']] = template_fp
+        else:
+            rendered.pop(r['file'], None)
+    json_dump(manifest_path, rendered)
+    report.extend(results)
+    report.sort(key=lambda r: r['file'])
+    return report
 
-def bulk_convert(md_folder: Path, pdf_dir: Path) -> int:
-    count = 0
-    for md_path in md_folder.glob('*.md'):
-        convert_markdown_file(md_path, pdf_dir)
-        count += 1
-    return count
+def summarize_report(report: List[Dict]) -> str:
+    counts = {k: sum(1 for r in report if r['status'] == k) for k in ('converted', 'skipped', 'failed')}
+    render_time = sum(r['seconds'] for r in report)
+    return (f"{counts['converted']} converted, {counts['skipped']} up to date, {counts['failed']} failed "
+            f"({render_time:.2f}s render time)")
 
 if __name__ == '__main__':
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--in', dest='in_dir', required=True, help='Folder with markdown files')
     parser.add_argument('--out', dest='out_dir', required=True, help='Output PDF folder')
+    parser.add_argument('--workers', type=int, default=None, help='Render processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-render even when PDFs are up to date')
+    parser.add_argument('--report', action='store_true', help='Print per-file status and timing')
     args = parser.parse_args()
-    n = bulk_convert(Path(args.in_dir), Path(args.out_dir))
-    print(f'Converted {n} markdown files to PDF.')
+    report = bulk_convert(Path(args.in_dir), Path(args.out_dir), workers=args.workers, force=args.force)
+    if args.report:
+        for r in report:
+            print(f"{r['status']:>9}  {r['seconds']:7.3f}s  {r['file']}" + (f"  ({r['error']})" if r['error'] else ''))
+    print(f'PDF export: {summarize_report(report)}')
@@ -0,0 +1,317 @@
+"""Streaming ReportLab renderer for markdown (used when WeasyPrint is missing).
+
+Markdown is consumed line by line and laid out straight onto the canvas: text
+wraps by measured string width (nothing is truncated; a table row taller than
+the page continues on the next one), and headings, bullets, code blocks, rules
+and pipe tables get simple styling. The input is streamed: only the current
+table chunk is held before it is drawn. With ``out_path=None`` the writer only
+measures, which lets callers (e.g. the binder TOC) learn page numbers before
+drawing.
+"""
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+FALLBACK_LAYOUT = "md-stream-2"  # bump when the layout changes so bulk_convert re-renders
+BODY_FONT = "Helvetica"
+BOLD_FONT = "Helvetica-Bold"
+MONO_FONT = "Courier"
+BODY_SIZE = 10.5
+CODE_SIZE = 9.0
+TABLE_SIZE = 9.0
+HEADING_SIZES = {1: 17.0, 2: 14.0, 3: 12.0}
+LEADING = 1.3          # line height as a multiple of font size
+TABLE_CHUNK_ROWS = 200  # long tables are laid out in chunks sharing column widths
+CELL_PAD = 3.0
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_BULLET = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_TABLE_SEP = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_EMPHASIS = re.compile(r"\*\*|__|`")
+
+def _plain(text: str) -> str:
+    """Drop inline markdown markers; links become 'text (url)'."""
+    return _EMPHASIS.sub("", _LINK.sub(r"\1 (\2)", text))
+
+def _split_row(line: str) -> List[str]:
+    cells = line.strip()
+    if cells.startswith("|"):
+        cells = cells[1:]
+    if cells.endswith("|"):
+        cells = cells[:-1]
+    return [_plain(c.strip()) for c in cells.split("|")]
+
+class MarkdownPdfWriter:
+    """Lays out a markdown line stream on consecutive pages of one PDF."""
+
+    def __init__(self, rl, out_path: Optional[Path] = None, margin: float = 54.0, footer: bool = True):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        pagesize, canvas_mod = rl
+        self._width_of = stringWidth
+        self.page_width, self.page_height = pagesize
+        self.margin = margin
+        self.frame_width = self.page_width - 2 * margin
+        self.c = canvas_mod.Canvas(str(out_path), pagesize=pagesize, pageCompression=1) if out_path else None
+        self.footer = footer
+        self.page = 1
+        self.y = self.page_height - margin
+        self._page_used = False
+        self._in_code = False
+        self._table: List[List[str]] = []
+        self._table_header = False
+        self._table_rows_drawn = 0
+        self._col_widths: Optional[List[float]] = None
+
+    # -- pages -------------------------------------------------------------
+    def new_page(self) -> None:
+        if self.c is not None:
+            self._draw_footer()
+            self.c.showPage()
+        self.page += 1
+        self.y = self.page_height - self.margin
+        self._page_used = False
+
+    def start_fresh_page(self) -> None:
+        if self._page_used:
+            self.new_page()
+
+    def bookmark(self, key: str, title: str, level: int = 0) -> None:
+        if self.c is not None:
+            self.c.bookmarkPage(key)
+            self.c.addOutlineEntry(title, key, level=level)
+
+    def close(self) -> int:
+        """Flush pending content, save the PDF; returns the page count."""
+        self._flush_table(end=True)
+        if self.c is not None:
+            self._draw_footer()
+            self.c.save()
+        return self.page
+
+    def _draw_footer(self) -> None:
+        if self.footer and self._page_used:
+            self.c.setFont(BODY_FONT, 8)
+            self.c.drawCentredString(self.page_width / 2, self.margin / 2, str(self.page))
+
+    def _room(self, height: float) -> None:
+        if self._page_used and self.y - height < self.margin:
+            self.new_page()
+
+    def space(self, height: float) -> None:
+        if self._page_used:
+            self.y -= height
+
+    # -- text --------------------------------------------------------------
+    def wrap(self, text: str, font: str, size: float, width: float) -> List[str]:
+        sw = self._width_of
+        if sw(text, font, size) <= width:
+            return [text]
+        space = sw(" ", font, size)
+        lines: List[str] = []
+        cur: List[str] = []
+        cur_w = 0.0
+        for word in text.split(" "):
+            w = sw(word, font, size)
+            if w > width:
+                if cur:
+                    lines.append(" ".join(cur))
+                    cur, cur_w = [], 0.0
+                pieces = self._break_word(word, font, size, width)
+                lines.extend(pieces[:-1])
+                word = pieces[-1]
+                w = sw(word, font, size)
+            if cur and cur_w + space + w > width:
+                lines.append(" ".join(cur))
+                cur, cur_w = [word], w
+            else:
+                cur_w = w if not cur else cur_w + space + w
+                cur.append(word)
+        lines.append(" ".join(cur))
+        return lines
+
+    def _break_word(self, word: str, font: str, size: float, width: float) -> List[str]:
+        pieces, start, acc = [], 0, 0.0
+        for i, ch in enumerate(word):
+            cw = self._width_of(ch, font, size)
+            if acc + cw > width and i > start:
+                pieces.append(word[start:i])
+                start, acc = i, 0.0
+            acc += cw
+        pieces.append(word[start:])
+        return pieces
+
+    def text_line(self, text: str, font: str = BODY_FONT, size: float = BODY_SIZE, x: float = 0.0) -> None:
+        leading = size * LEADING
+        self._room(leading)
+        if self.c is not None:
+            self.c.setFont(font, size)
+            self.c.drawString(self.margin + x, self.y - size, text)
+        self.y -= leading
+        self._page_used = True
+
+    def paragraph(self, text: str, font: str = BODY_FONT, size: float = BODY_SIZE, indent: float = 0.0) -> None:
+        for line in self.wrap(text, font, size, self.frame_width - indent):
+            self.text_line(line, font, size, indent)
+
+    def heading(self, text: str, level: int = 1) -> None:
+        size = HEADING_SIZES.get(level, BODY_SIZE + 0.5)
+        self.space(size * 0.6)
+        # keep a heading together with at least two body lines
+        self._room(size * LEADING + 2 * BODY_SIZE * LEADING)
+        self.paragraph(_plain(text), BOLD_FONT, size)
+
+    def leader_line(self, left: str, right: str, font: str = BODY_FONT, size: float = BODY_SIZE) -> None:
+        """One line: ``left`` ..... ``right`` (right-aligned), left truncated to fit."""
+        sw = self._width_of
+        right_w = sw(right, font, size)
+        room = self.frame_width - right_w - sw(" .... ", font, size)
+        while left and sw(left, font, size) > room:
+            left = left[:-1]
+        dots_w = self.frame_width - right_w - sw(left + "  ", font, size)
+        dots = "." * max(3, int(dots_w / sw(".", font, size)))
+        self.text_line(f"{left} {dots}", font, size)
+        if self.c is not None:
+            self.c.drawRightString(self.margin + self.frame_width, self.y + size * (LEADING - 1), right)
+
+    def rule(self) -> None:
+        self._room(BODY_SIZE)
+        if self.c is not None:
+            y = self.y - BODY_SIZE / 2
+            self.c.setLineWidth(0.5)
+            self.c.line(self.margin, y, self.margin + self.frame_width, y)
+        self.y -= BODY_SIZE
+        self._page_used = True
+
+    # -- tables ------------------------------------------------------------
+    def _flush_table(self, end: bool = False) -> None:
+        rows, self._table = self._table, []
+        if rows:
+            if self._col_widths is None:
+                self._col_widths = self._measure_columns(rows)
+            self._draw_table(rows, self._col_widths)
+        if end:
+            self._col_widths = None
+            self._table_header = False
+            self._table_rows_drawn = 0
+
+    def _measure_columns(self, rows: List[List[str]]) -> List[float]:
+        ncols = max(len(r) for r in rows)
+        natural = [30.0] * ncols
+        for row in rows:
+            for i, cell in enumerate(row):
+                natural[i] = max(natural[i], self._width_of(cell, BODY_FONT, TABLE_SIZE) + 2 * CELL_PAD)
+        total = sum(natural)
+        if total <= self.frame_width:
+            return natural
+        # shrink wide columns first: never below an even share or their natural width
+        fair = self.frame_width / ncols
+        fixed = sum(w for w in natural if w <= fair)
+        flexible = sum(w for w in natural if w > fair)
+        scale = (self.frame_width - fixed) / flexible
+        return [w if w <= fair else w * scale for w in natural]
+
+    def _draw_table(self, rows: List[List[str]], widths: List[float]) -> None:
+        leading = TABLE_SIZE * LEADING
+        page_lines = int((self.page_height - 2 * self.margin - 2 * CELL_PAD) // leading)
+        ncols = len(widths)
+        for row in rows:
+            header = self._table_header and self._table_rows_drawn == 0
+            self._table_rows_drawn += 1
+            font = BOLD_FONT if header else BODY_FONT
+            if len(row) > ncols:  # more cells than the measured chunk: keep them in the last column
+                row = row[:ncols - 1] + [" | ".join(row[ncols - 1:])]
+            cells = [self.wrap(cell, font, TABLE_SIZE, w - 2 * CELL_PAD)
+                     for cell, w in zip(row + [""] * (ncols - len(row)), widths)]
+            tallest = max(len(c) for c in cells)
+            done = 0
+            while done < tallest:
+                # rows move to the next page whole; only a row taller than a page is sliced
+                left = tallest - done
+                fits = int((self.y - self.margin - 2 * CELL_PAD) // leading)
+                if self._page_used and fits < left and (left <= page_lines or fits < 2):
+                    self.new_page()
+                    continue
+                take = max(1, min(left, fits))
+                self._draw_row_slice([c[done:done + take] for c in cells], widths, font, header, take)
+                done += take
+
+    def _draw_row_slice(self, cells: List[List[str]], widths: List[float], font: str, header: bool,
+                        lines: int) -> None:
+        leading = TABLE_SIZE * LEADING
+        height = lines * leading + 2 * CELL_PAD
+        if self.c is not None:
+            self.c.setLineWidth(0.5)
+            x = self.margin
+            for cell_lines, w in zip(cells, widths):
+                if header:
+                    self.c.setFillGray(0.93)
+                    self.c.rect(x, self.y - height, w, height, stroke=1, fill=1)
+                    self.c.setFillGray(0)
+                else:
+                    self.c.rect(x, self.y - height, w, height, stroke=1, fill=0)
+                self.c.setFont(font, TABLE_SIZE)
+                ty = self.y - CELL_PAD - TABLE_SIZE
+                for line in cell_lines:
+                    self.c.drawString(x + CELL_PAD, ty, line)
+                    ty -= leading
+                x += w
+        self.y -= height
+        self._page_used = True
+
+    # -- markdown stream ---------------------------------------------------
+    def write(self, lines: Iterable[str]) -> None:
+        """Render a markdown line stream (file object, generator, list...)."""
+        for raw in lines:
+            line = raw.rstrip("\r\n").expandtabs(4)
+            stripped = line.strip()
+            if self._table and not stripped.startswith("|"):
+                self._flush_table(end=True)
+            if stripped.startswith("```"):
+                self._in_code = not self._in_code
+                self.space(CODE_SIZE * 0.3)
+                continue
+            if self._in_code:
+                self.paragraph(line, MONO_FONT, CODE_SIZE, indent=8)
+                continue
+            if stripped.startswith("|"):
+                if _TABLE_SEP.match(stripped):
+                    self._table_header = len(self._table) == 1
+                    continue
+                if not self._table and self._col_widths is None:
+                    self.space(BODY_SIZE * 0.3)
+                self._table.append(_split_row(stripped))
+                if len(self._table) >= TABLE_CHUNK_ROWS:
+                    self._flush_table()
+                continue
+            if not stripped:
+                self.space(BODY_SIZE * 0.5)
+                continue
+            m = _HEADING.match(line)
+            if m:
+                self.heading(m.group(2), len(m.group(1)))
+                continue
+            if _RULE.match(line):
+                self.rule()
+                continue
+            m = _BULLET.match(line)
+            if m:
+                indent = 10 + min(len(m.group(1)), 12) * 3
+                marker = "•" if m.group(2) in "-*+" else m.group(2)
+                first, *rest = self.wrap(_plain(m.group(3)), BODY_FONT, BODY_SIZE, self.frame_width - indent - 12)
+                self.text_line(marker, BODY_FONT, BODY_SIZE, indent)
+                self.y += BODY_SIZE * LEADING  # marker and first line share a baseline
+                self.text_line(first, BODY_FONT, BODY_SIZE, indent + 12)
+                for cont in rest:
+                    self.text_line(cont, BODY_FONT, BODY_SIZE, indent + 12)
+                continue
+            self.paragraph(_plain(line))
+        self._flush_table(end=True)
+
+def stream_markdown_to_pdf(lines: Iterable[str], out_path: Path, rl) -> int:
+    """Render markdown lines to ``out_path``; returns the page count."""
+    writer = MarkdownPdfWriter(rl, out_path)
+    writer.write(lines)
+    return writer.close()
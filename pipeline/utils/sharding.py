@@ -0,0 +1,76 @@
+"""Pack labelled texts into bounded-size shards for map-reduce prompting.
+
+Nothing is truncated: a text longer than the budget is split into numbered parts
+that land in consecutive shards, and merge passes split oversized partial
+results the same way and condense the parts first (see ``group_for_reduce``).
+"""
+from __future__ import annotations
+from typing import List, Tuple
+
+Section = Tuple[str, str]  # (label, text)
+
+def split_text(label: str, text: str, max_chars: int) -> List[Section]:
+    if len(text) <= max_chars:
+        return [(label, text)]
+    parts = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            # prefer to break on a paragraph or line boundary in the last 20% of the window
+            cut = max(text.rfind("\n\n", start, end), text.rfind("\n", start, end))
+            if cut > start + int(max_chars * 0.8):
+                end = cut
+        parts.append(text[start:end])
+        start = end
+    n = len(parts)
+    return [(f"{label} (part {i}/{n})", p) for i, p in enumerate(parts, 1)]
+
+def pack_shards(sections: List[Section], max_chars: int) -> List[List[Section]]:
+    """Greedy, order-preserving packing; each shard's text totals at most ``max_chars``."""
+    shards: List[List[Section]] = []
+    current: List[Section] = []
+    size = 0
+    for label, text in sections:
+        for part in split_text(label, text, max_chars):
+            n = len(part[1])
+            if current and size + n > max_chars:
+                shards.append(current)
+                current, size = [], 0
+            current.append(part)
+            size += n
+    if current:
+        shards.append(current)
+    return shards
+
+def group_for_reduce(sections: List[Section], max_chars: int) -> List[List[Section]]:
+    """Greedy grouping for merge passes; each group's text totals at most ``max_chars``.
+
+    Nothing is cut: a section longer than the budget is split into numbered parts
+    (``split_text``) that are condensed on their own this pass, so the next pass
+    sees every part in full but shorter. A section that fits with no neighbour is
+    likewise condensed alone.
+    """
+    groups: List[List[Section]] = []
+    current: List[Section] = []
+    size = 0
+    for label, text in sections:
+        for part in split_text(label, text, max_chars):
+            n = len(part[1])
+            if current and size + n > max_chars:
+                groups.append(current)
+                current, size = [], 0
+            current.append(part)
+            size += n
+    if current:
+        groups.append(current)
+    return groups
+
+def check_reduce_progress(before: List[str], after: List[str]) -> None:
+    """Raise when a merge pass neither reduced the number of partials nor their total size."""
+    if len(after) >= len(before) and sum(map(len, after)) >= sum(map(len, before)):
+        raise RuntimeError(f"merge pass did not shrink {len(before)} partial results; "
+                           "raise the shard budget or shorten the merge prompt's output")
+
+def render_shard(shard: List[Section]) -> str:
+    return "\n\n".join(f"== {label} ==\n{text}" for label, text in shard)
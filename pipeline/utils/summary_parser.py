@@ -0,0 +1,191 @@
+"""Single-pass parser for Task A summaries (the A_SUMMARY.txt schema).
+
+One pass per file: each line is dispatched on its first character (heading,
+table row, bullet), and only candidate ``Key: value`` lines are matched, by a
+single precompiled alternation of all field names. Headings set the current
+section, which decides where table rows and bullets go.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+@dataclass
+class Finding:
+    number: str = ''
+    finding: str = ''
+    support: str = ''
+    impact: str = ''
+    pattern_tag: str = ''
+
+@dataclass
+class Violation:
+    number: str = ''
+    law: str = ''
+    cite: str = ''
+    quote: str = ''
+    rationale: str = ''
+
+@dataclass
+class Contradiction:
+    ref_doc: str = ''
+    conflict: str = ''
+    this_position: str = ''
+    other_position: str = ''
+    severity: str = ''  # L / M / H, '' when not given
+
+@dataclass
+class SummaryRecord:
+    filename: str = ''
+    date: str = ''
+    doc_type: str = ''
+    agency: str = ''
+    children: str = ''
+    parent: str = ''
+    core_facts: List[str] = field(default_factory=list)
+    findings: List[Finding] = field(default_factory=list)
+    violations: List[Violation] = field(default_factory=list)
+    contradictions: List[Contradiction] = field(default_factory=list)
+    signals: List[str] = field(default_factory=list)
+    primary_pattern: str = 'UNKNOWN'
+    secondary_patterns: List[str] = field(default_factory=list)
+    include: str = 'UNKNOWN'
+    include_reason: str = ''
+    smoking_gun: str = 'UNKNOWN'
+    top5: str = 'UNKNOWN'
+    prayer_note: str = ''
+    tags: str = ''
+
+    def sync_fields(self) -> Dict[str, str]:
+        """The subset stored per AI_Outputs row (keys used by excel_sync)."""
+        return {
+            'include': self.include,
+            'smoking': self.smoking_gun,
+            'top5': self.top5,
+            'primary_pattern': self.primary_pattern,
+            'tags': self.tags,
+        }
+
+_FIELD_RE = re.compile(r"""
+    (?:\*\*)? (?P<key>
+        include\s*decision | include | is\s*smoking\s*gun | smoking\s*gun | top\s*(?:5|five)
+      | primary\s*pattern | key\s*pattern | secondary\s*patterns? | tags? | filename | date
+      | type | agency | children | parent | reason )
+    \b \s*\?? \s* (?:\([^)]*\))? \s* (?:\*\*)? \s* : \s* (?:\*\*)? (?P<value>.*?) (?:\*\*)? $
+""", re.IGNORECASE | re.VERBOSE)
+_SECTION_RE = re.compile(
+    r"(?P<facts>core fact)|(?P<findings>finding)|(?P<violations>violation|misconduct)"
+    r"|(?P<contradictions>contradiction|cross-link)|(?P<signals>repeated language|omission signal)"
+    r"|(?P<prayer>prayer|faith)", re.IGNORECASE)
+_TABLE_SEP_RE = re.compile(r"^[\s|:\-]+$")
+_SPACE_RE = re.compile(r"\s+")
+_FIELD_INITIALS = frozenset('iIsStTpPkKfFdDaAcCrR*')  # first letters of the field names
+_YES_NO_RE = re.compile(r"^[\W_]*(?:(yes|y|true)|(no|n|false))(?![\w/])", re.IGNORECASE)  # not N/A
+
+# normalized field key -> record attribute; first occurrence wins
+_FIELD_KEYS = {
+    'include': 'include', 'includedecision': 'include',
+    'smokinggun': 'smoking_gun', 'issmokinggun': 'smoking_gun',
+    'top5': 'top5', 'topfive': 'top5',
+    'primarypattern': 'primary_pattern', 'keypattern': 'primary_pattern',
+    'secondarypattern': 'secondary_patterns', 'secondarypatterns': 'secondary_patterns',
+    'tag': 'tags', 'tags': 'tags',
+    'filename': 'filename', 'date': 'date', 'type': 'doc_type', 'agency': 'agency',
+    'children': 'children', 'parent': 'parent', 'reason': 'include_reason',
+}
+_YES_NO_FIELDS = {'include', 'smoking_gun', 'top5'}
+_TABLES = {'findings': (Finding, 5), 'violations': (Violation, 5), 'contradictions': (Contradiction, 5)}
+
+def norm_yes_no(value: Optional[str]) -> str:
+    """'Yes' / 'No' from the leading word ("Yes - direct contradiction", "**No**"), else 'UNKNOWN'."""
+    m = _YES_NO_RE.match(value or '')
+    if not m:
+        return 'UNKNOWN'
+    return 'Yes' if m.group(1) else 'No'
+
+def _split_list(value: str) -> List[str]:
+    return [p.strip() for p in re.split(r'[;,]', value) if p.strip()]
+
+def _clean_value(value: str) -> str:
+    # Trim trailing markdown artifacts
+    return value.rstrip('#*').strip()
+
+def _normalize_tags(value: str) -> str:
+    if value.startswith('[') and value.endswith(']'):
+        return value[1:-1].strip()
+    # Normalize tags: split by comma if not already bracket list format
+    if '[' not in value:
+        return ', '.join(_split_list(value))
+    return value
+
+@lru_cache(maxsize=512)
+def _section_of(heading: str) -> Optional[str]:
+    # headings repeat across summaries (same schema), so each distinct one is searched once
+    m = _SECTION_RE.search(heading)
+    return m.lastgroup if m else None
+
+def parse_summary_record(md_text: str, tables: bool = True) -> SummaryRecord:
+    """Parse one summary. ``tables=False`` skips the finding/violation/contradiction rows."""
+    record = SummaryRecord()
+    seen = set()
+    section = None
+    table_header_done = False
+    prayer: List[str] = []
+    for raw_line in md_text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        # Dispatch on the first character; only candidate "Key: value" lines hit the regex
+        first = line[0]
+        if first == '|':
+            if not tables or section not in _TABLES:
+                continue
+            if not table_header_done:
+                table_header_done = True  # first row of each table is its header
+                continue
+            if '--' in line and _TABLE_SEP_RE.match(line):
+                continue
+            cells = [c.strip() for c in line.strip('|').split('|')]
+            if not any(c and c != '...' for c in cells):
+                continue
+            cls, width = _TABLES[section]
+            item = cls(*(cells + [''] * width)[:width])
+            if cls is Contradiction:
+                sev = item.severity[:1].upper()
+                item.severity = sev if sev and sev in 'LMH' else ''
+            getattr(record, section).append(item)
+        elif first == '#':
+            section = _section_of(line)
+            table_header_done = False
+        elif first in '-+*' and line[1:2] in (' ', '\t'):
+            if section == 'facts' or section == 'signals':
+                item = line[2:].strip()
+                if item and item != '...':
+                    (record.core_facts if section == 'facts' else record.signals).append(item)
+        else:
+            m = _FIELD_RE.match(line) if first in _FIELD_INITIALS else None
+            if m is None:
+                if section == 'prayer':
+                    prayer.append(line)
+                continue
+            attr = _FIELD_KEYS.get(_SPACE_RE.sub('', m.group('key').lower()))
+            if attr is None:
+                if section == 'prayer':
+                    prayer.append(line)
+                continue
+            if attr in seen:
+                continue
+            seen.add(attr)
+            value = _clean_value(m.group('value'))
+            if attr in _YES_NO_FIELDS:
+                value = norm_yes_no(value)
+            elif attr == 'secondary_patterns':
+                value = _split_list(value)
+            elif attr == 'tags':
+                value = _normalize_tags(value)
+            elif attr == 'primary_pattern':
+                value = value or 'UNKNOWN'
+            setattr(record, attr, value)
+    record.prayer_note = ' '.join(prayer)
+    return record
@@ -0,0 +1,333 @@
+"""Typed Task A record: JSON schema, local validation/repair, adapters.
+
+Task A writes ``SUMMARY_<stem>.json`` next to each markdown summary. Live runs
+ask the model for the record in JSON mode (``GPT5Client.complete_json``);
+whatever comes back is validated here and repaired field by field: values are
+coerced to the declared type, enums are normalized, unknown keys are dropped and
+missing or unusable fields are filled from the markdown summary (parsed with
+``summary_parser``). Dry runs and unparseable replies build the record from the
+markdown alone. Consumers (Excel sync, master-table merge, contradiction
+candidate linking) read the JSON instead of re-parsing markdown.
+"""
+from __future__ import annotations
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pipeline.utils.summary_parser import SummaryRecord, norm_yes_no, parse_summary_record
+
+SCHEMA_VERSION = 1
+SEVERITIES = ("High", "Medium", "Low", "Unknown")
+YES_NO = ("Yes", "No", "UNKNOWN")
+CONTRADICTION_KEYS = ("refDoc", "conflict", "thisPosition", "otherPosition", "severity")
+FINDING_KEYS = ("finding", "support", "impact", "patternTag")
+
+# field -> kind; the kind decides the JSON schema type, the default and the repair
+FIELDS: Dict[str, str] = {
+    "filename": "str",
+    "date": "str",
+    "docType": "str",
+    "agency": "str",
+    "children": "list",
+    "parent": "str",
+    "coreFacts": "list",
+    "findings": "findings",
+    "entities": "list",
+    "legalCodes": "list",
+    "violations": "list",
+    "contradictions": "contradictions",
+    "primaryPattern": "str",
+    "secondaryPatterns": "list",
+    "include": "yesno",
+    "includeReason": "str",
+    "smokingGun": "yesno",
+    "top5": "yesno",
+    "needsReview": "bool",
+    "severity": "severity",
+    "tags": "list",
+    "prayerNote": "str",
+}
+_DEFAULTS = {"str": "", "list": [], "findings": [], "contradictions": [], "yesno": "UNKNOWN",
+             "bool": False, "severity": "Unknown"}
+_SEVERITY_RANK = {"High": 3, "Medium": 2, "Low": 1, "Unknown": 0}
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+_EMPTY = {"", "unknown", "none", "n/a", "..."}
+
+def _object_schema(keys: Tuple[str, ...], enums: Optional[Dict[str, Tuple[str, ...]]] = None) -> Dict[str, Any]:
+    props = {k: {"type": "string"} for k in keys}
+    for k, values in (enums or {}).items():
+        props[k] = {"type": "string", "enum": list(values)}
+    return {"type": "object", "properties": props, "required": list(keys), "additionalProperties": False}
+
+def _field_schema(kind: str) -> Dict[str, Any]:
+    if kind == "list":
+        return {"type": "array", "items": {"type": "string"}}
+    if kind == "findings":
+        return {"type": "array", "items": _object_schema(FINDING_KEYS)}
+    if kind == "contradictions":
+        return {"type": "array", "items": _object_schema(CONTRADICTION_KEYS, {"severity": SEVERITIES})}
+    if kind == "yesno":
+        return {"type": "string", "enum": list(YES_NO)}
+    if kind == "severity":
+        return {"type": "string", "enum": list(SEVERITIES)}
+    if kind == "bool":
+        return {"type": "boolean"}
+    return {"type": "string"}
+
+RECORD_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {name: _field_schema(kind) for name, kind in FIELDS.items()},
+    "required": list(FIELDS),
+    "additionalProperties": False,
+}
+
+def json_path(md_path: Path) -> Path:
+    """SUMMARY_<stem>.md -> SUMMARY_<stem>.json"""
+    return md_path.with_suffix(".json")
+
+# --- coercion -------------------------------------------------------------
+
+def norm_severity(value: Any) -> str:
+    """'H' / 'high' / 'Severity: M' -> High / Medium; anything else Unknown."""
+    text = str(value or "").strip().lower()
+    text = text.split(":", 1)[-1].strip(" *[]()")
+    for name in SEVERITIES[:3]:
+        if text[:1] == name[0].lower() and (len(text) == 1 or text.startswith(name.lower())):
+            return name
+    return "Unknown"
+
+def _as_str(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_as_str(v) for v in value if v is not None)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value).strip()
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.strip().strip("[]")
+        parts = re.split(r"[;,]", value)
+    elif isinstance(value, (list, tuple)):
+        parts = [_as_str(v) for v in value]
+    else:
+        parts = [_as_str(value)]
+    out: List[str] = []
+    for p in parts:
+        p = p.strip()
+        if p and p.lower() not in _EMPTY and p not in out:
+            out.append(p)
+    return out
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    return norm_yes_no(_as_str(value)) == "Yes"
+
+def _as_objects(value: Any, keys: Tuple[str, ...]) -> List[Dict[str, str]]:
+    """Objects with exactly ``keys``; bare strings become the second key (the description)."""
+    if value is None:
+        return []
+    items = value if isinstance(value, (list, tuple)) else [value]
+    out = []
+    for item in items:
+        if isinstance(item, dict):
+            obj = {k: _as_str(item.get(k)) for k in keys}
+        else:
+            text = _as_str(item)
+            if not text:
+                continue
+            obj = dict.fromkeys(keys, "")
+            obj[keys[1]] = text
+        if any(obj.values()):
+            out.append(obj)
+    return out
+
+def _coerce(kind: str, value: Any) -> Any:
+    if kind == "str":
+        return _as_str(value)
+    if kind == "list":
+        return _as_list(value)
+    if kind == "yesno":
+        return norm_yes_no(_as_str(value))
+    if kind == "bool":
+        return _as_bool(value)
+    if kind == "severity":
+        return norm_severity(value)
+    if kind == "findings":
+        return _as_objects(value, FINDING_KEYS)
+    items = _as_objects(value, CONTRADICTION_KEYS)
+    for item in items:
+        item["severity"] = norm_severity(item["severity"])
+    return items
+
+def _is_empty(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() in _EMPTY
+    return not value
+
+def validate_record(data: Any, fallback: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """Coerce ``data`` to the schema. Returns (record, repairs made).
+
+    Missing, mistyped or empty fields are taken from ``fallback`` when it has a
+    value there, else set to the field default. Keys outside the schema are dropped.
+    """
+    repairs: List[str] = []
+    if not isinstance(data, dict):
+        repairs.append(f"record is {type(data).__name__}, not an object")
+        data = {}
+    fallback = fallback or {}
+    record: Dict[str, Any] = {}
+    for name, kind in FIELDS.items():
+        note = None
+        if name in data:
+            value = _coerce(kind, data[name])
+            if value != data[name] and not (kind == "str" and isinstance(data[name], str)):
+                note = "coerced"
+        else:
+            value, note = _DEFAULTS[kind], "missing"
+        if _is_empty(value) and not _is_empty(fallback.get(name)):
+            value, note = fallback[name], "filled from markdown"
+        if note:
+            repairs.append(f"{name}: {note}")
+        record[name] = list(value) if isinstance(value, list) else value
+    dropped = sorted(k for k in data if k not in FIELDS and k not in ("schemaVersion", "source", "repairs"))
+    if dropped:
+        repairs.append(f"dropped unknown keys: {', '.join(dropped)}")
+    return record, repairs
+
+# --- builders -------------------------------------------------------------
+
+def _split_names(value: str) -> List[str]:
+    return _as_list(re.split(r"\s*(?:[,;/&]|\band\b)\s*", value))
+
+def record_from_summary(rec: SummaryRecord, md_text: str = "") -> Dict[str, Any]:
+    """Schema record derived from a parsed markdown summary (NEW_FIELDS included)."""
+    contradictions = [{
+        "refDoc": c.ref_doc, "conflict": c.conflict, "thisPosition": c.this_position,
+        "otherPosition": c.other_position, "severity": norm_severity(c.severity),
+    } for c in rec.contradictions]
+    legal_codes = _as_list([v.law for v in rec.violations])
+    violations = _as_list([f"{v.law}: {v.quote}" if v.quote else v.law for v in rec.violations])
+    entities = _as_list(_split_names(rec.agency) + _split_names(rec.children) + _split_names(rec.parent))
+    severity = max((c["severity"] for c in contradictions), key=_SEVERITY_RANK.get, default="Unknown")
+    if rec.smoking_gun == "Yes":
+        severity = "High"
+    needs_review = rec.include == "UNKNOWN" or "NEED_SOURCE" in md_text
+    return {
+        "filename": rec.filename,
+        "date": rec.date,
+        "docType": rec.doc_type,
+        "agency": rec.agency,
+        "children": _as_list(rec.children),
+        "parent": rec.parent,
+        "coreFacts": list(rec.core_facts),
+        "findings": [{"finding": f.finding, "support": f.support, "impact": f.impact, "patternTag": f.pattern_tag}
+                     for f in rec.findings],
+        "entities": entities,
+        "legalCodes": legal_codes,
+        "violations": violations,
+        "contradictions": contradictions,
+        "primaryPattern": rec.primary_pattern,
+        "secondaryPatterns": list(rec.secondary_patterns),
+        "include": rec.include,
+        "includeReason": rec.include_reason,
+        "smokingGun": rec.smoking_gun,
+        "top5": rec.top5,
+        "needsReview": needs_review,
+        "severity": severity,
+        "tags": _as_list(rec.tags),
+        "prayerNote": rec.prayer_note,
+    }
+
+def parse_json_reply(text: Optional[str]) -> Any:
+    """JSON value of a model reply (code fences tolerated); None when it is not JSON."""
+    if not text:
+        return None
+    body = _FENCE_RE.sub("", text.strip())
+    try:
+        return json.loads(body)
+    except ValueError:
+        start, end = body.find("{"), body.rfind("}")
+        if 0 <= start < end:
+            try:
+                return json.loads(body[start:end + 1])
+            except ValueError:
+                pass
+    return None
+
+def build_record(md_text: str, reply: Optional[str] = None, filename: str = "") -> Dict[str, Any]:
+    """Validated record for one summary.
+
+    ``reply`` is the model's JSON-mode answer (None in dry runs); its gaps are
+    repaired from the markdown. The result carries ``schemaVersion``, ``source``
+    ('model' or 'markdown') and the list of ``repairs`` applied.
+    """
+    fallback = record_from_summary(parse_summary_record(md_text), md_text)
+    if reply is None:
+        record, repairs, source = fallback, [], "markdown"
+    else:
+        data = parse_json_reply(reply)
+        if isinstance(data, dict):
+            record, repairs = validate_record(data, fallback)
+            source = "model"
+        else:
+            record, repairs, source = fallback, ["reply is not a JSON object; built from markdown"], "markdown"
+    if filename:
+        record["filename"] = filename  # the source file name, not whatever the model echoed
+    return {"schemaVersion": SCHEMA_VERSION, "source": source, **record, "repairs": repairs}
+
+def load_record(path: Path) -> Optional[Dict[str, Any]]:
+    """Read a record written by Task A; None when missing, unreadable or from another schema version."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("schemaVersion") != SCHEMA_VERSION:
+        return None
+    return data
+
+# --- adapters -------------------------------------------------------------
+
+def sync_fields(record: Dict[str, Any]) -> Dict[str, str]:
+    """Same keys as SummaryRecord.sync_fields (the AI_Outputs row)."""
+    return {
+        "include": record.get("include") or "UNKNOWN",
+        "smoking": record.get("smokingGun") or "UNKNOWN",
+        "top5": record.get("top5") or "UNKNOWN",
+        "primary_pattern": record.get("primaryPattern") or "UNKNOWN",
+        "tags": ", ".join(record.get("tags") or []),
+    }
+
+def master_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Master-table columns (MASTER_JUSTICE_FILE_SUPREME / JusticeFileManager) filled from a record."""
+    return {
+        "Filename": record.get("filename", ""),
+        "Date": record.get("date", ""),
+        "Type": record.get("docType", ""),
+        "Agency": record.get("agency", ""),
+        "Children": ", ".join(record.get("children") or []),
+        "Parent": record.get("parent", ""),
+        "Pattern": record.get("primaryPattern", ""),
+        "Summary": " ".join(record.get("coreFacts") or []),
+        "Misconduct?": "Yes" if record.get("violations") else "No",
+        "Law Violated": ", ".join(record.get("legalCodes") or []),
+        "Contradicts": ", ".join(c["refDoc"] for c in record.get("contradictions") or [] if c.get("refDoc")),
+        "Smoking Gun": record.get("smokingGun", "UNKNOWN"),
+        "Faith/Prayer": record.get("prayerNote", ""),
+        "Top 5": record.get("top5", "UNKNOWN"),
+        "entities": list(record.get("entities") or []),
+        "legalCodes": list(record.get("legalCodes") or []),
+        "violations": list(record.get("violations") or []),
+        "contradictions": list(record.get("contradictions") or []),
+        "needsReview": bool(record.get("needsReview")),
+        "severity": record.get("severity") or "Unknown",
+    }
@@ -1,24 +1,480 @@
-"""Text extraction stubs. Expand with pdfplumber/docx2txt/ocr as needed."""
+"""Text extraction for evidence files (.txt, .md, native-text .pdf, .docx).
+
+PDF parsing is CPU-bound, so ``batch_extract`` can fan files out over a pool
+of worker processes. Each file gets its own deadline: a worker stuck on a
+pathological PDF is killed and replaced, and the file is reported as timed out
+instead of stalling the batch.
+
+For very large documents ``iter_pages`` / ``iter_chunks`` stream page records
+(page number, char offsets, text) lazily, and pack them into token-budgeted
+windows that keep page numbers for citations.
+
+Scanned PDFs: after ``configure_ocr``, pages whose text layer is empty or below
+a character threshold are OCR'd (see ocr.py) on a page-level process pool.
+
+Results are kept per run in memory and, once ``configure_cache`` is called, in a
+persistent SQLite store (see extract_cache.py) so repeated and incremental runs
+skip re-parsing.
+"""
 from __future__ import annotations
+import multiprocessing as mp
+import time
+from collections import deque
+from multiprocessing import connection as mp_connection
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from pipeline.utils.extract_cache import ExtractCache
+from pipeline.utils.io_utils import CHARS_PER_TOKEN, hash_file
+from pipeline.utils.ocr import OcrConfig, ocr_pages, try_import_pytesseract
+
+SUPPORTED_EXT = {".txt", ".md", ".pdf", ".docx"}
+
+def try_import_pdfplumber():
+    try:
+        import pdfplumber  # type: ignore
+        return pdfplumber
+    except Exception:
+        return None
+
+def try_import_docx2txt():
+    try:
+        import docx2txt  # type: ignore
+        return docx2txt
+    except Exception:
+        return None
+
+PAGE_SEP = "\n\n"
+PLACEHOLDER_PREFIXES = ("UNSUPPORTED FILE TYPE", "EXTRACTION ERROR", "EXTRACTION TIMEOUT")
+
+# In-process memo: path -> (mtime_ns, size, text, page offsets); avoids re-parsing within one run
+_memo: Dict[str, Tuple[int, int, str, List[int]]] = {}
+_disk_cache: Optional[ExtractCache] = None
+_ocr: Optional[OcrConfig] = None
+_ocr_checked: set = set()  # (path, mtime_ns) already OCR-filled this run
+_ocr_warned = False
+
+def configure_cache(db_path: Optional[Path]) -> Optional[ExtractCache]:
+    """Enable (path) or disable (None) the persistent extraction cache."""
+    global _disk_cache
+    if _disk_cache is not None:
+        _disk_cache.close()
+    _disk_cache = ExtractCache(db_path) if db_path else None
+    return _disk_cache
+
+def get_cache() -> Optional[ExtractCache]:
+    return _disk_cache
 
-# Optional imports (uncomment after installing libs)
-# import pdfplumber
-# import docx2txt
+def configure_ocr(config: Optional[OcrConfig]) -> None:
+    """Enable (config) or disable (None) the OCR fallback for low-text PDF pages."""
+    global _ocr
+    _ocr = config
+    _ocr_checked.clear()
 
-SUPPORTED_EXT = {".txt",".md"}  # Extend to .pdf, .docx when ready
+def _join_pages(pages: List[str]) -> Tuple[str, List[int]]:
+    offsets, pos = [], 0
+    for p in pages:
+        offsets.append(pos)
+        pos += len(p) + len(PAGE_SEP)
+    return PAGE_SEP.join(pages), offsets
+
+def _extract_raw(path: Path) -> Tuple[str, List[int]]:
+    """Return (text, page start offsets). Non-paginated formats are a single page."""
+    ext = path.suffix.lower()
+    if ext in (".txt", ".md"):
+        return path.read_text(encoding="utf-8", errors="ignore"), [0]
+    if ext == ".pdf":
+        pdfplumber = try_import_pdfplumber()
+        if not pdfplumber:
+            return "UNSUPPORTED FILE TYPE: .pdf (install pdfplumber)", []
+        with pdfplumber.open(str(path)) as pdf:
+            return _join_pages([page.extract_text() or "" for page in pdf.pages])
+    if ext == ".docx":
+        docx2txt = try_import_docx2txt()
+        if not docx2txt:
+            return "UNSUPPORTED FILE TYPE: .docx (install docx2txt)", []
+        return docx2txt.process(str(path)) or "", [0]
+    return f"UNSUPPORTED FILE TYPE: {ext}", []
+
+def _remember(path: Path, text: str, offsets: List[int], persist: bool = True) -> None:
+    if text.startswith(PLACEHOLDER_PREFIXES):
+        return  # never cache failures; a later run may have the library or more time
+    try:
+        st = path.stat()
+    except OSError:
+        return
+    _memo[str(path)] = (st.st_mtime_ns, st.st_size, text, offsets)
+    if persist and _disk_cache is not None:
+        _disk_cache.put(path, text, offsets)
+
+def _lookup(path: Path) -> Optional[Tuple[str, List[int]]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    hit = _memo.get(str(path))
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2], hit[3]
+    if _disk_cache is not None:
+        stored = _disk_cache.get(path)
+        if stored is not None:
+            _remember(path, stored[0], stored[1], persist=False)
+            return stored
+    return None
+
+def _apply_ocr(items: List[Tuple[Path, str, List[int]]]) -> List[Tuple[str, List[int]]]:
+    """Replace low-text PDF pages with OCR output, for many documents in one page pool.
+
+    OCR'd pages are looked up in / written to the extract cache first, so each page
+    is OCR'd at most once. Returns the (possibly) updated (text, offsets) per item.
+    """
+    global _ocr_warned
+    out = [(text, offsets) for _, text, offsets in items]
+    if _ocr is None:
+        return out
+    todo = []  # (item index, sha, {page: text}, [pages needing OCR])
+    for i, (path, text, offsets) in enumerate(items):
+        if path.suffix.lower() != ".pdf" or not offsets or text.startswith(PLACEHOLDER_PREFIXES):
+            continue
+        try:
+            marker = (str(path), path.stat().st_mtime_ns)
+        except OSError:
+            continue
+        if marker in _ocr_checked:
+            continue
+        _ocr_checked.add(marker)
+        pages = {rec.page: rec.text for rec in _slice_pages(text, offsets)}
+        low = [n for n, t in pages.items() if _ocr.needs_ocr(t)]
+        if low:
+            todo.append((i, hash_file(path), pages, low))
+    if not todo:
+        return out
+    have_engine = try_import_pytesseract() is not None
+    if not have_engine and not _ocr_warned:
+        print("OCR skipped: pytesseract/tesseract not available (pip install pytesseract + tesseract binary).")
+        _ocr_warned = True
+    jobs, known = [], {}
+    for i, sha, _, low in todo:
+        stored = _disk_cache.get_ocr_pages(sha, _ocr.dpi, _ocr.lang) if _disk_cache is not None else {}
+        for n in low:
+            if n in stored:
+                known[(i, n)] = stored[n]
+            elif have_engine:
+                jobs.append((str(items[i][0]), n))
+    fresh = ocr_pages(jobs, _ocr) if jobs else {}
+    path_index = {str(items[i][0]): (i, sha) for i, sha, _, _ in todo}
+    new_by_sha: Dict[str, Dict[int, str]] = {}
+    for (path, n), text in fresh.items():
+        if text is None:
+            continue  # failed page: not cached, so a later run retries it
+        i, sha = path_index[path]
+        known[(i, n)] = text
+        new_by_sha.setdefault(sha, {})[n] = text
+    if _disk_cache is not None:
+        for sha, pages in new_by_sha.items():
+            _disk_cache.put_ocr_pages(sha, _ocr.dpi, _ocr.lang, pages)
+    for i, _, pages, low in todo:
+        changed = False
+        for n in low:
+            ocr_text = known.get((i, n), "")
+            if len(ocr_text.strip()) > len(pages[n].strip()):
+                pages[n] = ocr_text.strip()
+                changed = True
+        if changed:
+            out[i] = _join_pages([pages[n] for n in sorted(pages)])
+            _remember(items[i][0], *out[i])
+    return out
+
+def extract_with_offsets(path: Path) -> Tuple[str, List[int]]:
+    """Full text plus the character offset at which each page starts."""
+    path = Path(path)
+    cached = _lookup(path)
+    if cached is None:
+        cached = _extract_raw(path)
+        _remember(path, *cached)
+    if _ocr is not None:
+        cached = _apply_ocr([(path, *cached)])[0]
+    return cached
 
 def extract_text(path: Path) -> str:
+    return extract_with_offsets(path)[0]
+
+# --- streaming API -------------------------------------------------------------
+
+class PageRecord(NamedTuple):
+    page: int     # 1-based page number (pseudo-pages for plain text)
+    start: int    # char offset of this page in the full extracted text
+    end: int
+    text: str
+
+class Chunk(NamedTuple):
+    index: int
+    pages: List[PageRecord]  # page pieces in order; a long page may be split across chunks
+
+    @property
+    def page_start(self) -> int:
+        return self.pages[0].page
+
+    @property
+    def page_end(self) -> int:
+        return self.pages[-1].page
+
+    @property
+    def start(self) -> int:
+        return self.pages[0].start
+
+    @property
+    def end(self) -> int:
+        return self.pages[-1].end
+
+    @property
+    def text(self) -> str:
+        """Chunk text with ``[Page N]`` markers so prompts can cite page:¶."""
+        out, last = [], None
+        for rec in self.pages:
+            if rec.page != last:
+                out.append(f"[Page {rec.page}]")
+                last = rec.page
+            out.append(rec.text)
+        return "\n".join(out)
+
+def _slice_pages(text: str, offsets: List[int]) -> Iterator[PageRecord]:
+    for n, start in enumerate(offsets, 1):
+        end = offsets[n] - len(PAGE_SEP) if n < len(offsets) else len(text)
+        yield PageRecord(n, start, end, text[start:end])
+
+def iter_pages(path: Path, text_page_chars: int = 4000) -> Iterator[PageRecord]:
+    """Yield page records lazily without building the whole document string.
+
+    PDFs are read one page at a time (served from the extract cache when present).
+    Plain text is read line by line and cut into pseudo-pages at form feeds or
+    every ``text_page_chars`` characters; offsets match ``extract_text`` output.
+    """
+    path = Path(path)
     ext = path.suffix.lower()
-    if ext in (".txt",".md"):
-        return path.read_text(encoding="utf-8", errors="ignore")
-    # elif ext == ".pdf":
-    #     with pdfplumber.open(str(path)) as pdf:
-    #         return "\n".join(page.extract_text() or "" for page in pdf.pages)
-    # elif ext == ".docx":
-    #     return docx2txt.process(str(path)) or ""
-    return f"UNSUPPORTED FILE TYPE: {ext}"
-
-def batch_extract(paths: List[Path]) -> List[str]:
-    return [extract_text(p) for p in paths]
+    if ext in (".txt", ".md"):
+        page, start, pos, buf = 1, 0, 0, []
+        size = 0
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                parts = line.split("\f")
+                for i, part in enumerate(parts):
+                    if i > 0 or (size >= text_page_chars and part):
+                        yield PageRecord(page, start, pos, "".join(buf))
+                        page, start, buf, size = page + 1, pos + (1 if i > 0 else 0), [], 0
+                        pos += 1 if i > 0 else 0
+                    buf.append(part)
+                    size += len(part)
+                    pos += len(part)
+        if buf or page == 1:
+            yield PageRecord(page, start, pos, "".join(buf))
+        return
+    if ext == ".pdf" and _ocr is not None:
+        # OCR fills pages across a process pool; go through the (cached) full extraction
+        yield from _slice_pages(*extract_with_offsets(path))
+        return
+    if ext == ".pdf":
+        cached = _lookup(path)
+        if cached is not None:
+            yield from _slice_pages(*cached)
+            return
+        pdfplumber = try_import_pdfplumber()
+        if pdfplumber:
+            pos = 0
+            with pdfplumber.open(str(path)) as pdf:
+                for n, page in enumerate(pdf.pages, 1):
+                    text = page.extract_text() or ""
+                    yield PageRecord(n, pos, pos + len(text), text)
+                    pos += len(text) + len(PAGE_SEP)
+                    page.close()  # release parsed layout objects as we go
+            return
+    yield from _slice_pages(*extract_with_offsets(path))
+
+def _split_page(rec: PageRecord, max_chars: int) -> Iterator[PageRecord]:
+    if len(rec.text) <= max_chars:
+        yield rec
+        return
+    pos = 0
+    while pos < len(rec.text):
+        end = min(len(rec.text), pos + max_chars)
+        if end < len(rec.text):
+            cut = rec.text.rfind("\n", pos, end)
+            if cut > pos + max_chars // 2:
+                end = cut + 1
+        yield PageRecord(rec.page, rec.start + pos, rec.start + end, rec.text[pos:end])
+        pos = end
+
+def iter_chunks(path: Path, max_tokens: int = 3000, overlap_pages: int = 0) -> Iterator[Chunk]:
+    """Pack streamed pages into windows of at most ``max_tokens`` (estimated).
+
+    Pages longer than the budget are split on line boundaries. ``overlap_pages``
+    repeats the last N page pieces of a window at the start of the next one so
+    statements that straddle a boundary stay intact.
+    """
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    buf: List[PageRecord] = []
+    size = 0
+    index = 0
+    for rec in iter_pages(path):
+        for piece in _split_page(rec, max_chars):
+            if buf and size + len(piece.text) > max_chars:
+                yield Chunk(index, buf)
+                index += 1
+                buf = buf[-overlap_pages:] if overlap_pages else []
+                size = sum(len(p.text) for p in buf)
+                while buf and size + len(piece.text) > max_chars:
+                    size -= len(buf.pop(0).text)
+            buf.append(piece)
+            size += len(piece.text)
+    if buf:
+        yield Chunk(index, buf)
+
+def _worker_main(tasks, conn) -> None:
+    while True:
+        item = tasks.get()
+        if item is None:
+            return
+        idx, path = item
+        try:
+            text, offsets = _extract_raw(Path(path))
+            conn.send((idx, text, offsets, None))
+        except Exception as e:
+            conn.send((idx, "", [], f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    """One extraction process with its own task queue and result pipe.
+
+    Killing a worker (timeout) can leave its channels half-written; since nothing
+    is shared with the other workers, only this worker's channels are discarded.
+    """
+
+    def __init__(self, ctx):
+        self.tasks = ctx.Queue()
+        self.conn, child_conn = ctx.Pipe(duplex=False)
+        self.proc = ctx.Process(target=_worker_main, args=(self.tasks, child_conn), daemon=True)
+        self.proc.start()
+        child_conn.close()  # the parent keeps only the read end, so a dead worker reads as EOF
+        self.current: Optional[int] = None
+        self.started = 0.0
+
+    def assign(self, idx: int, path: Path) -> None:
+        self.tasks.put((idx, str(path)))
+        self.current = idx
+        self.started = time.monotonic()
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.proc.kill()
+        else:
+            self.tasks.put(None)
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.conn.close()
+        self.tasks.cancel_join_thread()  # don't block exit on a queue the dead worker never drained
+
+def batch_extract_with_report(paths: List[Path], workers: int = 0,
+                              timeout: Optional[float] = None) -> Tuple[List[str], Dict]:
+    """Extract many files; returns (texts in input order, throughput report).
+
+    Cached files are served first; only misses are parsed. ``workers`` <= 1 parses
+    in-process (``timeout`` is then not enforced). Failed or timed-out files yield an
+    ``EXTRACTION ERROR`` / ``EXTRACTION TIMEOUT`` placeholder.
+    """
+    paths = [Path(p) for p in paths]
+    t0 = time.perf_counter()
+    texts: List[Optional[str]] = [None] * len(paths)
+    pages_total = 0
+    cached = 0
+    errors: Dict[str, str] = {}
+    timeouts: List[str] = []
+
+    todo = []
+    for i, p in enumerate(paths):
+        hit = _lookup(p)
+        if hit is not None:
+            texts[i] = hit[0]
+            cached += 1
+        else:
+            todo.append(i)
+
+    def finish(i: int, text: str, offsets: List[int], err: Optional[str]) -> None:
+        nonlocal pages_total
+        if err:
+            errors[paths[i].name] = err
+            text = f"EXTRACTION ERROR: {err}"
+        else:
+            pages_total += len(offsets)
+            _remember(paths[i], text, offsets)
+        texts[i] = text
+
+    if workers <= 1 or len(todo) <= 1:
+        for i in todo:
+            try:
+                finish(i, *_extract_raw(paths[i]), None)
+            except Exception as e:
+                finish(i, "", [], f"{type(e).__name__}: {e}")
+    else:
+        ctx = mp.get_context("spawn")
+        pending = deque((i, paths[i]) for i in todo)
+        pool = [_Worker(ctx) for _ in range(min(workers, len(todo)))]
+        remaining = len(todo)
+        try:
+            while remaining:
+                for w in pool:
+                    if w.current is None and pending:
+                        w.assign(*pending.popleft())
+                for conn in mp_connection.wait([w.conn for w in pool], timeout=0.05):
+                    w = next(w for w in pool if w.conn is conn)
+                    try:
+                        idx, text, offsets, err = conn.recv()
+                    except (EOFError, OSError):
+                        w.proc.join(timeout=1)  # worker died; a busy one is reported below
+                        if w.current is None:
+                            w.stop(kill=True)
+                            pool[pool.index(w)] = _Worker(ctx)
+                        continue
+                    if texts[idx] is None:
+                        finish(idx, text, offsets, err)
+                        remaining -= 1
+                    w.current = None
+                now = time.monotonic()
+                for j, w in enumerate(pool):
+                    if w.current is not None and texts[w.current] is None and not w.proc.is_alive():
+                        # worker crashed (segfault in a parser, OOM kill, ...)
+                        finish(w.current, "", [], f"worker exited with code {w.proc.exitcode}")
+                        remaining -= 1
+                        w.stop(kill=True)
+                        pool[j] = _Worker(ctx)
+                    elif timeout and w.current is not None and now - w.started > timeout:
+                        timeouts.append(paths[w.current].name)
+                        texts[w.current] = f"EXTRACTION TIMEOUT: exceeded {timeout:g}s"
+                        remaining -= 1
+                        w.stop(kill=True)
+                        pool[j] = _Worker(ctx)
+        finally:
+            for w in pool:
+                w.stop()
+
+    ocr_items = [(paths[i], texts[i], _memo[str(paths[i])][3]) for i in range(len(paths))
+                 if _ocr is not None and str(paths[i]) in _memo and paths[i].suffix.lower() == ".pdf"]
+    if ocr_items:
+        filled = _apply_ocr(ocr_items)
+        index = {str(p): i for i, p in enumerate(paths)}
+        for (p, _, _), (text, _) in zip(ocr_items, filled):
+            texts[index[str(p)]] = text
+
+    elapsed = time.perf_counter() - t0
+    report = {
+        "files": len(paths),
+        "cached": cached,
+        "pages": pages_total,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages_total / elapsed, 1) if elapsed > 0 else 0.0,
+        "errors": errors,
+        "timeouts": timeouts,
+    }
+    return [t or "" for t in texts], report
+
+def batch_extract(paths: List[Path], workers: int = 0, timeout: Optional[float] = None) -> List[str]:
+    return batch_extract_with_report(paths, workers=workers, timeout=timeout)[0]
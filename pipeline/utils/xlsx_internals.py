@@ -0,0 +1,68 @@
+"""The openpyxl private API the master workbook relies on, in one place.
+
+The streamed builder copies prepared style arrays onto cells (``cell._style``,
+``workbook._cell_styles``) and the incremental update renders sheet XML with
+openpyxl's own worksheet writer (``WorksheetWriter``, ``ws._values_to_row``).
+None of that is public, so it is only used with the openpyxl releases it was
+checked against (``TESTED_VERSIONS``, pinned in requirements.txt). On any other
+version ``SUPPORTED`` is False: styles are set through the public cell
+attributes and master_workbook rebuilds the file instead of patching it.
+"""
+from __future__ import annotations
+from copy import copy
+from io import BytesIO
+from typing import Iterable, Optional
+
+import openpyxl
+from openpyxl.cell import Cell
+
+TESTED_VERSIONS = ("3.1",)  # major.minor
+VERSION = openpyxl.__version__
+
+def _check() -> Optional[str]:
+    """None when the private API is usable, else why not."""
+    if ".".join(VERSION.split(".")[:2]) not in TESTED_VERSIONS:
+        return f"openpyxl {VERSION} is not a tested version ({', '.join(TESTED_VERSIONS)})"
+    try:
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.worksheet._writer import WorksheetWriter  # noqa: F401
+        ws = Workbook(write_only=True).create_sheet()
+        ws.parent._cell_styles.add(WriteOnlyCell(ws)._style)
+        ws._values_to_row([1], 1)
+    except Exception as e:
+        return f"openpyxl {VERSION} internals changed ({e})"
+    return None
+
+UNSUPPORTED_REASON = _check()
+SUPPORTED = UNSUPPORTED_REASON is None
+
+def cell_style(cell: Cell):
+    """The cell's style array (ids into the workbook's style tables)."""
+    return cell._style
+
+def register_style(ws, style) -> None:
+    """Add a style array to the workbook's cell styles so its id is fixed now."""
+    ws.parent._cell_styles.add(style)
+
+def apply_style(cell: Cell, style) -> None:
+    cell._style = copy(style)
+
+def style_key(cell: Cell) -> list:
+    """JSON-able identity of a cell's style, for sheet digests."""
+    if SUPPORTED:
+        return cell._style.tolist()
+    return [repr(cell.font), repr(cell.fill), repr(cell.alignment)]
+
+def render_sheet(ws, rows: Iterable[tuple]) -> bytes:
+    """Worksheet XML for ``(row number, values)`` pairs, written by openpyxl's own writer."""
+    from openpyxl.worksheet._writer import WorksheetWriter
+    writer = WorksheetWriter(ws, out=BytesIO())
+    writer.write_top()
+    xf = writer.xf.send(True)
+    with xf.element("sheetData"):
+        for row_idx, values in rows:
+            writer.write_row(xf, ws._values_to_row(values, row_idx), row_idx)
+    writer.xf.send(None)
+    writer.write_tail()
+    return writer.read()
@@ -0,0 +1,408 @@
+"""Cross-reference graph of the master records (resolved Contradicts / Cross-Link).
+
+Each reference in a record's ``Contradicts`` / ``Cross-Link`` text (tried whole,
+then split on , and ;) is resolved to a record id (row position in the store):
+
+1. exact: same ``name_key`` as a Filename (dict lookup)
+2. fuzzy: an inverted index over filename words, dates (Date column and dates
+   in the filename) and agencies (Agency column). Only records sharing a
+   reasonably rare feature with the reference are scored, by the IDF weight of
+   the features they share; the best one is taken when it covers at least
+   ``MIN_SCORE`` of the reference and is clearly ahead of the runner-up.
+
+Edges (source -> target, kind, score) are kept as numpy arrays plus a CSR
+adjacency of the undirected graph, so the queries are array operations:
+documents within k hops of the smoking guns (frontier BFS), connected
+components (label propagation with pointer jumping) and the most-contradicted
+documents (distinct sources per target). The graph is saved next to the store
+(``<stem>.xref.npz``) with a signature of the columns it was built from and is
+only rebuilt when those change.
+
+CLI:
+  python -m pipeline.utils.xref_graph [--db ...] [--rebuild] hops --k 2
+  python -m pipeline.utils.xref_graph components | contradicted --top 10 | unresolved
+"""
+from __future__ import annotations
+import hashlib
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline.utils.candidates import extract_agencies, extract_dates
+from pipeline.utils.integrity import name_key, parse_dates
+
+GRAPH_VERSION = 2
+SOURCE_COLUMNS = ["Filename", "Date", "Agency", "Contradicts", "Cross-Link", "Smoking Gun", "Top 5"]
+EDGE_KINDS = ("contradicts", "cross_link")  # index = edge kind code
+REF_COLUMNS = {"Contradicts": 0, "Cross-Link": 1}
+MIN_SCORE = 0.6   # share of the reference's feature weight a fuzzy match must cover
+MIN_MARGIN = 0.1  # ... and its lead over the second-best record
+MAX_DF = 0.05     # features in more than this share of records (and > MIN_POSTING) only add to scores
+MIN_POSTING = 50
+STOPWORDS = {"the", "and", "for", "from", "with", "of", "to", "in", "on", "by", "re", "doc", "pdf"}
+
+_WORD_RE = re.compile(r"[a-z]+|\d+")
+_REF_SPLIT_RE = re.compile(r"\s*[;,]\s*")
+_PLACEHOLDER_RE = re.compile(r"^\s*(?:\[.*\])?\s*$")
+
+def graph_path(db_path: Path) -> Path:
+    """Derived graph next to the store: <stem>.xref.npz (safe to delete)."""
+    return Path(db_path).with_name(Path(db_path).stem + ".xref.npz")
+
+def source_signature(df: pd.DataFrame) -> str:
+    """Digest of the columns the graph is built from (row order included)."""
+    cols = [c for c in SOURCE_COLUMNS if c in df.columns]
+    frame = df[cols].astype(object).where(df[cols].notna(), None).astype(str)
+    digest = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+    h = hashlib.sha256(f"{GRAPH_VERSION}|{len(df)}|{cols}".encode("utf-8"))
+    h.update(digest.tobytes())
+    return h.hexdigest()[:16]
+
+# --- reference resolution ---------------------------------------------------
+
+@lru_cache(maxsize=1 << 16)
+def text_features(text: str) -> frozenset:
+    """Word (4-char stem, numbers of 3+ digits kept whole), date and agency features of a name or reference."""
+    feats = {f"d:{d}" for d in extract_dates(text)}
+    feats.update(f"a:{a}" for a in extract_agencies(text))
+    for w in _WORD_RE.findall(text.lower()):
+        if w.isdigit():
+            if len(w) >= 3:
+                feats.add(f"w:{w}")
+        elif len(w) >= 3 and w not in STOPWORDS:
+            feats.add(f"w:{w[:4]}")
+    return frozenset(feats)
+
+class ReferenceIndex:
+    """Exact name-key lookup plus an inverted feature index over the records.
+
+    The feature index is built on the first ``fuzzy`` call, so a batch whose
+    references all match exactly never pays for it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        n = len(df)
+        self._df = df
+        keys = name_key(self._col("Filename"))
+        keys = keys[(keys != "").to_numpy() & ~keys.duplicated().to_numpy()]
+        self.exact: Dict[str, int] = dict(zip(keys.tolist(), keys.index.tolist()))
+        self.n = max(1, n)
+        self.limit = max(MIN_POSTING, int(MAX_DF * n))
+        self._features: Optional[List[frozenset]] = None
+        self._postings: Dict[str, List[int]] = {}
+
+    def _col(self, name: str) -> pd.Series:
+        df = self._df
+        return df[name] if name in df.columns else pd.Series([None] * len(df), dtype=object)
+
+    @property
+    def features(self) -> List[frozenset]:
+        if self._features is None:
+            self._build_features()
+        return self._features
+
+    @property
+    def postings(self) -> Dict[str, List[int]]:
+        if self._features is None:
+            self._build_features()
+        return self._postings
+
+    def _build_features(self) -> None:
+        col = self._col
+        dates = parse_dates(col("Date")).dt.strftime("%Y-%m-%d").tolist()
+        agency_codes, agency_values = pd.factorize(col("Agency"))
+        agency_feats = [{f"a:{a}" for a in extract_agencies(str(v))} for v in agency_values]
+        names = col("Filename").where(col("Filename").notna(), "").astype(str).tolist()
+
+        features: List[frozenset] = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(names):
+            feats = set(text_features(name))
+            if isinstance(dates[i], str):
+                feats.add(f"d:{dates[i]}")
+            if agency_codes[i] >= 0:
+                feats |= agency_feats[agency_codes[i]]
+            features.append(frozenset(feats))
+            for f in feats:
+                postings[f].append(i)
+        self._features, self._postings = features, postings
+
+    def idf(self, feature: str) -> float:
+        return math.log((self.n + 1) / (len(self.postings.get(feature, ())) + 1)) + 1.0
+
+    def lookup(self, refs: pd.Series) -> np.ndarray:
+        """Exact matches (same ``name_key`` as a Filename) for a batch of references; -1 where none."""
+        return name_key(refs).map(self.exact).fillna(-1).to_numpy(dtype=np.int64)
+
+    def fuzzy(self, ref: str, source: int = -1) -> Tuple[int, float]:
+        """(record id, score) for one reference; (-1, best score) when nothing qualifies."""
+        feats = text_features(ref)
+        if not feats:
+            return -1, 0.0
+        weights = {f: self.idf(f) for f in feats}
+        total = sum(weights.values())
+        scores: Dict[int, float] = defaultdict(float)
+        common = []
+        for f, w in weights.items():
+            posting = self.postings.get(f, ())
+            if len(posting) > self.limit:
+                common.append(f)
+                continue
+            for doc in posting:
+                scores[doc] += w
+        for doc in scores:
+            for f in common:
+                if f in self.features[doc]:
+                    scores[doc] += weights[f]
+        scores.pop(source, None)
+        if not scores:
+            return -1, 0.0
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:2]
+        best, score = ranked[0][0], ranked[0][1] / total
+        runner_up = ranked[1][1] / total if len(ranked) > 1 else 0.0
+        if score >= MIN_SCORE and score - runner_up >= MIN_MARGIN:
+            return best, round(score, 3)
+        return -1, round(score, 3)
+
+def split_references(text: str) -> List[str]:
+    if _PLACEHOLDER_RE.match(text):
+        return []
+    return [r for r in _REF_SPLIT_RE.split(text.strip()) if not _PLACEHOLDER_RE.match(r)]
+
+def resolve_references(df: pd.DataFrame, columns: Dict[str, int] = REF_COLUMNS,
+                       index: Optional[ReferenceIndex] = None) -> pd.DataFrame:
+    """One row per reference in ``columns`` (name -> edge kind): row, kind, ref, target, score.
+
+    ``target`` is -1 for a reference that matched no record. ``df`` must have a 0..n-1 index.
+    """
+    index = ReferenceIndex(df) if index is None else index
+    rows, kinds, values = [], [], []
+    for column, kind in columns.items():
+        if column in df.columns:
+            text = df[column].where(df[column].notna(), "").astype(str)
+            live = np.flatnonzero(~text.str.match(_PLACEHOLDER_RE.pattern).to_numpy(dtype=bool))
+            rows.append(live)
+            kinds.append(np.full(len(live), kind, dtype=np.int64))
+            values.append(text.iloc[live].to_numpy(dtype=object))
+    refs = pd.DataFrame({
+        "row": np.concatenate(rows) if rows else np.zeros(0, np.int64),
+        "kind": np.concatenate(kinds) if kinds else np.zeros(0, np.int64),
+        "ref": np.concatenate(values) if values else np.zeros(0, object),
+    })
+    # whole text first (filenames may contain commas), then each , / ; part; exact keys in one
+    # vectorized pass each, the fuzzy index only for parts still unmatched
+    refs["target"] = index.lookup(refs["ref"])
+    parts = refs[refs["target"] < 0].drop(columns="target")
+    parts["ref"] = parts["ref"].map(split_references)
+    parts = parts.explode("ref").dropna(subset=["ref"])
+    target = index.lookup(parts["ref"])
+    score = np.ones(len(parts), dtype=np.float64)
+    ref_text, ref_row = parts["ref"].tolist(), parts["row"].tolist()
+    for i in np.flatnonzero(target < 0).tolist():
+        target[i], score[i] = index.fuzzy(ref_text[i], ref_row[i])
+    parts["target"], parts["score"] = target, score
+    return pd.concat([refs[refs["target"] >= 0].assign(score=1.0), parts], ignore_index=True)
+
+# --- graph ------------------------------------------------------------------
+
+def _csr(src: np.ndarray, dst: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[order].astype(np.int32)
+
+@dataclass
+class CrossRefGraph:
+    filenames: np.ndarray       # str, one per record id
+    smoking: np.ndarray         # bool, Smoking Gun == Yes
+    top5: np.ndarray            # bool, Top 5 == Yes
+    src: np.ndarray             # int32 edge arrays: source -> target, kind (EDGE_KINDS), match score
+    dst: np.ndarray
+    kind: np.ndarray
+    score: np.ndarray
+    indptr: np.ndarray          # CSR of the undirected graph
+    indices: np.ndarray
+    unresolved_row: np.ndarray  # references that matched no record
+    unresolved_ref: np.ndarray
+    unresolved_kind: np.ndarray  # int8, EDGE_KINDS code of the column it came from
+    signature: str = ""
+
+    @property
+    def size(self) -> int:
+        return len(self.filenames)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "CrossRefGraph":
+        df = df.reset_index(drop=True)
+        n = len(df)
+        links = resolve_references(df)
+        unresolved = links[links["target"] < 0]
+        links = links[(links["target"] >= 0) & (links["target"] != links["row"])]
+        links = (links.groupby(["row", "target", "kind"], sort=True)["score"].max().reset_index())
+        src = links["row"].to_numpy(dtype=np.int32)
+        dst = links["target"].to_numpy(dtype=np.int32)
+        kind = links["kind"].to_numpy(dtype=np.int8)
+        score = links["score"].to_numpy(dtype=np.float32)
+
+        pairs = np.unique(np.concatenate([np.stack([src, dst], 1), np.stack([dst, src], 1)]), axis=0)
+        indptr, indices = _csr(pairs[:, 0], pairs[:, 1], n)
+        flag = lambda name: (df[name] == "Yes").to_numpy(dtype=bool) if name in df.columns else np.zeros(n, bool)  # noqa: E731
+        names = df["Filename"].where(df["Filename"].notna(), "") if "Filename" in df.columns else pd.Series([""] * n)
+        return cls(
+            filenames=np.array(names.astype(str).tolist(), dtype=str).reshape(n),
+            smoking=flag("Smoking Gun"), top5=flag("Top 5"),
+            src=src, dst=dst, kind=kind, score=score, indptr=indptr, indices=indices,
+            unresolved_row=unresolved["row"].to_numpy(dtype=np.int32),
+            unresolved_ref=np.array(unresolved["ref"].astype(str).tolist(), dtype=str).reshape(len(unresolved)),
+            unresolved_kind=unresolved["kind"].to_numpy(dtype=np.int8),
+            signature=source_signature(df),
+        )
+
+    # --- persistence
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, version=np.array(GRAPH_VERSION), signature=np.array(self.signature),
+                                **{k: getattr(self, k) for k in _ARRAYS})
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["CrossRefGraph"]:
+        """The saved graph, or None when it is missing, unreadable or from another GRAPH_VERSION."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != GRAPH_VERSION:
+                    return None
+                return cls(signature=str(data["signature"]), **{k: data[k] for k in _ARRAYS})
+        except (OSError, KeyError, ValueError):
+            return None
+
+    # --- queries
+
+    def neighbors(self, nodes: np.ndarray) -> np.ndarray:
+        """Ids adjacent to any of ``nodes`` (either direction), with repeats."""
+        starts, ends = self.indptr[nodes], self.indptr[nodes + 1]
+        lens = ends - starts
+        if not lens.sum():
+            return np.zeros(0, dtype=np.int32)
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lens)[:-1]]), lens)
+        return self.indices[offsets + np.arange(lens.sum())]
+
+    def within_hops(self, k: int, seeds: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, hop distance) of every document within ``k`` hops of ``seeds`` (default: smoking guns)."""
+        seeds = np.flatnonzero(self.smoking) if seeds is None else np.asarray(seeds, dtype=np.int64)
+        dist = np.full(self.size, -1, dtype=np.int32)
+        dist[seeds] = 0
+        frontier = seeds
+        for hop in range(1, k + 1):
+            nxt = self.neighbors(frontier)
+            nxt = np.unique(nxt[dist[nxt] < 0])
+            if not len(nxt):
+                break
+            dist[nxt] = hop
+            frontier = nxt
+        ids = np.flatnonzero(dist >= 0)
+        order = np.lexsort((ids, dist[ids]))
+        return ids[order], dist[ids][order]
+
+    def component_labels(self) -> np.ndarray:
+        """Smallest record id in each record's connected component."""
+        labels = np.arange(self.size, dtype=np.int64)
+        a, b = self.src.astype(np.int64), self.dst.astype(np.int64)
+        while True:
+            low = np.minimum(labels[a], labels[b])
+            new = labels.copy()
+            np.minimum.at(new, a, low)
+            np.minimum.at(new, b, low)
+            new = new[new]  # pointer jumping
+            if np.array_equal(new, labels):
+                return labels
+            labels = new
+
+    def components(self, min_size: int = 2) -> List[np.ndarray]:
+        """Connected components with at least ``min_size`` documents, largest first."""
+        labels = self.component_labels()
+        order = np.argsort(labels, kind="stable")
+        roots, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+        keep = np.flatnonzero(counts >= min_size)
+        keep = keep[np.lexsort((roots[keep], -counts[keep]))]
+        return [order[starts[i]:starts[i] + counts[i]] for i in keep]
+
+    def contradiction_counts(self) -> np.ndarray:
+        """Distinct documents contradicting each document."""
+        mask = self.kind == REF_COLUMNS["Contradicts"]
+        return np.bincount(self.dst[mask], minlength=self.size)
+
+    def most_contradicted(self, top: int = 10) -> List[Tuple[int, int]]:
+        counts = self.contradiction_counts()
+        ids = np.flatnonzero(counts)
+        ids = ids[np.lexsort((ids, -counts[ids]))][:top]
+        return [(int(i), int(counts[i])) for i in ids]
+
+    def references(self, node: int) -> Dict[str, List[str]]:
+        """Resolved outgoing references of one document by edge kind (filenames)."""
+        lo, hi = np.searchsorted(self.src, [node, node + 1])
+        out: Dict[str, List[str]] = {k: [] for k in EDGE_KINDS}
+        for target, kind in zip(self.dst[lo:hi].tolist(), self.kind[lo:hi].tolist()):
+            out[EDGE_KINDS[kind]].append(str(self.filenames[target]))
+        return out
+
+_ARRAYS = ("filenames", "smoking", "top5", "src", "dst", "kind", "score", "indptr", "indices",
+           "unresolved_row", "unresolved_ref", "unresolved_kind")
+
+def load_or_build(df: pd.DataFrame, path: Path, rebuild: bool = False) -> Tuple[CrossRefGraph, bool]:
+    """(graph, built): the saved graph when it was built from the same records, else a fresh one (saved)."""
+    if not rebuild:
+        graph = CrossRefGraph.load(path)
+        if graph is not None and graph.signature == source_signature(df):
+            return graph, False
+    graph = CrossRefGraph.build(df)
+    graph.save(path)
+    return graph, True
+
+if __name__ == '__main__':
+    import argparse
+
+    from pipeline.utils.master_store import DEFAULT_MASTER_DB, load_dataframe
+
+    parser = argparse.ArgumentParser(description="Query the cross-reference graph of the master records")
+    parser.add_argument('--db', default=str(DEFAULT_MASTER_DB), help='Store path')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild even if the saved graph is current')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    h = sub.add_parser('hops', help='Documents within k hops of a smoking gun')
+    h.add_argument('--k', type=int, default=2)
+    c = sub.add_parser('components', help='Connected groups of documents')
+    c.add_argument('--min-size', type=int, default=2)
+    t = sub.add_parser('contradicted', help='Documents contradicted by the most others')
+    t.add_argument('--top', type=int, default=10)
+    sub.add_parser('unresolved', help='References that matched no record')
+    args = parser.parse_args()
+
+    path = graph_path(Path(args.db))
+    graph, built = load_or_build(load_dataframe(Path(args.db)), path, args.rebuild)
+    print(f"{'Built' if built else 'Loaded'} {path}: {graph.size} documents, {len(graph.src)} links, "
+          f"{len(graph.unresolved_ref)} unresolved references")
+    if args.cmd == 'hops':
+        ids, dist = graph.within_hops(args.k)
+        for i, d in zip(ids.tolist(), dist.tolist()):
+            print(f"  {d}  {graph.filenames[i]}")
+    elif args.cmd == 'components':
+        for n, members in enumerate(graph.components(args.min_size), 1):
+            print(f"  #{n} ({len(members)}): " + "; ".join(graph.filenames[members[:5]]) + (" ..." if len(members) > 5 else ""))
+    elif args.cmd == 'contradicted':
+        for i, count in graph.most_contradicted(args.top):
+            print(f"  {count:4}  {graph.filenames[i]}")
+    else:
+        for row, ref in zip(graph.unresolved_row.tolist(), graph.unresolved_ref.tolist()):
+            print(f"  {graph.filenames[row]}: {ref}")